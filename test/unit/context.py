@@ -0,0 +1,16 @@
+"""
+    Puts the shared transformers package (util/python) and the models of a transformer service
+    on the path of the unit tests. The service defaults to ChEMBL; set TRANSFORMER_SERVICE to the
+    python-flask-server folder of another service to run the tests against its models.
+
+        python -m unittest discover -s test/unit
+"""
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SERVICE = os.environ.get('TRANSFORMER_SERVICE', os.path.join(ROOT, 'transformers', 'chembl', 'python-flask-server'))
+
+for path in (SERVICE, os.path.join(ROOT, 'util', 'python')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
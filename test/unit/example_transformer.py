@@ -0,0 +1,83 @@
+"""
+    A transformer for the unit tests, configured in code instead of the info, prefix map and
+    class map files that a service reads from its working directory.
+"""
+import context  # noqa: F401
+
+from transformers.transformer import Transformer
+from openapi_server.models.element import Element
+from openapi_server.models.connection import Connection
+from openapi_server.models.knowledge_map import KnowledgeMap
+from openapi_server.models.parameter import Parameter
+from openapi_server.models.transformer_info import TransformerInfo
+from openapi_server.models.transformer_query import TransformerQuery
+from openapi_server.models.model_property import ModelProperty
+
+
+CLASS_DICT = {
+    'compound': 'ChemicalSubstance',
+    'gene': 'Gene'
+}
+
+PREFIX_MAP = {
+    'ChemicalSubstance': {
+        'chembl': {'molepro_prefix': 'ChEMBL:', 'biolink_prefix': 'CHEMBL.COMPOUND:'},
+        'pubchem': {'molepro_prefix': 'CID:', 'biolink_prefix': 'PUBCHEM.COMPOUND:'}
+    },
+    'Gene': {
+        'entrez': {'molepro_prefix': 'NCBIGene:', 'biolink_prefix': 'NCBIGene:'}
+    }
+}
+
+
+class ExampleTransformer(Transformer):
+    """
+        Maps each compound to the genes GENE1 .. GENEn (n: the 'limit' control); the elements are
+        yielded, and every call of map() is counted.
+    """
+
+    variables = ['limit']
+
+    def __init__(self, response_cache=None):
+        self.calls = 0
+        super().__init__(self.variables, definition_file=None, response_cache=response_cache)
+
+
+    def transformer_info(self, cache):
+        self.info = TransformerInfo(
+            name='Example transformer',
+            label='Example',
+            version='1.0.0',
+            function='transformer',
+            knowledge_map=KnowledgeMap(input_class='compound', output_class='gene', predicates=[]),
+            parameters=[Parameter(name='limit', type='int', default='3')]
+        )
+        self.parameters = dict(zip(self.variables, self.info.parameters))
+        self.prefix_map = PREFIX_MAP
+        self.class_dict = CLASS_DICT
+        self.prefix_index = self.get_prefix_index(self.prefix_map, self.class_dict)
+        self.SOURCE = self.info.label
+        self.PROVIDED_BY = self.info.name
+        self.OUTPUT_CLASS = self.info.knowledge_map.output_class
+        self.INPUT_CLASS = self.info.knowledge_map.input_class
+        return self.info
+
+
+    def map(self, collection, controls):
+        self.calls = self.calls + 1
+        for i in range(1, int(controls['limit']) + 1):
+            gene = Element(id='NCBIGene:{}'.format(i), biolink_class='Gene', identifiers={'entrez': 'NCBIGene:{}'.format(i)}, connections=[])
+            for compound in collection:
+                gene.connections.append(Connection(source_element_id=compound.id, type='affects', attributes=[]))
+            yield gene
+
+
+def compound(id, **identifiers):
+    return Element(id=id, biolink_class='ChemicalSubstance', identifiers=identifiers, connections=[])
+
+
+def query(collection, **controls):
+    return TransformerQuery(
+        collection=collection,
+        controls=[ModelProperty(name=name, value=str(value)) for name, value in controls.items()]
+    )
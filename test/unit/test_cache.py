@@ -0,0 +1,164 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+import context  # noqa: F401
+
+from flask import Flask
+
+from transformers.cache import ResponseCache
+from example_transformer import ExampleTransformer, compound, query
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+    def caches(self, **kwargs):
+        return [ResponseCache(**kwargs), ResponseCache(database=os.path.join(self.folder, 'cache.sqlite'), **kwargs)]
+
+
+    def test_get_put(self):
+        for cache in self.caches():
+            self.assertIsNone(cache.get('a'))
+            cache.put('a', ['response'])
+            self.assertEqual(cache.get('a'), ['response'])
+            cache.remove('a')
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (1, 2))
+
+
+    def test_copies(self):
+        for cache in self.caches():
+            response = [{'id': 'CID:1'}]
+            cache.put('a', response)
+            response.append({'id': 'CID:2'})
+            cached = cache.get('a')
+            cached.append({'id': 'CID:3'})
+            self.assertEqual(cache.get('a'), [{'id': 'CID:1'}])
+
+
+    def test_least_recently_used_evicted(self):
+        for cache in self.caches(max_size=2):
+            cache.put('a', 1)
+            cache.put('b', 2)
+            cache.get('a')
+            cache.put('c', 3)
+            self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+            self.assertEqual(cache.stats()['size'], 2)
+            self.assertEqual(cache.stats()['evictions'], 1)
+
+
+    def test_expired(self):
+        for cache in self.caches(ttl=0.05):
+            cache.put('a', 1)
+            self.assertEqual(cache.get('a'), 1)
+            time.sleep(0.1)
+            self.assertIsNone(cache.get('a'))
+
+
+    def test_shared_file(self):
+        database = os.path.join(self.folder, 'shared.sqlite')
+        ResponseCache(database=database).put('a', 1)
+        self.assertEqual(ResponseCache(database=database).get('a'), 1)
+
+
+    def test_key(self):
+        self.assertEqual(ResponseCache.key('a', 1), ResponseCache.key('a', '1'))
+        self.assertNotEqual(ResponseCache.key('ab', 'c'), ResponseCache.key('a', 'bc'))
+
+
+    def test_from_environment(self):
+        names = ['TRANSFORMER_CACHE', 'TRANSFORMER_CACHE_SIZE', 'TRANSFORMER_CACHE_TTL']
+        saved = {name: os.environ.get(name) for name in names}
+        try:
+            for name in names:
+                os.environ.pop(name, None)
+            self.assertIsNone(ResponseCache.from_environment())
+            os.environ['TRANSFORMER_CACHE'] = 'off'
+            self.assertIsNone(ResponseCache.from_environment())
+            os.environ['TRANSFORMER_CACHE'] = 'memory'
+            os.environ['TRANSFORMER_CACHE_SIZE'] = '10'
+            os.environ['TRANSFORMER_CACHE_TTL'] = '0'
+            cache = ResponseCache.from_environment()
+            self.assertEqual((cache.database, cache.max_size, cache.ttl), (None, 10, None))
+            os.environ['TRANSFORMER_CACHE'] = os.path.join(self.folder, 'env.sqlite')
+            self.assertEqual(ResponseCache.from_environment().database, os.path.join(self.folder, 'env.sqlite'))
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+class TestTransformerCache(unittest.TestCase):
+
+    def setUp(self):
+        self.transformer = ExampleTransformer(response_cache=ResponseCache(ttl=None))
+
+
+    def transform(self, collection, cache=None, **controls):
+        return [gene.id for gene in self.transformer.transform(query(collection, **controls), cache)]
+
+
+    def test_cached(self):
+        self.assertEqual(self.transform([compound('CID:1')], limit=2), ['NCBIGene:1', 'NCBIGene:2'])
+        self.assertEqual(self.transform([compound('CID:1')], limit=2), ['NCBIGene:1', 'NCBIGene:2'])
+        self.assertEqual(self.transformer.calls, 1)
+        self.transform([compound('CID:1')], limit=1)
+        self.assertEqual(self.transformer.calls, 2)
+
+
+    def test_key_ignores_collection_order(self):
+        first = query([compound('CID:1'), compound('CID:2')], limit=2)
+        second = query([compound('CID:2'), compound('CID:1')], limit=2)
+        controls = {'limit': 2}
+        self.assertEqual(self.transformer.cache_key(first, controls), self.transformer.cache_key(second, controls))
+        self.assertNotEqual(self.transformer.cache_key(first, controls), self.transformer.cache_key(first, {'limit': 3}))
+        self.assertNotEqual(self.transformer.cache_key(first, controls), self.transformer.cache_key(query([compound('CID:1')]), controls))
+
+
+    def test_directives(self):
+        collection = [compound('CID:1')]
+        self.transform(collection, 'no')
+        self.transform(collection)
+        self.assertEqual(self.transformer.calls, 2)     # 'no' neither stores nor reads
+        self.transform(collection)
+        self.assertEqual(self.transformer.calls, 2)
+        self.transform(collection, 'bypass')
+        self.assertEqual(self.transformer.calls, 3)     # 'bypass' recomputes and stores
+        self.transform(collection)
+        self.assertEqual(self.transformer.calls, 3)
+        self.transform(collection, 'remove')
+        self.assertEqual(self.transformer.calls, 4)     # 'remove' deletes and recomputes without storing
+        self.transform(collection)
+        self.assertEqual(self.transformer.calls, 5)
+
+
+    def test_directive_from_control(self):
+        self.assertEqual(self.transformer.cache_directive({'cache': ['no']}), 'no')
+        self.assertEqual(self.transformer.cache_directive({'cache': ['no']}, 'bypass'), 'bypass')
+        self.assertEqual(self.transformer.cache_directive({'limit': ['2']}), 'yes')
+        # a 'cache' control is a directive unless the transformer has a 'cache' parameter
+        self.transform([compound('CID:1')], limit=2, cache='no')
+        self.transform([compound('CID:1')], limit=2)
+        self.assertEqual(self.transformer.calls, 2)
+
+
+    def test_directive_from_header(self):
+        app = Flask(__name__)
+        for (header, directive) in [('no-store', 'no'), ('no-cache', 'bypass'), ('max-age=0', 'yes')]:
+            with app.test_request_context(headers={'Cache-Control': header}):
+                self.assertEqual(self.transformer.cache_directive({}), directive)
+
+
+if __name__ == '__main__':
+    unittest.main()
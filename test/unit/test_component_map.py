@@ -0,0 +1,92 @@
+import os
+import struct
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import context  # noqa: F401
+
+from openapi_server.controllers.chembl_db_transformer import ComponentEnsemblMap, load_component_ensembl_map
+
+
+def write_map(path, rows, magic=ComponentEnsemblMap.MAGIC):
+    # same layout as write_ensembl_map in chembl/db/chembl_target_component_xref.py
+    rows = [(component_id, gene_id.encode('ascii')) for (component_id, gene_id) in rows]
+    width = max((len(gene_id) for (component_id, gene_id) in rows), default=1)
+    record = struct.Struct('<I{}s'.format(width))
+    with open(path, 'wb') as f:
+        f.write(ComponentEnsemblMap.HEADER.pack(magic, len(rows), width))
+        for (component_id, gene_id) in rows:
+            f.write(record.pack(component_id, gene_id))
+
+
+class TestComponentEnsemblMap(unittest.TestCase):
+
+    rows = [
+        (1, 'ENSG00000141510'),
+        (3, 'ENSG00000012048'),
+        (3, 'ENSG0000001'),
+        (3, 'ENSG00000139618'),
+        (7, 'ENSG00000146648'),
+        (4294967295, 'ENSG00000000001')
+    ]
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'component.ensembl.bin')
+        write_map(self.path, self.rows)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+    def test_get(self):
+        component_map = ComponentEnsemblMap(self.path)
+        self.assertEqual(len(component_map), len(self.rows))
+        self.assertEqual(component_map.get(1), ['ENSG00000141510'])
+        self.assertEqual(component_map.get(7), ['ENSG00000146648'])
+        self.assertEqual(component_map.get(4294967295), ['ENSG00000000001'])
+
+
+    def test_many_genes(self):
+        # all genes of a component, in file order and without the padding of shorter ids
+        self.assertEqual(ComponentEnsemblMap(self.path).get(3), ['ENSG00000012048', 'ENSG0000001', 'ENSG00000139618'])
+
+
+    def test_missing(self):
+        component_map = ComponentEnsemblMap(self.path)
+        for component_id in (0, 2, 5, 8, 4294967294):
+            self.assertEqual(component_map.get(component_id), [])
+
+
+    def test_same_as_rows(self):
+        component_map = ComponentEnsemblMap(self.path)
+        for component_id in range(9):
+            expected = [gene_id for (key, gene_id) in self.rows if key == component_id]
+            self.assertEqual(component_map.get(component_id), expected)
+
+
+    def test_empty(self):
+        write_map(self.path, [])
+        component_map = ComponentEnsemblMap(self.path)
+        self.assertEqual(len(component_map), 0)
+        self.assertEqual(component_map.get(1), [])
+
+
+    def test_bad_magic(self):
+        write_map(self.path, self.rows, magic=b'NOTAMAP!')
+        with self.assertRaises(ValueError):
+            ComponentEnsemblMap(self.path)
+
+
+    def test_load(self):
+        self.assertIsInstance(load_component_ensembl_map(self.path), ComponentEnsemblMap)
+        with redirect_stdout(StringIO()) as output:
+            self.assertIsNone(load_component_ensembl_map(os.path.join(self.folder, 'missing.bin')))
+        self.assertIn('missing.bin not found', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
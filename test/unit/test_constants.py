@@ -0,0 +1,76 @@
+import gc
+import json
+import unittest
+
+import context  # noqa: F401
+
+from transformers import constants, encoder
+from transformers.constants import ConstantPool, constant_fragments
+from transformers.encoder import ModelJSONEncoder
+from openapi_server.models.element import Element
+from openapi_server.models.attribute import Attribute
+
+
+class TestConstantPool(unittest.TestCase):
+
+    def test_interned(self):
+        pool = ConstantPool()
+        reference = pool.get(Attribute, name='reference', value='PMID:1', source='source')
+        self.assertIs(pool.get(Attribute, source='source', value='PMID:1', name='reference'), reference)
+        self.assertIsNot(pool.get(Attribute, name='reference', value='PMID:2', source='source'), reference)
+        self.assertEqual(reference, Attribute(name='reference', value='PMID:1', source='source'))
+        self.assertIsNotNone(constant_fragments(reference))
+
+
+    def test_unhashable_values(self):
+        pool = ConstantPool()
+        attribute = pool.get(Attribute, name='references', value=['PMID:1', 'PMID:2'])
+        self.assertIsNot(pool.get(Attribute, name='references', value=['PMID:1', 'PMID:2']), attribute)
+        self.assertIsNone(constant_fragments(attribute))
+        self.assertEqual(len(pool.objects), 0)
+
+
+    def test_size(self):
+        pool = ConstantPool(size=2)
+        attributes = [pool.get(Attribute, name='score', value=i) for i in range(4)]
+        self.assertEqual(len(pool.objects), 2)
+        self.assertIs(pool.get(Attribute, name='score', value=1), attributes[1])
+        self.assertIsNot(pool.get(Attribute, name='score', value=3), attributes[3])
+        self.assertIsNone(constant_fragments(attributes[3]))
+
+
+    def test_not_interned(self):
+        self.assertIsNone(constant_fragments(Attribute(name='reference', value='PMID:1')))
+
+
+    def test_released_with_pool(self):
+        pool = ConstantPool()
+        count = len(constants.registry)
+        for i in range(10):
+            pool.get(Attribute, name='version', value=str(i))
+        self.assertEqual(len(constants.registry), count + 10)
+        del pool
+        gc.collect()
+        self.assertEqual(len(constants.registry), count)
+
+
+    def test_encoded_fragment(self):
+        pool = ConstantPool()
+        reference = pool.get(Attribute, name='reference', value='PMID:1', source='source')
+        elements = [
+            Element(id='CID:{}'.format(i), biolink_class='ChemicalSubstance', attributes=[reference, Attribute(name='score', value=i / 3)])
+            for i in range(3)
+        ]
+        plain = [
+            Element(id='CID:{}'.format(i), biolink_class='ChemicalSubstance', attributes=[Attribute(name='reference', value='PMID:1', source='source'), Attribute(name='score', value=i / 3)])
+            for i in range(3)
+        ]
+        for kwargs in (dict(indent=2, sort_keys=True), dict(sort_keys=True, separators=(',', ':'))):
+            self.assertEqual(ModelJSONEncoder(**kwargs).encode(elements), ModelJSONEncoder(**kwargs).encode(plain))
+        if encoder.orjson is not None:
+            self.assertEqual(list(constant_fragments(reference).keys()), [False])
+        self.assertEqual(json.loads(ModelJSONEncoder().encode(reference)), {'name': 'reference', 'value': 'PMID:1', 'source': 'source'})
+
+
+if __name__ == '__main__':
+    unittest.main()
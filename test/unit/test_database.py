@@ -0,0 +1,131 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+import context  # noqa: F401
+
+from transformers.database import ConnectionPool, select_many
+
+
+def create_database():
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    connection.execute("CREATE TABLE SYNONYM (ID TEXT, SYNONYM TEXT, EXACT_MATCH INT)")
+    connection.executemany("INSERT INTO SYNONYM VALUES (?,?,?)", [
+        ('A', 'alpha', 1), ('A', 'first', 0), ('B', 'beta', 1), ('C', 'gamma', 0), ('A', 'ace', 0)
+    ])
+    return connection
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        # a path that needs quoting in the URI of the database
+        self.database = os.path.join(self.folder, 'data #1', 'test?.sqlite')
+        os.makedirs(os.path.dirname(self.database))
+        connection = sqlite3.connect(self.database)
+        connection.execute("CREATE TABLE SYNONYM (ID TEXT, SYNONYM TEXT, EXACT_MATCH INT)")
+        connection.execute("INSERT INTO SYNONYM VALUES ('A', 'alpha', 1)")
+        connection.commit()
+        connection.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+
+    def test_rows(self):
+        pool = ConnectionPool(self.database)
+        row = pool.execute("SELECT * FROM SYNONYM WHERE ID = ?", ('A',)).fetchone()
+        self.assertEqual((row['ID'], row['SYNONYM']), ('A', 'alpha'))
+        cur = pool.cursor()
+        cur.execute("SELECT COUNT(*) FROM SYNONYM")
+        self.assertEqual(cur.fetchone()[0], 1)
+        self.assertEqual(type(ConnectionPool(self.database, row_factory=None).execute("SELECT ID FROM SYNONYM").fetchone()), tuple)
+
+
+    def test_read_only(self):
+        pool = ConnectionPool(self.database)
+        with self.assertRaises(sqlite3.OperationalError):
+            pool.execute("INSERT INTO SYNONYM VALUES ('B', 'beta', 1)")
+        with self.assertRaises(sqlite3.OperationalError):
+            ConnectionPool(os.path.join(self.folder, 'missing.sqlite')).execute("SELECT 1")
+        self.assertFalse(os.path.exists(os.path.join(self.folder, 'missing.sqlite')))
+
+
+    def test_connection_per_thread(self):
+        pool = ConnectionPool(self.database)
+        connections = []
+        def connect():
+            connections.append(pool.connection())
+            pool.execute("SELECT * FROM SYNONYM").fetchall()
+        threads = [threading.Thread(target=connect) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        connections.append(pool.connection())
+        self.assertIs(pool.connection(), connections[-1])
+        self.assertEqual(len(set(id(connection) for connection in connections)), 4)
+
+
+    def test_close(self):
+        pool = ConnectionPool(self.database)
+        connection = pool.connection()
+        pool.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+        self.assertIsNot(pool.connection(), connection)
+        self.assertEqual(pool.execute("SELECT COUNT(*) FROM SYNONYM").fetchone()[0], 1)
+
+
+    def test_select_many(self):
+        pool = ConnectionPool(self.database)
+        rows = select_many(pool, "SELECT ID, SYNONYM FROM SYNONYM WHERE ID IN (SELECT value FROM json_each(?))", ['A', 'B'], 'ID')
+        self.assertEqual([row['SYNONYM'] for row in rows['A']], ['alpha'])
+
+
+class TestSelectMany(unittest.TestCase):
+
+    query = """
+        SELECT ID, SYNONYM
+        FROM SYNONYM
+        WHERE ID IN (SELECT value FROM json_each(?)) AND EXACT_MATCH = ?
+        ORDER BY rowid
+    """
+
+    single_query = """
+        SELECT ID, SYNONYM
+        FROM SYNONYM
+        WHERE ID = ? AND EXACT_MATCH = ?
+        ORDER BY rowid
+    """
+
+    def setUp(self):
+        self.connection = create_database()
+
+    def test_same_rows_as_single_lookups(self):
+        ids = ['A', 'B', 'C', 'missing']
+        for exact_match in (0, 1):
+            rows = select_many(self.connection, self.query, ids, 'ID', (exact_match,))
+            for id in ids:
+                single = self.connection.execute(self.single_query, (id, exact_match)).fetchall()
+                self.assertEqual([tuple(row) for row in rows[id]], [tuple(row) for row in single])
+
+    def test_grouped_by_key(self):
+        rows = select_many(self.connection, self.query, {'A', 'C'}, 'ID', (0,))
+        self.assertEqual(sorted(rows.keys()), ['A', 'C'])
+        self.assertEqual([row['SYNONYM'] for row in rows['A']], ['first', 'ace'])
+
+    def test_no_ids(self):
+        connection = sqlite3.connect(':memory:')  # no tables: the query must not run
+        rows = select_many(connection, self.query, [], 'ID', (0,))
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(rows['A'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import json
+import glob
+import unittest
+
+import context
+
+from transformers.deserializer import deserialize
+from openapi_server import util
+from openapi_server.models.element import Element
+from openapi_server.models.transformer_info import TransformerInfo
+from openapi_server.models.transformer_query import TransformerQuery
+
+
+QUERY = {
+    'controls': [{'name': 'limit', 'value': '10'}, {'name': 'score', 'value': 5}],
+    'collection': [
+        {
+            'id': 'CID:2244',
+            'biolink_class': 'ChemicalSubstance',
+            'identifiers': {'pubchem': 'CID:2244', 'chembl': ['ChEMBL:CHEMBL25'], 'other': {'nested': [1, 2.5, None]}},
+            'names_synonyms': [{'name': 'aspirin', 'synonyms': ['ASA', 'acetylsalicylic acid'], 'source': 'PubChem'}],
+            'attributes': [
+                {'name': 'weight', 'value': 180.16, 'type': 'molecular_weight', 'source': 'PubChem'},
+                {'name': 'smiles', 'value': 'CC(=O)OC1=CC=CC=C1C(=O)O', 'url': None}
+            ],
+            'connections': [
+                {'source_element_id': 'CID:1', 'type': 'affects', 'attributes': [{'name': 'score', 'value': 0.5}]}
+            ],
+            'source': 'PubChem'
+        },
+        {'id': 'CID:1', 'biolink_class': 'ChemicalSubstance', 'identifiers': {}, 'connections': [], 'unknown': 'ignored'}
+    ]
+}
+
+
+class TestModelDeserializer(unittest.TestCase):
+
+    def assertSameModel(self, data, klass):
+        model = deserialize(data, klass)
+        expected = util.deserialize_model(data, klass)
+        self.assertEqual(type(model), klass)
+        self.assertEqual(model, expected)
+        self.assertEqual(model.to_dict(), expected.to_dict())
+        return model
+
+
+    def test_query(self):
+        query = self.assertSameModel(QUERY, TransformerQuery)
+        self.assertEqual(query.controls[1].value, '5')
+        self.assertEqual(query.collection[0].attributes[0].value, '180.16')   # coerced to the str type of the model
+        self.assertEqual(query.collection[0].identifiers['other'], {'nested': [1, 2.5, None]})
+
+
+    def test_info(self):
+        files = glob.glob(os.path.join(context.SERVICE, 'info', '*.json'))
+        self.assertGreater(len(files), 0)
+        for file in files:
+            with open(file) as f:
+                self.assertSameModel(json.load(f), TransformerInfo)
+
+
+    def test_empty(self):
+        self.assertSameModel({'controls': []}, TransformerQuery)
+        self.assertIsNone(deserialize(None, TransformerQuery))
+
+
+    def test_required_fields(self):
+        with self.assertRaises(ValueError):
+            deserialize({'controls': None}, TransformerQuery)
+        with self.assertRaises(ValueError):
+            deserialize({'controls': [{'name': 'limit', 'value': None}]}, TransformerQuery)
+        with self.assertRaises(ValueError):
+            deserialize({'id': None, 'biolink_class': 'Gene'}, Element)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import random
+import unittest
+
+import context  # noqa: F401
+
+from transformers import encoder
+from transformers.encoder import ModelJSONEncoder
+from openapi_server.models.element import Element
+from openapi_server.models.attribute import Attribute
+
+
+STRINGS = ['plain', 'DEL \x7f', '\x00\x1f control', 'café', '☃ snowman', 'emoji \U0001F600', 'math \U0001D49C', '"quoted" \\ /']
+FLOATS = [0.0, -0.0, 1.5, 0.1, 1e-4, 9.99e-5, 1e16, 1.2345e16, 123456789012345.6, -3.2e-7, 5e-324, 1.7976931348623157e308]
+
+
+def json_module(o, **kwargs):
+    """
+        Encode with the json module only (the reference output of the encoder)
+    """
+    orjson = encoder.orjson
+    encoder.orjson = None
+    try:
+        return ModelJSONEncoder(**kwargs).encode(o)
+    finally:
+        encoder.orjson = orjson
+
+
+@unittest.skipIf(encoder.orjson is None, 'orjson is not installed')
+class TestModelJSONEncoder(unittest.TestCase):
+
+    options = [
+        dict(indent=2, sort_keys=True, ensure_ascii=True, separators=(',', ': ')),
+        dict(sort_keys=True, ensure_ascii=True, separators=(',', ':')),
+        dict(indent=2, sort_keys=True, ensure_ascii=False, separators=(',', ': ')),
+    ]
+
+    def assertSameOutput(self, o):
+        for kwargs in self.options:
+            self.assertEqual(ModelJSONEncoder(**kwargs).encode(o), json_module(o, **kwargs), kwargs)
+
+
+    def test_strings(self):
+        for text in STRINGS:
+            self.assertSameOutput({'value': text, text: [text]})
+            self.assertEqual(ModelJSONEncoder(sort_keys=True).encode(text), json.dumps(text, sort_keys=True))
+
+
+    def test_random_strings(self):
+        rng = random.Random(0)
+        alphabet = [chr(c) for c in range(0x00, 0x100)] + ['\u2028', '\ufffd', '\U0001F600', '\U0010FFFF']
+        for i in range(500):
+            text = ''.join(rng.choice(alphabet) for j in range(rng.randint(0, 20)))
+            self.assertSameOutput({'value': text})
+
+
+    def test_floats(self):
+        for value in FLOATS:
+            self.assertSameOutput({'value': value, 'list': [value, str(value)]})
+            self.assertEqual(ModelJSONEncoder().encode([value]), json.dumps([value]))
+
+
+    def test_non_finite_floats(self):
+        for value in (float('nan'), float('inf'), float('-inf')):
+            self.assertEqual(ModelJSONEncoder().encode([value]), json.dumps([value]))
+            with self.assertRaises(ValueError):
+                ModelJSONEncoder(allow_nan=False).encode([value])
+
+
+    def test_models(self):
+        elements = [
+            Element(
+                id='CID:{}'.format(i),
+                biolink_class='ChemicalSubstance',
+                identifiers={'pubchem': 'CID:{}'.format(i), 'names': STRINGS},
+                attributes=[Attribute(name=text, value=text, source='source') for text in STRINGS],
+                connections=[]
+            ) for i in range(3)
+        ]
+        elements[0].attributes.append(Attribute(name='score', value=FLOATS))
+        self.assertSameOutput(elements)
+
+
+    def test_model_nulls(self):
+        attribute = Attribute(name='name', value=None)
+        self.assertEqual(json.loads(ModelJSONEncoder().encode(attribute)), {'name': 'name'})
+
+
+    def test_fallback(self):
+        # non-string keys and big integers are serialized by the json module
+        for o in ({1: 'one', 2: 'two'}, [2 ** 70, -2 ** 70]):
+            self.assertEqual(ModelJSONEncoder(sort_keys=True).encode(o), json.dumps(o, sort_keys=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
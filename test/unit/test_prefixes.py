@@ -0,0 +1,66 @@
+import unittest
+
+import context  # noqa: F401
+
+from example_transformer import ExampleTransformer, compound
+
+
+class TestPrefixIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.transformer = ExampleTransformer()
+
+
+    def test_index(self):
+        index = self.transformer.prefix_index
+        self.assertEqual(index[('compound', 'chembl')], ('ChEMBL:', 'CHEMBL:'))
+        self.assertEqual(index[('gene', 'entrez')], ('NCBIGene:', 'NCBIGENE:'))
+        self.assertNotIn(('gene', 'chembl'), index)
+
+
+    def test_index_matches_prefix_map(self):
+        # the index gives the prefixes of the prefix map through the class map
+        transformer = self.transformer
+        for (molepro_class, fieldname), (prefix, upper_prefix) in transformer.prefix_index.items():
+            expected = transformer.prefix_map[transformer.biolink_class(molepro_class)][fieldname]['molepro_prefix']
+            self.assertEqual(prefix, expected)
+            self.assertEqual(upper_prefix, expected.upper())
+
+
+    def test_has_prefix(self):
+        self.assertTrue(self.transformer.has_prefix('chembl', 'ChEMBL:CHEMBL25'))
+        self.assertTrue(self.transformer.has_prefix('chembl', 'chembl:CHEMBL25'))
+        self.assertFalse(self.transformer.has_prefix('chembl', 'CHEMBL25'))
+        self.assertTrue(self.transformer.has_prefix('entrez', 'NCBIGene:1', 'gene'))
+
+
+    def test_de_prefix(self):
+        self.assertEqual(self.transformer.de_prefix('chembl', 'ChEMBL:CHEMBL25'), 'CHEMBL25')
+        self.assertEqual(self.transformer.de_prefix('entrez', 'ncbigene:7157', 'gene'), '7157')
+
+
+    def test_add_prefix(self):
+        self.assertEqual(self.transformer.add_prefix('entrez', '7157'), 'NCBIGene:7157')
+        self.assertEqual(self.transformer.add_prefix('entrez', 'NCBIGene:7157'), 'NCBIGene:7157')
+        self.assertEqual(self.transformer.add_prefix('pubchem', '2244', 'compound'), 'CID:2244')
+        self.assertEqual(self.transformer.add_prefixes('entrez', ['7157', 'ncbigene:1', '']), ['NCBIGene:7157', 'ncbigene:1', 'NCBIGene:'])
+
+
+    def test_collection_ids(self):
+        collection = [
+            compound('ChEMBL:CHEMBL25', chembl='ChEMBL:CHEMBL25'),
+            compound('CID:2244', pubchem=['CID:2244', 'cid:2244', '3672', None, '']),
+            compound('CID:1', pubchem=1),
+            compound('none')
+        ]
+        self.assertEqual([(element.id, ids) for (element, ids) in self.transformer.collection_ids(collection, 'pubchem')], [
+            ('ChEMBL:CHEMBL25', []),
+            ('CID:2244', ['2244', '3672']),
+            ('CID:1', ['1']),
+            ('none', [])
+        ])
+        self.assertEqual(self.transformer.collection_ids(collection, 'chembl')[0][1], ['CHEMBL25'])
+
+
+if __name__ == '__main__':
+    unittest.main()
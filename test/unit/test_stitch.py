@@ -0,0 +1,109 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import importlib.util
+
+import context
+
+from transformers.database import ConnectionPool
+from openapi_server.models.knowledge_map import KnowledgeMap
+from openapi_server.models.parameter import Parameter
+from openapi_server.models.predicate import Predicate
+from openapi_server.models.transformer_info import TransformerInfo
+from example_transformer import CLASS_DICT, PREFIX_MAP, compound
+
+
+# the STITCH transformer, loaded from its service (its controllers are not a package of the tested service)
+spec = importlib.util.spec_from_file_location('stitch_transformer', os.path.join(
+    context.ROOT, 'transformers', 'stitch', 'python-flask-server', 'openapi_server', 'controllers', 'stitch_transformer.py'))
+stitch = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(stitch)
+
+
+class StitchLinksTransformer(stitch.StitchLinksTransformer):
+
+    def transformer_info(self, cache):
+        self.info = TransformerInfo(
+            name='STITCH links transformer',
+            label='STITCH',
+            version='1.0.0',
+            function='transformer',
+            knowledge_map=KnowledgeMap(input_class='compound', output_class='protein', predicates=[
+                Predicate(subject='compound', predicate='interacts_with', object='protein')
+            ]),
+            parameters=[Parameter(name='score_threshold', type='int', default='0'), Parameter(name='limit', type='int', default='0')]
+        )
+        self.parameters = dict(zip(self.variables, self.info.parameters))
+        self.prefix_map = PREFIX_MAP
+        self.class_dict = CLASS_DICT
+        self.prefix_index = self.get_prefix_index(self.prefix_map, self.class_dict)
+        return self.info
+
+
+def create_database(path):
+    # integer keys, as in the database built by db/STITCH_db_generation.py
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE protein_ids (protein INTEGER PRIMARY KEY, ensembl_id TEXT);
+        CREATE TABLE actions (chemical INTEGER, protein INTEGER, mode TEXT, [action] TEXT, protein_is_acting INTEGER, score INTEGER);
+        CREATE TABLE protein_chemical_links_transfer (
+            chemical INTEGER, protein INTEGER,
+            experimental_direct INTEGER, experimental_transferred INTEGER,
+            prediction_direct INTEGER, prediction_transferred INTEGER,
+            database_direct INTEGER, database_transferred INTEGER,
+            textmining_direct INTEGER, textmining_transferred INTEGER,
+            combined_score INTEGER
+        );
+        INSERT INTO protein_ids VALUES (1, '9606.ENSP00000269305'), (2, '9606.ENSP00000275493');
+        INSERT INTO protein_chemical_links_transfer VALUES (2244, 1, 0, 0, 0, 0, 900, 0, 0, 0, 900);
+        INSERT INTO protein_chemical_links_transfer VALUES (-2244, 2, 0, 0, 0, 0, 0, 0, 500, 0, 500);
+        INSERT INTO actions VALUES (2244, 1, 'inhibition', 'inhibition', 1, 900);
+    """)
+    connection.commit()
+    connection.close()
+
+
+class TestStitchLinks(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        database = os.path.join(self.folder, 'STITCH.sqlite')
+        create_database(database)
+        self.saved = (stitch.connection, stitch.integer_ids)
+        stitch.connection = ConnectionPool(database)
+        stitch.integer_ids = None
+        self.transformer = StitchLinksTransformer()
+
+    def tearDown(self):
+        stitch.connection.close()
+        (stitch.connection, stitch.integer_ids) = self.saved
+        shutil.rmtree(self.folder)
+
+
+    def links(self, pubchem):
+        proteins = self.transformer.map([compound(pubchem, pubchem=pubchem)], {'score_threshold': 0, 'limit': 0})
+        return [(protein.id, len(protein.connections)) for protein in proteins]
+
+
+    def test_chemical_key(self):
+        self.assertEqual(stitch.chemical_key('CIDs00002244'), 2244)
+        self.assertEqual(stitch.chemical_key('CIDm00002244'), -2244)
+        self.assertIsNone(stitch.chemical_key('CIDs00000abc'))
+
+
+    def test_links(self):
+        self.assertEqual(self.links('CID:2244'), [('ENSEMBL:ENSP00000269305', 1)])
+        self.assertEqual(self.links('CID:1'), [])
+
+
+    def test_not_a_cid(self):
+        # no links (rather than an error) for a pubchem identifier that is not a number
+        self.assertEqual(self.links('CID:abc'), [])
+        self.assertEqual(self.links('CID:-2244'), [])
+        self.assertEqual(self.links('CID:'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+
+import context  # noqa: F401
+
+from flask import Flask
+
+from transformers.cache import ResponseCache
+from transformers.encoder import ModelJSONEncoder
+from transformers.streaming import NDJSON_MIMETYPE, stream_requested, ndjson_response
+from example_transformer import ExampleTransformer, compound, query
+
+
+app = Flask(__name__)
+
+
+class TestStreamedTransform(unittest.TestCase):
+
+    def test_materialized(self):
+        transformer = ExampleTransformer()
+        response = transformer.transform(query([compound('CID:1')], limit=3))
+        self.assertIsInstance(response, list)
+        self.assertEqual([gene.id for gene in response], ['NCBIGene:1', 'NCBIGene:2', 'NCBIGene:3'])
+
+
+    def test_streamed(self):
+        transformer = ExampleTransformer()
+        response = transformer.transform(query([compound('CID:1')], limit=3), stream=True)
+        self.assertNotIsInstance(response, list)
+        self.assertEqual(transformer.calls, 0)
+        self.assertEqual(next(response).id, 'NCBIGene:1')
+        self.assertEqual([gene.id for gene in response], ['NCBIGene:2', 'NCBIGene:3'])
+
+
+    def test_streamed_response_cached_when_complete(self):
+        transformer = ExampleTransformer(response_cache=ResponseCache(ttl=None))
+        transformer_query = query([compound('CID:1')], limit=2)
+        response = transformer.transform(transformer_query, stream=True)
+        next(response)
+        self.assertEqual(transformer.response_cache.stats()['size'], 0)
+        list(response)
+        cached = transformer.transform(transformer_query, stream=True)
+        self.assertEqual([gene.id for gene in cached], ['NCBIGene:1', 'NCBIGene:2'])
+        self.assertEqual(transformer.calls, 1)
+
+
+    def test_ndjson(self):
+        transformer = ExampleTransformer()
+        with app.test_request_context():
+            response = ndjson_response(transformer.transform(query([compound('CID:1')], limit=2), stream=True), ModelJSONEncoder)
+            self.assertEqual(response.mimetype, NDJSON_MIMETYPE)
+            lines = response.get_data(as_text=True).split('\n')
+        self.assertEqual(lines[-1], '')
+        self.assertEqual([json.loads(line)['id'] for line in lines[:-1]], ['NCBIGene:1', 'NCBIGene:2'])
+
+
+    def test_ndjson_error(self):
+        error = ({'status': 400, 'title': 'Bad Request', 'detail': 'invalid value', 'type': 'about:blank'}, 400)
+        self.assertIs(ndjson_response(error, ModelJSONEncoder), error)
+
+
+class TestStreamRequested(unittest.TestCase):
+
+    def requested(self, path='/transform', headers=None, stream=None):
+        with app.test_request_context(path, headers=headers) as context:
+            return stream_requested(context.request, stream)
+
+
+    def test_default(self):
+        self.assertFalse(self.requested())
+        self.assertFalse(self.requested(headers={'Accept': 'application/json'}))
+
+
+    def test_accept(self):
+        self.assertTrue(self.requested(headers={'Accept': NDJSON_MIMETYPE}))
+        self.assertFalse(self.requested(headers={'Accept': 'application/json, {};q=0.5'.format(NDJSON_MIMETYPE)}))
+
+
+    def test_flag(self):
+        self.assertTrue(self.requested('/transform?stream=true'))
+        self.assertFalse(self.requested('/transform?stream=false', headers={'Accept': NDJSON_MIMETYPE}))
+        self.assertTrue(self.requested(stream=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
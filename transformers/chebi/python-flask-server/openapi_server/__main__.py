@@ -3,6 +3,7 @@
 import connexion
 
 from openapi_server import encoder
+from transformers.server import serve
 
 app = connexion.App(__name__, specification_dir='./openapi/')
 app.app.json_encoder = encoder.JSONEncoder
@@ -11,7 +12,7 @@ app.add_api('openapi.yaml',
             pythonic_params=True)
 
 def main():
-    app.run(port=8310)
+    serve(app, port=8310)
 
 
 if __name__ == '__main__':
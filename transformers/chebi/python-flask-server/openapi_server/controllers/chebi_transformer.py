@@ -1,7 +1,7 @@
-import sqlite3
 import re
 
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool
 from openapi_server.models.compound_info import CompoundInfo
 from openapi_server.models.compound_info_identifiers import CompoundInfoIdentifiers
 from openapi_server.models.names import Names
@@ -92,7 +92,7 @@ class ChebiByNameProducer(Transformer):
         return names_list
 
 
-connection = sqlite3.connect("ChEBI.sqlite", check_same_thread=False)
+connection = ConnectionPool("ChEBI.sqlite", row_factory=None)
 
 
 def find_compound_by_name(name):
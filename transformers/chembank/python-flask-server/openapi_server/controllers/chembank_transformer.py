@@ -1,15 +1,14 @@
-import sqlite3
 from collections import defaultdict
 
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool
 
 from openapi_server.models.names import Names
 from openapi_server.models.attribute import Attribute
 from openapi_server.models.element import Element
 from openapi_server.models.connection import Connection
 
-connection = sqlite3.connect("data/ChemBank.sqlite", check_same_thread=False)
-connection.row_factory = sqlite3.Row
+connection = ConnectionPool("data/ChemBank.sqlite")
 
 
 
@@ -6,6 +6,7 @@ from openapi_server.models.error_msg import ErrorMsg  # noqa: E501
 from openapi_server.models.transformer_info import TransformerInfo  # noqa: E501
 from openapi_server.models.transformer_query import TransformerQuery  # noqa: E501
 from openapi_server import util
+from transformers.deserializer import deserialize
 
 from openapi_server.controllers.chembank_transformer import ChemBankProducer
 
@@ -27,8 +28,8 @@ def service_transform_post(service, body, cache=None):  # noqa: E501
     :rtype: List[Element]
     """
     if connexion.request.is_json:
-        transformer_query = TransformerQuery.from_dict(connexion.request.get_json())  # noqa: E501
-    return transformer[service].transform(transformer_query)
+        transformer_query = deserialize(connexion.request.get_json(), TransformerQuery)  # noqa: E501
+    return transformer[service].transform(transformer_query, cache)
 
 
 def service_transformer_info_get(service, cache=None):  # noqa: E501
@@ -0,0 +1,117 @@
+import sqlite3
+
+# Builds the compound_mechanism table of the ChEMBL database: one row per mechanism of action of
+# a molecule, with the target, binding site, source and document of the mechanism, the EnsemblGene
+# cross-references of the target components (JSON array, from ChEMBL.target.xref.sqlite, see
+# chembl_target_component_xref.py) and the ATC classification of the molecule (JSON array).
+# The targets and mechanisms transformers read this table instead of joining the ChEMBL tables.
+# Run after the ChEMBL database and target cross-references are loaded:  python chembl_mechanism_table.py
+
+connection = sqlite3.connect("data/ChEMBL.sqlite")
+
+
+def attach_target_xrefs():
+    connection.execute("ATTACH DATABASE 'data/ChEMBL.target.xref.sqlite' AS xref")
+
+
+def create_mechanism_table():
+    connection.execute("DROP TABLE IF EXISTS compound_mechanism")
+    sql = """
+        CREATE TABLE compound_mechanism (
+            chembl_id             TEXT  NOT NULL,
+            molregno              INT   NOT NULL,
+            mec_id                INT   NOT NULL,
+            mechanism_of_action   TEXT,
+            action_type           TEXT,
+            mechanism_comment     TEXT,
+            selectivity_comment   TEXT,
+            target_chembl_id      TEXT,
+            target_name           TEXT,
+            target_type           TEXT,
+            target_organism       TEXT,
+            site_name             TEXT,
+            binding_site_comment  TEXT,
+            source_description    TEXT,
+            document_chembl_id    TEXT,
+            gene_ids              TEXT  NOT NULL,
+            atc_classification    TEXT  NOT NULL
+        )
+    """
+    connection.execute(sql)
+    connection.commit()
+
+
+def load_mechanisms():
+    statement = """
+        INSERT INTO compound_mechanism
+        SELECT
+            molecule_dictionary.chembl_id,
+            drug_mechanism.molregno,
+            drug_mechanism.mec_id,
+            drug_mechanism.mechanism_of_action,
+            drug_mechanism.action_type,
+            drug_mechanism.mechanism_comment,
+            drug_mechanism.selectivity_comment,
+            target_dictionary.chembl_id,
+            target_dictionary.pref_name,
+            target_dictionary.target_type,
+            target_dictionary.organism,
+            binding_sites.site_name,
+            drug_mechanism.binding_site_comment,
+            source.src_description,
+            docs.chembl_id,
+            CASE WHEN target_dictionary.target_type IN ('SINGLE PROTEIN', 'PROTEIN FAMILY') THEN (
+                SELECT json_group_array(xref_id) FROM (
+                    SELECT component_xref.xref_id
+                    FROM target_components
+                    JOIN xref.component_xref ON component_xref.component_id = target_components.component_id
+                    WHERE target_components.tid = drug_mechanism.tid
+                    AND component_xref.xref_src_db = 'EnsemblGene'
+                    AND component_xref.xref_id IS NOT NULL
+                    ORDER BY target_components.rowid, component_xref.rowid
+                )
+            ) ELSE '[]' END,
+            (
+                SELECT json_group_array(atc) FROM (
+                    SELECT
+                        atc_classification.level1||'-'||atc_classification.level1_description||'|'||
+                        atc_classification.level2||'-'||atc_classification.level2_description||'|'||
+                        atc_classification.level3||'-'||atc_classification.level3_description||'|'||
+                        atc_classification.level4||'-'||atc_classification.level4_description||'|'||
+                        atc_classification.level5||'-'||atc_classification.who_name AS atc
+                    FROM molecule_atc_classification
+                    JOIN atc_classification ON atc_classification.level5=molecule_atc_classification.level5
+                    WHERE molecule_atc_classification.molregno = drug_mechanism.molregno
+                    ORDER BY molecule_atc_classification.rowid
+                )
+                WHERE atc IS NOT NULL
+            )
+        FROM drug_mechanism
+        JOIN molecule_dictionary ON molecule_dictionary.molregno=drug_mechanism.molregno
+        LEFT JOIN target_dictionary ON target_dictionary.tid=drug_mechanism.tid
+        LEFT JOIN binding_sites ON binding_sites.site_id=drug_mechanism.site_id
+        LEFT JOIN compound_records ON compound_records.record_id=drug_mechanism.record_id
+        LEFT JOIN docs ON (docs.doc_id=compound_records.doc_id AND compound_records.doc_id!=-1)
+        LEFT JOIN source ON source.src_id=compound_records.src_id
+        ORDER BY molecule_dictionary.chembl_id, drug_mechanism.mec_id
+    """
+    connection.execute(statement)
+    connection.commit()
+
+
+def create_index():
+    connection.execute("CREATE INDEX compound_mechanism_chembl_id_idx ON compound_mechanism(chembl_id)")
+    connection.commit()
+
+
+def main():
+    attach_target_xrefs()
+    create_mechanism_table()
+    load_mechanisms()
+    create_index()
+    print(connection.execute("SELECT COUNT(*) FROM compound_mechanism").fetchone()[0], "mechanisms loaded")
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
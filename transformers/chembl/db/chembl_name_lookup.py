@@ -0,0 +1,61 @@
+import sqlite3
+
+# Builds the name_lookup table of the ChEMBL database: preferred names and synonyms of molecules,
+# keyed by the lower-case name, so that the ChEMBL producer resolves all query names with one query.
+# Run after the ChEMBL database is loaded:  python chembl_name_lookup.py
+
+connection = sqlite3.connect("data/ChEMBL.sqlite")
+
+
+def create_name_lookup_table():
+    connection.execute("DROP TABLE IF EXISTS name_lookup")
+    sql = """
+        CREATE TABLE name_lookup (
+            name      TEXT  NOT NULL,
+            original  TEXT  NOT NULL,
+            kind      TEXT  NOT NULL,
+            molregno  INT   NOT NULL
+        )
+    """
+    connection.execute(sql)
+    connection.commit()
+
+
+def load_preferred_names():
+    statement = """
+        INSERT INTO name_lookup(name, original, kind, molregno)
+        SELECT lower(pref_name), pref_name, 'pref_name', molregno
+        FROM molecule_dictionary
+        WHERE pref_name IS NOT NULL
+    """
+    connection.execute(statement)
+    connection.commit()
+
+
+def load_synonyms():
+    statement = """
+        INSERT INTO name_lookup(name, original, kind, molregno)
+        SELECT DISTINCT lower(synonyms), synonyms, 'synonym', molregno
+        FROM molecule_synonyms
+        WHERE synonyms IS NOT NULL
+    """
+    connection.execute(statement)
+    connection.commit()
+
+
+def create_index():
+    connection.execute("CREATE INDEX name_lookup_name_idx ON name_lookup(name)")
+    connection.commit()
+
+
+def main():
+    create_name_lookup_table()
+    load_preferred_names()
+    load_synonyms()
+    create_index()
+    print(connection.execute("SELECT COUNT(*) FROM name_lookup").fetchone()[0], "names loaded")
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+import sys
+import struct
 import requests
 import sqlite3
 import json
@@ -7,6 +9,13 @@ CHEMBL_TARGETS_URL = 'https://www.ebi.ac.uk/chembl/api/data/target.json?limit=20
 
 connection = sqlite3.connect("data/ChEMBL.target.xref.sqlite", check_same_thread=False)
 
+# Component-to-EnsemblGene map read by the ChEMBL target transformer (memory-mapped at startup):
+# a header (magic, number of records, width of gene ids) followed by fixed-size records
+# (component id, NUL-padded gene id) sorted by component id
+ENSEMBL_MAP_FILE = "data/ChEMBL.component.ensembl.bin"
+ENSEMBL_MAP_MAGIC = b'CHEMBLXE'
+ENSEMBL_MAP_HEADER = struct.Struct('<8sII')
+
 loaded_components = set()
 
 
@@ -89,6 +98,23 @@ def load_component_xrefs(cur, target):
                         insert_component_xref(cur, component_id, xref['xref_id'], xref['xref_name'], xref['xref_src_db'])
 
 
+def write_ensembl_map(path=ENSEMBL_MAP_FILE):
+    query = """
+        SELECT component_id, xref_id
+        FROM component_xref
+        WHERE xref_src_db = 'EnsemblGene' AND xref_id IS NOT NULL
+        ORDER BY component_id, rowid
+    """
+    rows = [(component_id, xref_id.encode('ascii')) for (component_id, xref_id) in connection.execute(query)]
+    width = max((len(xref_id) for (component_id, xref_id) in rows), default=1)
+    record = struct.Struct('<I{}s'.format(width))
+    with open(path, 'wb') as f:
+        f.write(ENSEMBL_MAP_HEADER.pack(ENSEMBL_MAP_MAGIC, len(rows), width))
+        for (component_id, xref_id) in rows:
+            f.write(record.pack(component_id, xref_id))
+    print(len(rows), "EnsemblGene cross-references written to", path)
+
+
 def main():
     create_target_xref_table()
     create_component_table()
@@ -109,8 +135,16 @@ def main():
         sleep(10)
         print(response['page_meta']['next'])
         response = requests.get('https://www.ebi.ac.uk'+response['page_meta']['next']).json()
+    connection.commit()
+    write_ensembl_map()
     connection.close()
 
 
+# python chembl_target_component_xref.py            load cross-references and write the EnsemblGene map
+# python chembl_target_component_xref.py ensembl    only write the EnsemblGene map of loaded cross-references
 if __name__ == '__main__':
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == 'ensembl':
+        write_ensembl_map()
+        connection.close()
+    else:
+        main()
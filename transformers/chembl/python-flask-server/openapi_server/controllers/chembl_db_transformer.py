@@ -1,8 +1,13 @@
-import sqlite3
+import os
 import re
+import json
+import mmap
+import struct
+from bisect import bisect_left
 from collections import defaultdict
 
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool, select_many
 from openapi_server.models.element import Element
 from openapi_server.models.names import Names
 from openapi_server.models.connection import Connection
@@ -36,15 +41,70 @@ class ChemblProducer(Transformer):
 
     def produce(self, controls):
         compound_list = []
-        names = controls['compounds'].split(';')
+        names = [name.strip() for name in controls['compounds'].split(';')]
+        if has_name_lookup():
+            (rows, synonyms) = self.find_compounds(names)
+            find_compound = lambda name: [self.row_to_element(row, synonyms[row['molregno']]) for row in rows[name]]
+        else:
+            find_compound = self.find_compound
         for name in names:
-            name = name.strip()
-            for compound in self.find_compound(name):
+            for compound in find_compound(name):
                 compound.attributes.append(Attribute(name='query name', value=name,source=SOURCE,provided_by=self.info.name))
                 compound_list.append(compound)
         return compound_list
 
 
+    def find_compounds(self, names):
+        """
+            Find compounds for all query names with a few queries: ChEMBL ids and InChIKeys
+            are looked up directly, other names in the name_lookup table. Returns a dictionary
+            of name -> compound rows and a dictionary of molregno -> synonyms of the compounds.
+        """
+        chembl_ids = {}
+        inchikeys = {}
+        other_names = []
+        for name in set(names):
+            if name.upper().startswith('CHEMBL:'):
+                chembl_ids[name] = name[7:]
+            elif name.upper().startswith('CHEMBL'):
+                chembl_ids[name] = name
+            elif inchikey_regex.match(name) is not None:
+                inchikeys[name] = name
+            else:
+                other_names.append(name)
+        by_chembl_id = get_compounds_by('molecule_dictionary.chembl_id', chembl_ids.values())
+        by_inchikey = get_compounds_by('compound_structures.standard_inchi_key', inchikeys.values())
+        name_matches = lookup_names(other_names + [name.upper() for name in other_names])
+        by_molregno = get_compounds_by('molecule_dictionary.molregno',
+            set(match['molregno'] for matches in name_matches.values() for match in matches))
+
+        found = {}
+        for name, chembl_id in chembl_ids.items():
+            found[name] = by_chembl_id.get(chembl_id, [])
+        for name, inchikey in inchikeys.items():
+            found[name] = by_inchikey.get(inchikey, [])
+        for name in other_names:
+            found[name] = self.match_name(name, name_matches, by_molregno)
+        molregnos = set(row['molregno'] for rows in found.values() for row in rows)
+        return found, get_molecule_synonyms_many(molregnos)
+
+
+    def match_name(self, name, name_matches, by_molregno):
+        """
+            Select compounds matching the name in the same order of preference as find_compound:
+            upper-case preferred name, preferred name as given, then synonym (ignoring case).
+        """
+        for (lookup, kind, original) in [(name.upper(), 'pref_name', name.upper()), (name, 'pref_name', name), (name, 'synonym', None)]:
+            molregnos = []
+            for match in name_matches.get(lookup, []):
+                if match['kind'] == kind and (original is None or match['original'] == original):
+                    if match['molregno'] not in molregnos and match['molregno'] in by_molregno:
+                        molregnos.append(match['molregno'])
+            if len(molregnos) > 0:
+                return [row for molregno in sorted(molregnos) for row in by_molregno[molregno]]
+        return []
+
+
     def find_compound(self, name):
         if name.upper().startswith('CHEMBL:'):
             return self.molecules(get_compound_by_id(name[7:]))
@@ -69,7 +129,7 @@ class ChemblProducer(Transformer):
         return compounds
 
 
-    def row_to_element(self, row):
+    def row_to_element(self, row, synonyms=None):
         id = CHEMBL + row['chembl_id']
         identifiers = {
             'chembl': id,
@@ -81,7 +141,7 @@ class ChemblProducer(Transformer):
             id=id,
             biolink_class=CHEMICAL_SUBSTANCE,
             identifiers=identifiers,
-            names_synonyms=self.get_names_synonyms(row['chembl_id'],row['pref_name'],row['molregno']),
+            names_synonyms=self.get_names_synonyms(row['chembl_id'],row['pref_name'],row['molregno'],synonyms),
             attributes = [],
             connections=[],
             source=self.info.name
@@ -92,12 +152,14 @@ class ChemblProducer(Transformer):
         return element
 
 
-    def get_names_synonyms(self, id, pref_name, molregno):
+    def get_names_synonyms(self, id, pref_name, molregno, molecule_synonyms=None):
         """
             Build names and synonyms list
         """
+        if molecule_synonyms is None:
+            molecule_synonyms = get_molecule_synonyms(molregno)
         synonyms = defaultdict(list)
-        for molecule_synonym in get_molecule_synonyms(molregno):
+        for molecule_synonym in molecule_synonyms:
             if molecule_synonym['syn_type'] is None:
                 synonyms['ChEMBL'].append(molecule_synonym['synonyms'])
             else:
@@ -158,8 +220,7 @@ class ChemblTargetTransformer(Transformer):
     def map(self, collection, controls):
         gene_list = []
         genes = {}
-        for compound in collection:
-            targets = self.get_targets(compound)
+        for compound, targets in self.get_targets(collection):
             for target in targets:
                 gene_id = ENSEMBL+target['gene_id']
                 gene = genes.get(gene_id)
@@ -178,18 +239,32 @@ class ChemblTargetTransformer(Transformer):
         return gene_list
 
 
-    def get_targets(self, compound):
-        target_list = []
-        id = chembl_id(compound.identifiers)
-        if id is not None:
-            for target in get_targets(id):
-                connection = self.create_connection(compound, target)
-                for gene_id in target_xref(target['component_id']):
+    # Resolves targets, EnsemblGene cross-references, and mechanism references
+    # of all compounds of the collection with one query each
+    def get_targets(self, collection):
+        compound_ids = [(compound, chembl_id(compound.identifiers)) for compound in collection]
+        ids = set(id for (compound, id) in compound_ids if id is not None)
+        if has_mechanism_table():
+            targets = get_mechanism_targets(ids)
+            target_genes = lambda target: json.loads(target['gene_ids'])
+        else:
+            targets = get_targets(ids)
+            xrefs = target_xrefs_many(set(target['component_id'] for target_list in targets.values() for target in target_list))
+            target_genes = lambda target: xrefs.get(target['component_id'], [])
+        rows = [target for target_list in targets.values() for target in target_list]
+        references = get_refs_many('mechanism_refs', 'mec_id', set(target['mec_id'] for target in rows))
+        batch = []
+        for compound, id in compound_ids:
+            target_list = []
+            for target in targets.get(id, []):
+                connection = self.create_connection(compound, target, references.get(target['mec_id'], []))
+                for gene_id in target_genes(target):
                     target_list.append({'gene_id':gene_id, 'connection': connection})
-        return target_list
+            batch.append((compound, target_list))
+        return batch
 
 
-    def create_connection(self, compound, target):
+    def create_connection(self, compound, target, references):
         connection = Connection(
             source_element_id=compound.id,
             type = self.info.knowledge_map.predicates[0].predicate,
@@ -197,7 +272,7 @@ class ChemblTargetTransformer(Transformer):
         )
         add_attribute(self, connection, target, 'action_type')
         add_attribute(self, connection, target,'mechanism_of_action')
-        add_references(self, connection, 'mechanism_refs', 'mec_id', target['mec_id'])
+        add_references(self, connection, 'mechanism_refs', 'mec_id', target['mec_id'], references)
         return connection
 
 
@@ -297,28 +372,35 @@ class ChemblIndicationsExporter(Transformer):
 
 class ChemblAssayExporter(Transformer):
 
-    variables = []
+    variables = ['limit', 'offset', 'cursor', 'minimum pchembl', 'standard type', 'target organism']
 
     def __init__(self):
         super().__init__(self.variables, definition_file='info/assays_transformer_info.json')
 
 
     def export(self, collection, controls):
-        assay_list = []
-        assays = {}
+        ids = []
         for element in collection:
             id = chembl_id(element.identifiers)
-            if id is not None:
-                for row in get_activities(id):
-                    assay = self.get_or_create_assay(row, assays, assay_list)
-                    self.add_connection(id, assay, row)
-        return assay_list
-
-
-    def get_or_create_assay(self, row, assays, assay_list):
+            if id is not None and id not in ids:
+                ids.append(id)
+        if len(ids) == 0:
+            return
+        # activities are read in the order of assays, so an assay is complete (connected to all compounds)
+        # once the next assay starts and is yielded right away; only one assay is held in memory
+        assay = None
+        for row in get_activities(ids, controls):
+            if assay is None or assay.id != CHEMBL + row['assay_chembl_id']:
+                if assay is not None:
+                    yield assay
+                assay = self.create_assay(row)
+            self.add_connection(row['compound_chembl_id'], assay, row)
+        if assay is not None:
+            yield assay
+
+
+    def create_assay(self, row):
         assay_id = CHEMBL + row['assay_chembl_id']
-        if assay_id in assays:
-            return assays[assay_id]
         names = Names(
             name = row['assay_description'] if row['assay_description'] is not None else assay_id,
             synonyms = [],
@@ -346,8 +428,6 @@ class ChemblAssayExporter(Transformer):
         add_attribute(self,assay,row,'assay_tissue_name')
         add_attribute(self,assay,row,'assay_cell_type')
         add_attribute(self,assay,row,'assay_subcellular_fraction')
-        assays[assay_id] = assay
-        assay_list.append(assay)
         return assay
 
 
@@ -392,6 +472,17 @@ class ChemblMechanismExporter(Transformer):
     def export(self, collection, controls):
         mechanism_list = []
         mechanisms = {}
+        if has_mechanism_table():
+            # all mechanisms, mechanism references and ATC classifications with two queries
+            ids = [chembl_id(element.identifiers) for element in collection]
+            compound_mechanisms = get_compound_mechanisms(set(id for id in ids if id is not None))
+            rows = [row for row_list in compound_mechanisms.values() for row in row_list]
+            references = get_refs_many('mechanism_refs', 'mec_id', set(row['mec_id'] for row in rows))
+            for id in ids:
+                for row in compound_mechanisms.get(id, []):
+                    mechanism = self.get_or_create_mechanism(row, mechanisms, mechanism_list)
+                    self.add_connection(id, mechanism, row, references.get(row['mec_id'], []), json.loads(row['atc_classification']))
+            return mechanism_list
         for element in collection:
             id = chembl_id(element.identifiers)
             if id is not None:
@@ -423,7 +514,7 @@ class ChemblMechanismExporter(Transformer):
         return mechanism
 
 
-    def add_connection(self, id, mechanism, row):
+    def add_connection(self, id, mechanism, row, references=None, atc_classification=None):
         connection = Connection(
             source_element_id=CHEMBL+id,
             attributes=[],
@@ -443,18 +534,22 @@ class ChemblMechanismExporter(Transformer):
             reference.url = DOC_URL + reference.value
             reference.value = CHEMBL + reference.value
             reference.type = 'publication'
-        add_references(self, connection, 'mechanism_refs', 'mec_id', row['mec_id'])
-        self.add_atc_classification(connection,row['molregno'])
+        add_references(self, connection, 'mechanism_refs', 'mec_id', row['mec_id'], references)
+        self.add_atc_classification(connection,row['molregno'],atc_classification)
         mechanism.connections.append(connection)
 
 
-    def add_atc_classification(self, connection, molregno):
-        for atc in get_atc_classification(molregno):
-            value  = atc['level1']+'-'+atc['level1_description']+'|'
-            value += atc['level2']+'-'+atc['level2_description']+'|'
-            value += atc['level3']+'-'+atc['level3_description']+'|'
-            value += atc['level4']+'-'+atc['level4_description']+'|'
-            value += atc['level5']+'-'+atc['level5_description']
+    def add_atc_classification(self, connection, molregno, atc_classification=None):
+        if atc_classification is None:
+            atc_classification = []
+            for atc in get_atc_classification(molregno):
+                value  = atc['level1']+'-'+atc['level1_description']+'|'
+                value += atc['level2']+'-'+atc['level2_description']+'|'
+                value += atc['level3']+'-'+atc['level3_description']+'|'
+                value += atc['level4']+'-'+atc['level4_description']+'|'
+                value += atc['level5']+'-'+atc['level5_description']
+                atc_classification.append(value)
+        for value in atc_classification:
             connection.attributes.append(
                 Attribute(
                     name='atc_classification',
@@ -558,8 +653,10 @@ def add_attribute(transformer, element, row, name):
     return None
 
 
-def add_references(transformer, connection, ref_table, id_column, ref_id):
-    for reference in get_refs(ref_table, id_column, ref_id):
+def add_references(transformer, connection, ref_table, id_column, ref_id, references=None):
+    if references is None:
+        references = get_refs(ref_table, id_column, ref_id)
+    for reference in references:
         connection.attributes.append(
             Attribute(
                 name=reference['ref_type'],
@@ -579,8 +676,7 @@ def add_ref_prefix(ref_type, ref_id):
     return ref_id
 
 
-connection = sqlite3.connect("data/ChEMBL.sqlite", check_same_thread=False)
-connection.row_factory = sqlite3.Row
+connection = ConnectionPool("data/ChEMBL.sqlite")
 
 
 def get_compound_by_pref_name(name):
@@ -611,7 +707,21 @@ def get_compound_by_synonym(synonym):
     return get_compound(join, '', synonym)
 
 
-def get_compound(join, where, name):
+def get_compounds_by(column, values):
+    """
+        Find compounds by a list of values of the column, returns a dictionary of value -> rows
+    """
+    compounds = defaultdict(list)
+    values = list(values)
+    if len(values) == 0:
+        return compounds
+    where = 'WHERE {} IN (SELECT value FROM json_each(?))'.format(column)
+    for row in get_compound('', where, json.dumps(values), key_column=column):
+        compounds[row['lookup_key']].append(row)
+    return compounds
+
+
+def get_compound(join, where, name, key_column=None):
     query = """
         SELECT
             molecule_dictionary.molregno,
@@ -647,12 +757,12 @@ def get_compound(join, where, name):
 
             compound_structures.standard_inchi,
             compound_structures.standard_inchi_key,
-            compound_structures.canonical_smiles
+            compound_structures.canonical_smiles{}
         FROM molecule_dictionary
         JOIN compound_structures ON (compound_structures.molregno = molecule_dictionary.molregno)
         {}
         {}
-    """.format(join, where)
+    """.format(',\n            {} AS lookup_key'.format(key_column) if key_column is not None else '', join, where)
     cur = connection.cursor()
     cur.execute(query,(name,))
     return cur.fetchall()
@@ -669,6 +779,42 @@ def get_molecule_synonyms(molregno):
     return cur.fetchall()
 
 
+def get_molecule_synonyms_many(molregnos):
+    query = """
+        SELECT molregno, syn_type, synonyms
+        FROM molecule_synonyms
+        WHERE molregno IN (SELECT value FROM json_each(?))
+    """
+    return select_many(connection, query, molregnos, 'molregno')
+
+
+name_lookup = None
+
+
+def has_name_lookup():
+    """
+        Check whether the name_lookup table (see db/chembl_name_lookup.py) is in the database
+    """
+    global name_lookup
+    if name_lookup is None:
+        cur = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'name_lookup'")
+        name_lookup = len(cur.fetchall()) > 0
+    return name_lookup
+
+
+def lookup_names(names):
+    """
+        Find preferred names and synonyms matching the names (ignoring case) in the
+        name_lookup table, returns a dictionary of name -> list of matches
+    """
+    query = """
+        SELECT query.value AS query_name, name_lookup.kind, name_lookup.original, name_lookup.molregno
+        FROM (SELECT DISTINCT value FROM json_each(?)) AS query
+        JOIN name_lookup ON name_lookup.name = lower(query.value)
+    """
+    return select_many(connection, query, names, 'query_name')
+
+
 def get_indications(chembl_id):
     query = """
         SELECT drug_indication.drugind_id,
@@ -690,9 +836,58 @@ def get_indications(chembl_id):
     return cur.fetchall()
 
 
-def get_activities(chembl_id):
+ACTIVITIES_FROM = """
+        FROM activities
+        JOIN molecule_dictionary ON activities.molregno=molecule_dictionary.molregno
+        JOIN assays ON activities.assay_id=assays.assay_id
+        LEFT JOIN target_dictionary ON target_dictionary.tid=assays.tid
+"""
+
+
+ASSAY_PAGE_SIZE = 100
+
+
+def get_activities(chembl_ids, controls):
+    """
+        Activities of the compounds, ordered by assay (assay_id). The controls select the assays: filters
+        on pChEMBL value, standard type and target organism, and a page of assays given by limit and
+        offset, or by a cursor (ChEMBL id of the last assay of the previous page).
+        The assays are selected first; their activities are then read ASSAY_PAGE_SIZE assays at a time,
+        so that only the activities of one page of assays are sorted.
+    """
+    (where, params) = activity_filters(chembl_ids, controls)
+    limit = int(controls['limit']) if controls['limit'] not in (None, '') else 0
+    offset = int(controls['offset']) if controls['offset'] not in (None, '') else 0
+    assay_ids = get_assay_ids(where, params, limit, offset)
+    for start in range(0, len(assay_ids), ASSAY_PAGE_SIZE):
+        yield from get_assay_activities(assay_ids[start:start+ASSAY_PAGE_SIZE], where, params)
+
+
+def get_assay_ids(where, params, limit, offset):
+    """
+        Ids (assay_id) of the assays with activities selected by the WHERE clause, in order (limit 0: all assays)
+    """
+    query = """
+        SELECT DISTINCT activities.assay_id
+        {}
+        {}
+        ORDER BY activities.assay_id
+        LIMIT ? OFFSET ?
+    """.format(ACTIVITIES_FROM, where)
+    cur = connection.cursor()
+    cur.execute(query, params + [limit if limit > 0 else -1, offset])
+    return [row['assay_id'] for row in cur.fetchall()]
+
+
+def get_assay_activities(assay_ids, where, params):
+    """
+        Activities of the given assays selected by the WHERE clause, ordered by assay
+    """
+    where = where + ' AND activities.assay_id IN (SELECT value FROM json_each(?))'
+    params = params + [json.dumps(assay_ids)]
     query = """
         SELECT
+            molecule_dictionary.chembl_id AS compound_chembl_id,
             activities.activity_id,
             activities.standard_type,
             activities.standard_relation,
@@ -725,22 +920,44 @@ def get_activities(chembl_id):
             assays.assay_subcellular_fraction,
             docs.journal,
             docs.year
-        FROM activities
-        JOIN molecule_dictionary ON activities.molregno=molecule_dictionary.molregno
-        JOIN assays ON activities.assay_id=assays.assay_id
+        {}
         LEFT JOIN bioassay_ontology on bioassay_ontology.bao_id = assays.bao_format
-        LEFT JOIN target_dictionary ON target_dictionary.tid=assays.tid
         LEFT JOIN cell_dictionary ON cell_dictionary.cell_id=assays.cell_id
         LEFT JOIN assay_type ON assay_type.assay_type=assays.assay_type
         LEFT JOIN tissue_dictionary ON tissue_dictionary.tissue_id=assays.tissue_id
         LEFT JOIN docs ON activities.doc_id=docs.doc_id
         LEFT JOIN source ON source.src_id = activities.src_id
         LEFT JOIN ligand_eff ON ligand_eff.activity_id=activities.activity_id
-        WHERE molecule_dictionary.chembl_id = ?
-    """
+        {}
+        ORDER BY activities.assay_id, activities.activity_id
+    """.format(ACTIVITIES_FROM, where)
+    # rows are read from the cursor as they are consumed
     cur = connection.cursor()
-    cur.execute(query,(chembl_id,))
-    return cur.fetchall()
+    cur.execute(query,params)
+    return cur
+
+
+def activity_filters(chembl_ids, controls):
+    """
+        WHERE clause and its parameters for the compounds and the filter controls of the assay exporter
+    """
+    where = 'WHERE molecule_dictionary.chembl_id IN (SELECT value FROM json_each(?))'
+    params = [json.dumps(list(chembl_ids))]
+    if controls['minimum pchembl'] not in (None, ''):
+        where = where + ' AND activities.pchembl_value >= ?'
+        params.append(float(controls['minimum pchembl']))
+    if controls['standard type'] not in (None, ''):
+        standard_types = [value.strip() for value in str(controls['standard type']).split(';') if value.strip() != '']
+        where = where + ' AND activities.standard_type IN (SELECT value FROM json_each(?))'
+        params.append(json.dumps(standard_types))
+    if controls['target organism'] not in (None, ''):
+        where = where + ' AND target_dictionary.organism = ? COLLATE NOCASE'
+        params.append(controls['target organism'])
+    if controls['cursor'] not in (None, ''):
+        cursor = str(controls['cursor'])
+        where = where + ' AND activities.assay_id > (SELECT assay_id FROM assays WHERE chembl_id = ?)'
+        params.append(cursor[len(CHEMBL):] if cursor.startswith(CHEMBL) else cursor)
+    return where, params
 
 
 def get_mechanisms(chembl_id):
@@ -774,9 +991,10 @@ def get_mechanisms(chembl_id):
     return cur.fetchall()
 
 
-def get_targets(chembl_id):
+def get_targets(chembl_ids):
     query = """
         SELECT 
+            molecule_dictionary.chembl_id,
             drug_mechanism.mec_id,
             drug_mechanism.mechanism_of_action,
             drug_mechanism.action_type,
@@ -787,11 +1005,42 @@ def get_targets(chembl_id):
         JOIN target_dictionary ON target_dictionary.tid=drug_mechanism.tid
         JOIN target_components ON target_components.tid = drug_mechanism.tid
         WHERE (target_dictionary.target_type = 'SINGLE PROTEIN' OR target_dictionary.target_type = 'PROTEIN FAMILY')
-        AND molecule_dictionary.chembl_id = ?;
+        AND molecule_dictionary.chembl_id IN (SELECT value FROM json_each(?));
     """
-    cur = connection.cursor()
-    cur.execute(query,(chembl_id,))
-    return cur.fetchall()
+    return select_many(connection, query, chembl_ids, 'chembl_id')
+
+
+mechanism_table = None
+
+
+def has_mechanism_table():
+    """
+        Check whether the compound_mechanism table (see db/chembl_mechanism_table.py) is in the database
+    """
+    global mechanism_table
+    if mechanism_table is None:
+        cur = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'compound_mechanism'")
+        mechanism_table = len(cur.fetchall()) > 0
+    return mechanism_table
+
+
+def get_compound_mechanisms(chembl_ids, where=''):
+    """
+        Mechanisms of the compounds from the compound_mechanism table,
+        returns a dictionary of chembl_id -> list of mechanisms
+    """
+    query = """
+        SELECT *
+        FROM compound_mechanism
+        WHERE chembl_id IN (SELECT value FROM json_each(?))
+        {}
+        ORDER BY chembl_id, mec_id
+    """.format(where)
+    return select_many(connection, query, chembl_ids, 'chembl_id')
+
+
+def get_mechanism_targets(chembl_ids):
+    return get_compound_mechanisms(chembl_ids, "AND target_type IN ('SINGLE PROTEIN', 'PROTEIN FAMILY')")
 
 
 def get_atc_classification(molregno):
@@ -858,28 +1107,83 @@ def get_refs(ref_table, id_column, ref_id):
     return cur.fetchall()
 
 
-target_xref_con = sqlite3.connect("data/ChEMBL.target.xref.sqlite", check_same_thread=False)
-target_xref_con.row_factory = sqlite3.Row
+def get_refs_many(ref_table, id_column, ref_ids):
+    query = """
+        SELECT {}, ref_type, ref_id, ref_url
+        FROM {}
+        WHERE {} IN (SELECT value FROM json_each(?))
+    """.format(id_column, ref_table, id_column)
+    return select_many(connection, query, ref_ids, id_column)
+
+
+target_xref_con = ConnectionPool("data/ChEMBL.target.xref.sqlite")
 
-target_xrefs = {}
+
+class ComponentEnsemblMap:
+    """
+        EnsemblGene cross-references of target components, memory-mapped from the file written by
+        chembl/db/chembl_target_component_xref.py: a header (magic, number of records, width of
+        gene ids) followed by fixed-size records (component id, NUL-padded gene id) sorted by
+        component id. Lookups are binary searches; the pages are shared by all worker processes.
+    """
+
+    MAGIC = b'CHEMBLXE'
+    HEADER = struct.Struct('<8sII')
+
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.count, width) = self.HEADER.unpack_from(self.map, 0)
+        if magic != self.MAGIC:
+            raise ValueError("'{}' is not a component EnsemblGene map".format(path))
+        self.record = struct.Struct('<I{}s'.format(width))
+        self.key = struct.Struct('<I')
+
+
+    def __len__(self):
+        return self.count
+
+
+    def __getitem__(self, index):
+        # component id of the index-th record (the sequence searched by bisect)
+        if index < 0 or index >= self.count:
+            raise IndexError(index)
+        return self.key.unpack_from(self.map, self.HEADER.size + index * self.record.size)[0]
+
+
+    def get(self, component_id):
+        gene_ids = []
+        index = bisect_left(self, component_id)
+        while index < self.count:
+            (key, gene_id) = self.record.unpack_from(self.map, self.HEADER.size + index * self.record.size)
+            if key != component_id:
+                break
+            gene_ids.append(gene_id.rstrip(b'\0').decode('ascii'))
+            index += 1
+        return gene_ids
+
+
+def load_component_ensembl_map(path):
+    if os.path.exists(path):
+        return ComponentEnsemblMap(path)
+    print("WARNING: {} not found, EnsemblGene cross-references are read from the database".format(path))
+    return None
 
 
-def target_xref(component_id):
-    if component_id not in target_xrefs:
-        target_xrefs[component_id] = get_target_xrefs(component_id)
-    return target_xrefs[component_id]
+target_xref_map = load_component_ensembl_map("data/ChEMBL.component.ensembl.bin")
 
 
-def get_target_xrefs(component_id):
+# EnsemblGene cross-references of the given components, from the memory-mapped component map
+# or, without the map, from the database (all components are looked up with one query)
+def target_xrefs_many(component_ids):
+    if target_xref_map is not None:
+        return {component_id: target_xref_map.get(component_id) if component_id is not None else [] for component_id in component_ids}
     query = """
-        SELECT xref_id
+        SELECT component_id, xref_id
         FROM component_xref
         WHERE component_xref.xref_src_db = 'EnsemblGene'
-        AND component_id = ?
+        AND component_id IN (SELECT value FROM json_each(?))
     """
-    xrefs = []
-    cur = target_xref_con.cursor()
-    cur.execute(query,(component_id,))
-    for xref in cur.fetchall():
-        xrefs.append(xref['xref_id'])
-    return xrefs
+    xrefs = select_many(target_xref_con, query, set(component_ids), 'component_id')
+    return {component_id: [xref['xref_id'] for xref in xrefs.get(component_id, [])] for component_id in component_ids}
@@ -6,6 +6,9 @@ from openapi_server.models.error_msg import ErrorMsg  # noqa: E501
 from openapi_server.models.transformer_info import TransformerInfo  # noqa: E501
 from openapi_server.models.transformer_query import TransformerQuery  # noqa: E501
 from openapi_server import util
+from transformers.deserializer import deserialize
+from openapi_server import encoder
+from transformers.streaming import stream_requested, ndjson_response
 
 from openapi_server.controllers.chembl_db_transformer import ChemblProducer
 from openapi_server.controllers.chembl_db_transformer import ChemblTargetTransformer
@@ -23,7 +26,7 @@ transformer = {
     'metabolites': ChemblMetaboliteTransformer()
 }
 
-def service_transform_post(service, body):  # noqa: E501
+def service_transform_post(service, body, stream=None):  # noqa: E501
     """Transform a list of genes or compounds
 
     Depending on the function of a transformer, creates, expands, or filters a list. # noqa: E501
@@ -32,11 +35,15 @@ def service_transform_post(service, body):  # noqa: E501
     :type service: str
     :param transformer_query: transformer query
     :type transformer_query: dict | bytes
+    :param stream: Stream the elements as newline-delimited JSON
+    :type stream: bool
 
     :rtype: List[Element]
     """
     if connexion.request.is_json:
-        transformer_query = TransformerQuery.from_dict(connexion.request.get_json())  # noqa: E501
+        transformer_query = deserialize(connexion.request.get_json(), TransformerQuery)  # noqa: E501
+    if stream_requested(connexion.request, stream):
+        return ndjson_response(transformer[service].transform(transformer_query, stream=True), encoder.JSONEncoder)
     return transformer[service].transform(transformer_query)
 
 
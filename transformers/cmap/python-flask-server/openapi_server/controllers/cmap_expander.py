@@ -106,14 +106,14 @@ class CmapExpander(Transformer):
                     source = 'CMAP',
                     provided_by = self.info.name
                 ),
-                Attribute(
+                self.constant(Attribute,
                     name = 'reference',
                     value = 'PMID:29195078',
                     type = 'reference',
                     source = 'CMAP',
                     provided_by = self.info.name
                 ),
-                Attribute(
+                self.constant(Attribute,
                     name = 'about CMAP',
                     value = 'https://clue.io/cmap',
                     type = 'about CMAP',
@@ -121,7 +121,7 @@ class CmapExpander(Transformer):
                     url = 'https://clue.io/cmap',
                     provided_by = self.info.name
                 ),
-                Attribute(
+                self.constant(Attribute,
                     name = 'CMAP touchstone data version',
                     value = self.get_version(),
                     type = 'CMAP touchstone data version',
@@ -6,6 +6,7 @@ from openapi_server.models.error_msg import ErrorMsg  # noqa: E501
 from openapi_server.models.transformer_info import TransformerInfo  # noqa: E501
 from openapi_server.models.transformer_query import TransformerQuery  # noqa: E501
 from openapi_server import util
+from transformers.deserializer import deserialize
 
 
 from openapi_server.controllers.cmap_expander import CmapExpander
@@ -39,7 +40,7 @@ def input_class_output_class_transform_post(input_class, output_class, body):  #
     :rtype: List[Element]
     """
     if connexion.request.is_json:
-        transformer_query = TransformerQuery.from_dict(connexion.request.get_json())  # noqa: E501
+        transformer_query = deserialize(connexion.request.get_json(), TransformerQuery)  # noqa: E501
     if input_class in classes and output_class in classes:
         return transformers[input_class][output_class].transform(transformer_query)
     else:
@@ -15,6 +15,26 @@ class Attribute(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'name': str,
+        'value': str,
+        'type': str,
+        'source': str,
+        'url': str,
+        'provided_by': str
+    }
+
+    attribute_map = {
+        'name': 'name',
+        'value': 'value',
+        'type': 'type',
+        'source': 'source',
+        'url': 'url',
+        'provided_by': 'provided_by'
+    }
+
+    __slots__ = ('_name', '_value', '_type', '_source', '_url', '_provided_by')
+
     def __init__(self, name=None, value=None, type=None, source=None, url=None, provided_by=None):  # noqa: E501
         """Attribute - a model defined in OpenAPI
 
@@ -31,24 +51,6 @@ class Attribute(Model):
         :param provided_by: The provided_by of this Attribute.  # noqa: E501
         :type provided_by: str
         """
-        self.openapi_types = {
-            'name': str,
-            'value': str,
-            'type': str,
-            'source': str,
-            'url': str,
-            'provided_by': str
-        }
-
-        self.attribute_map = {
-            'name': 'name',
-            'value': 'value',
-            'type': 'type',
-            'source': 'source',
-            'url': 'url',
-            'provided_by': 'provided_by'
-        }
-
         self._name = name
         self._value = value
         self._type = type
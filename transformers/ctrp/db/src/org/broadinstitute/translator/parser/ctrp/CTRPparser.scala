@@ -37,6 +37,7 @@ object CTRPparser {
     loadContext(root + "/CTRP_AUCv3xAUCv3_context_metadata.txt")
     loadCorrelations(root + "/CTRP_AUCv3xAUCv3_correlation_with_fdr.csv", compounds)
     DB.createIndexes()
+    DB.insertStatistics()
     DB.commit()
     DB.close()
   }
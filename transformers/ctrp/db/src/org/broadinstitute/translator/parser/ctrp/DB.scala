@@ -9,6 +9,7 @@ object DB extends DbBuilder {
     createCompoundTable()
     createContextTable()
     createCorrelationTable()
+    createStatisticsTable()
   }
 
   def createCompoundTable() {
@@ -97,5 +98,28 @@ object DB extends DbBuilder {
 
     createIndex("CORRELATION", "CPD_ID_1")
     createIndex("CORRELATION", "CONTEXT_ID")
+    createIndex("CORRELATION_HITS", "CORRELATION", "CPD_ID_1, CONTEXT_ID, FDR", false)
+  }
+
+  def createStatisticsTable() {
+    val createTableSQL = """
+      CREATE TABLE STATISTICS (
+        NAME   TEXT  PRIMARY KEY NOT NULL,
+        VALUE  INT   NOT NULL
+      );
+    """
+    executeUpdate(createTableSQL)
+  }
+
+  def insertStatistics() {
+    val insertSQL = """
+      INSERT INTO STATISTICS (NAME, VALUE)
+      SELECT 'COMPOUND_COUNT', COUNT(DISTINCT CPD_ID_1) FROM CORRELATION
+      UNION ALL
+      SELECT 'CONTEXT_COUNT', COUNT(*) FROM CONTEXT
+      UNION ALL
+      SELECT 'CORRELATION_COUNT', COUNT(*) FROM CORRELATION
+      """
+    executeUpdate(insertSQL)
   }
 }
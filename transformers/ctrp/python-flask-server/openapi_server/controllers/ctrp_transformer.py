@@ -1,6 +1,5 @@
-import sqlite3
-
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool, select_many
 from openapi_server.models.element import Element
 
 from openapi_server.models.names import Names
@@ -37,20 +36,23 @@ class CTRPTransformer(Transformer):
                     compounds[cpd_id] = compound
                     cpd_id_map[compound.id] = cpd_id
 
+        correlations = []
         for compound in collection:
             if compound.id in cpd_id_map:
                 cpd_id = cpd_id_map[compound.id]
-                hits = find_correlated_compounds(cpd_id, context, fdr_threshold)
-                if limit > 0 and limit < len(hits):
-                    hits = hits[0:limit]
-                for hit in hits:
-                    hit_id = hit['CPD_ID_2']
-                    connected_compound = compounds.get(hit_id)
-                    if connected_compound is None:
-                        connected_compound = self.get_compound(hit_id)
-                        cpd_list.append(connected_compound)
-                        compounds[hit_id] = connected_compound
-                    connected_compound.connections.append(self.create_connection(compound.id, hit))
+                hits = find_correlated_compounds(cpd_id, context, fdr_threshold, limit)
+                correlations.append((compound, hits))
+
+        # all connected compounds that are not in the collection with one query
+        hit_ids = [hit['CPD_ID_2'] for (compound, hits) in correlations for hit in hits if hit['CPD_ID_2'] not in compounds]
+        hit_compounds = get_compounds(set(hit_ids))
+        for hit_id in dict.fromkeys(hit_ids):
+            connected_compound = self.create_element(hit_compounds[hit_id])
+            cpd_list.append(connected_compound)
+            compounds[hit_id] = connected_compound
+        for (compound, hits) in correlations:
+            for hit in hits:
+                compounds[hit['CPD_ID_2']].connections.append(self.create_connection(compound.id, hit))
 
         return cpd_list
 
@@ -64,7 +66,10 @@ class CTRPTransformer(Transformer):
 
 
     def get_compound(self, cpd_id):
-        compound = get_compound(cpd_id)[0]
+        return self.create_element(get_compound(cpd_id)[0])
+
+
+    def create_element(self, compound):
         element = Element(
                 id = compound['PUBCHEM_CID'],
                 biolink_class='ChemicalSubstance',
@@ -116,7 +121,7 @@ class CTRPTransformer(Transformer):
 
 
     def add_reference(self, connection, pmid):
-        attribute = Attribute(
+        attribute = self.constant(Attribute,
             name = 'reference', 
             value = 'PMID:'+(pmid),
             type = 'reference', 
@@ -126,8 +131,7 @@ class CTRPTransformer(Transformer):
         )
         connection.attributes.append(attribute)
 
-connection = sqlite3.connect("data/CTRP.sqlite", check_same_thread=False)
-connection.row_factory = sqlite3.Row
+connection = ConnectionPool("data/CTRP.sqlite")
 
 
 def get_compound(cpd_id):
@@ -141,6 +145,15 @@ def get_compound(cpd_id):
     return cur.fetchall()
 
 
+def get_compounds(cpd_ids):
+    query = """
+        SELECT CPD_ID, COMPOUND_NAME, BROAD_CPD_ID, PUBCHEM_CID, SMILES, INCHI, INCHI_KEY
+        FROM COMPOUND
+        WHERE CPD_ID IN (SELECT value FROM json_each(?))
+    """
+    return {cpd_id: rows[0] for (cpd_id, rows) in select_many(connection, query, cpd_ids, 'CPD_ID').items()}
+
+
 def find_compound_by_cid(pubchem_cid):
     query = """
         SELECT CPD_ID, COMPOUND_NAME, BROAD_CPD_ID, PUBCHEM_CID, SMILES, INCHI, INCHI_KEY
@@ -175,22 +188,27 @@ def find_context(context):
     return results[0][0] if len(results) > 0 else None
 
 
-def find_correlated_compounds(cpd_id, context, fdr_threshold):
+def find_correlated_compounds(cpd_id, context, fdr_threshold, limit):
     query = """
         SELECT CPD_ID_1, CPD_ID_2, CONTEXT_ID, N_SAMPLES, CORRELATION_VALUE, FISHER_Z, FDR
         FROM CORRELATION
         WHERE CPD_ID_1 = ? AND CONTEXT_ID = ? AND FDR < ?
         ORDER BY FDR
+        LIMIT ?
     """
     cur = connection.cursor()
-    cur.execute(query,(cpd_id,context,fdr_threshold))
+    cur.execute(query,(cpd_id,context,fdr_threshold,limit if limit > 0 else -1))
     return cur.fetchall()
 
 
 def get_compound_count():
-    query = "SELECT COUNT(DISTINCT CPD_ID_1) AS COUNT FROM CORRELATION"
     cur = connection.cursor()
-    cur.execute(query)
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'STATISTICS'")
+    if len(cur.fetchall()) > 0:
+        # precomputed when the database is built
+        cur.execute("SELECT VALUE AS COUNT FROM STATISTICS WHERE NAME = 'COMPOUND_COUNT'")
+    else:
+        cur.execute("SELECT COUNT(DISTINCT CPD_ID_1) AS COUNT FROM CORRELATION")
     count = 0
     for row in cur.fetchall():
         count = row['COUNT']
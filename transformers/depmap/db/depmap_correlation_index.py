@@ -0,0 +1,48 @@
+import sqlite3
+
+# Builds the cor_by_gene table of the DepMap database: the correlations of the cor table clustered by
+# gene and sorted by absolute value (highest first), so that the DepMap correlation transformer reads
+# only the correlations it returns, however many correlations a gene has. Every row of cor is kept
+# (cor_id: rowid of the row in cor), duplicate rows included.
+# Run after DepMap.sqlite is downloaded to the data folder:  python depmap_correlation_index.py
+
+connection = sqlite3.connect("data/DepMap.sqlite")
+
+
+def create_correlation_table():
+    connection.execute("DROP TABLE IF EXISTS cor_by_gene")
+    sql = """
+        CREATE TABLE cor_by_gene (
+            entrez_gene_id_1  TEXT  NOT NULL,
+            abs_correlation   REAL  NOT NULL,
+            entrez_gene_id_2  TEXT  NOT NULL,
+            correlation       REAL  NOT NULL,
+            cor_id            INT   NOT NULL,
+            PRIMARY KEY (entrez_gene_id_1, abs_correlation DESC, entrez_gene_id_2, correlation, cor_id)
+        ) WITHOUT ROWID
+    """
+    connection.execute(sql)
+    connection.commit()
+
+
+def load_correlations():
+    statement = """
+        INSERT INTO cor_by_gene(entrez_gene_id_1, abs_correlation, entrez_gene_id_2, correlation, cor_id)
+        SELECT entrez_gene_id_1, abs(correlation), entrez_gene_id_2, correlation, rowid
+        FROM cor
+        WHERE correlation IS NOT NULL
+        ORDER BY entrez_gene_id_1, abs(correlation) DESC, entrez_gene_id_2, correlation, rowid
+    """
+    connection.execute(statement)
+    connection.commit()
+
+
+def main():
+    create_correlation_table()
+    load_correlations()
+    print(connection.execute("SELECT COUNT(*) FROM cor_by_gene").fetchone()[0], "correlations loaded")
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,28 @@
 import collections
-import sqlite3
 from collections import defaultdict
 
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool
 
 from openapi_server.models.names import Names
 from openapi_server.models.attribute import Attribute
 from openapi_server.models.element import Element
 from openapi_server.models.connection import Connection
 
-connection = sqlite3.connect("data/DepMap.sqlite", check_same_thread=False)
-connection.row_factory = sqlite3.Row
+connection = ConnectionPool("data/DepMap.sqlite")
+
+correlation_index = None
+
+
+def has_correlation_index():
+    """
+        Check whether the cor_by_gene table (see db/depmap_correlation_index.py) is in the database
+    """
+    global correlation_index
+    if correlation_index is None:
+        cur = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'cor_by_gene'")
+        correlation_index = len(cur.fetchall()) > 0
+    return correlation_index
 
 
 class DepMapExpander(Transformer):
@@ -23,46 +35,99 @@ class DepMapExpander(Transformer):
     def expand(self, collection, controls):
         element_list = []
         elements = {}
+        # correlations of all query genes are loaded before the elements are created
+        gene_ids = [self.de_prefix("entrez", str(gene.identifiers["entrez"]), 'gene') for gene in collection if "entrez" in gene.identifiers]
+        correlations = self.get_correlations(gene_ids, controls)
+        # with a single query gene, the genes are complete once its correlations are added and can be streamed
+        stream = len(collection) == 1
         for gene in collection:
             # add query gene to output list (connected to itself with 1.0 correlation)
             query_id = gene.id
             self.add_connection(gene, query_id, 1.0)
             element_list.append(gene)
+            new_elements = [gene]
             # only use NCBIGene identifier 
             if "entrez" in gene.identifiers:
                 gene_id = gene.identifiers["entrez"]
                 elements[gene_id] = gene
+                gene_id_1 = self.de_prefix("entrez", str(gene_id), 'gene')
                 # pass element_list and elements to add gene elements as they are created
-                self.find_correlated_genes(controls, query_id, gene_id, element_list, elements)
-        return element_list
+                new_elements.extend(self.find_correlated_genes(correlations.get(gene_id_1, []), query_id, element_list, elements))
+            if stream:
+                yield from new_elements
+        if not stream:
+            yield from element_list
+
+    # yields gene elements as they are created
+    def find_correlated_genes(self, correlations, query_id, element_list, elements):
+        for (gene_id_2, correlation_value) in correlations:
+            # To take out duplicate outputs if multiple genes are related to the same gene
+            gene_element = elements.get(gene_id_2)
+            if gene_element is None:
+                gene_element = self.Element(gene_id_2, self.biolink_class('Gene'), {"entrez": gene_id_2})
+                elements[gene_id_2] = gene_element
+                element_list.append(gene_element)
+                self.add_connection(gene_element, query_id, correlation_value)
+                yield gene_element
+            else:
+                self.add_connection(gene_element, query_id, correlation_value)
 
-    def find_correlated_genes(self, controls, query_id, gene_id, element_list, elements):
-        gene_id_1 = self.de_prefix("entrez", str(gene_id), 'gene')
+
+    def get_correlations(self, gene_ids, controls):
+        """
+            Correlations of all query genes above the threshold, highest absolute value first;
+            returns a dictionary of gene id -> list of (correlated gene id, correlation)
+        """
         threshold = float(controls["score threshold"])
         limit = int(controls["limit"])
         direction = controls["direction"]
+        correlations = {}
+        cur = connection.cursor()
+        # plain tuples, the rows are only unpacked
+        cur.row_factory = None
+        for gene_id in gene_ids:
+            if gene_id not in correlations:
+                # the same (prepared) query for every gene, each reads only the returned correlations
+                (query, params) = self.correlation_query(gene_id, threshold, direction, limit)
+                rows = cur.execute(query, params).fetchall()
+                gene_ids_2 = self.add_prefixes("entrez", [str(row[1]) for row in rows], "gene")
+                correlations[gene_id] = list(zip(gene_ids_2, [row[2] for row in rows]))
+        return correlations
+
+
+    def correlation_query(self, gene_id, threshold, direction, limit):
+        """
+            Query (and its parameters) of the correlations of a gene above the threshold,
+            highest absolute value first; the limit (0: no limit) includes the query gene
+        """
+        limit = limit - 1 if limit > 0 else -1
+        if has_correlation_index():
+            # reads the prefix of the gene's correlations (sorted by absolute value) above the threshold
+            query = """
+                SELECT entrez_gene_id_1, entrez_gene_id_2, correlation
+                FROM cor_by_gene WHERE entrez_gene_id_1 = ? AND abs_correlation >= ? AND {}
+                ORDER BY abs_correlation DESC
+                LIMIT ?
+            """.format(self.above_threshold(direction))
+            return (query, (gene_id, self.minimum_abs_correlation(direction, threshold), threshold, limit))
         query = """
             SELECT entrez_gene_id_1, entrez_gene_id_2, correlation 
             FROM cor WHERE entrez_gene_id_1 = ? and {} 
-            ORDER BY abs(correlation) DESC  
-        """.format(self.above_threshold(direction))    
-        cur = connection.cursor()
-        cur.execute(query,(gene_id_1, threshold))
-        i= 1
-        for row in cur.fetchall():
-            correlation_value = row["correlation"]
-            if limit <= 0 or i < limit:
-                gene_id_1 = gene_id
-                gene_id_2 = self.add_prefix("entrez", str(row["entrez_gene_id_2"]), "gene")
-                # To take out duplicate outputs if multiple genes are related to the same gene
-                if gene_id_2 not in elements:
-                    gene_element = self.Element(gene_id_2, self.biolink_class('Gene'), {"entrez": gene_id_2})
-                    elements[gene_id_2] = gene_element
-                    element_list.append(gene_element)
-                else:
-                    gene_element = elements[gene_id_2]
-                self.add_connection(gene_element, query_id, correlation_value)
-            i+=1
+            ORDER BY abs(correlation) DESC
+            LIMIT ?
+        """.format(self.above_threshold(direction))
+        return (query, (gene_id, threshold, limit))
+
+    
+    def minimum_abs_correlation(self, direction: str, threshold: float):
+        """
+            Lowest absolute value of correlations above the threshold
+        """
+        if direction == 'anti-correlation':
+            return max(-threshold, 0.0)
+        if direction == 'both':
+            return abs(threshold)
+        return max(threshold, 0.0)
 
     
     def above_threshold(self, direction: str):
@@ -81,6 +146,5 @@ class DepMapExpander(Transformer):
         if gene_element.connections is None: 
             gene_element.connections = []
         attribute = self.Attribute("correlation", correlation_value)
-        attribute.source = "infores:molepro"
         gene_element.connections.append(self.Connection(query_id, "biolink:correlated_with", "biolink:correlated_with", 
         attributes=[attribute]))
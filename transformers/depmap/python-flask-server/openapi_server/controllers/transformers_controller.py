@@ -7,13 +7,16 @@ from openapi_server.models.error_msg import ErrorMsg  # noqa: E501
 from openapi_server.models.transformer_info import TransformerInfo  # noqa: E501
 from openapi_server.models.transformer_query import TransformerQuery  # noqa: E501
 from openapi_server import util
+from transformers.deserializer import deserialize
+from openapi_server import encoder
+from transformers.streaming import stream_requested, ndjson_response
 from openapi_server.controllers.depmap_transformer import DepMapExpander
 
 transformer = {
     'correlation': DepMapExpander()
 }
 
-def service_transform_post(service, body, cache=None):  # noqa: E501
+def service_transform_post(service, body, cache=None, stream=None):  # noqa: E501
     """Transform a list of genes or compounds
 
     Depending on the function of a transformer, creates, expands, or filters a list. # noqa: E501
@@ -24,12 +27,16 @@ def service_transform_post(service, body, cache=None):  # noqa: E501
     :type transformer_query: dict | bytes
     :param cache: Directive for handling caching, can be &#39;yes&#39; (default), &#39;no&#39;, &#39;bypass&#39; or &#39;remove&#39;
     :type cache: str
+    :param stream: Stream the elements as newline-delimited JSON
+    :type stream: bool
 
     :rtype: List[Element]
     """
     if connexion.request.is_json:
-        transformer_query = TransformerQuery.from_dict(connexion.request.get_json())  # noqa: E501
-    return transformer[service].transform(transformer_query)
+        transformer_query = deserialize(connexion.request.get_json(), TransformerQuery)  # noqa: E501
+    if stream_requested(connexion.request, stream):
+        return ndjson_response(transformer[service].transform(transformer_query, cache, stream=True), encoder.JSONEncoder)
+    return transformer[service].transform(transformer_query, cache)
 
 
 def service_transformer_info_get(service, cache=None):  # noqa: E501
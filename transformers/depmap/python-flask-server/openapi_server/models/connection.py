@@ -17,6 +17,30 @@ class Connection(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'source_element_id': str,
+        'biolink_predicate': str,
+        'inverse_predicate': str,
+        'relation': str,
+        'inverse_relation': str,
+        'source': str,
+        'provided_by': str,
+        'attributes': List[Attribute]
+    }
+
+    attribute_map = {
+        'source_element_id': 'source_element_id',
+        'biolink_predicate': 'biolink_predicate',
+        'inverse_predicate': 'inverse_predicate',
+        'relation': 'relation',
+        'inverse_relation': 'inverse_relation',
+        'source': 'source',
+        'provided_by': 'provided_by',
+        'attributes': 'attributes'
+    }
+
+    __slots__ = ('_source_element_id', '_biolink_predicate', '_inverse_predicate', '_relation', '_inverse_relation', '_source', '_provided_by', '_attributes')
+
     def __init__(self, source_element_id=None, biolink_predicate=None, inverse_predicate=None, relation=None, inverse_relation=None, source=None, provided_by=None, attributes=None):  # noqa: E501
         """Connection - a model defined in OpenAPI
 
@@ -37,28 +61,6 @@ class Connection(Model):
         :param attributes: The attributes of this Connection.  # noqa: E501
         :type attributes: List[Attribute]
         """
-        self.openapi_types = {
-            'source_element_id': str,
-            'biolink_predicate': str,
-            'inverse_predicate': str,
-            'relation': str,
-            'inverse_relation': str,
-            'source': str,
-            'provided_by': str,
-            'attributes': List[Attribute]
-        }
-
-        self.attribute_map = {
-            'source_element_id': 'source_element_id',
-            'biolink_predicate': 'biolink_predicate',
-            'inverse_predicate': 'inverse_predicate',
-            'relation': 'relation',
-            'inverse_relation': 'inverse_relation',
-            'source': 'source',
-            'provided_by': 'provided_by',
-            'attributes': 'attributes'
-        }
-
         self._source_element_id = source_element_id
         self._biolink_predicate = biolink_predicate
         self._inverse_predicate = inverse_predicate
@@ -21,6 +21,32 @@ class Element(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'id': str,
+        'biolink_class': str,
+        'identifiers': Dict[str, object],
+        'alternative_identifiers': List[Dict[str, object]],
+        'names_synonyms': List[Names],
+        'attributes': List[Attribute],
+        'connections': List[Connection],
+        'source': str,
+        'provided_by': str
+    }
+
+    attribute_map = {
+        'id': 'id',
+        'biolink_class': 'biolink_class',
+        'identifiers': 'identifiers',
+        'alternative_identifiers': 'alternative_identifiers',
+        'names_synonyms': 'names_synonyms',
+        'attributes': 'attributes',
+        'connections': 'connections',
+        'source': 'source',
+        'provided_by': 'provided_by'
+    }
+
+    __slots__ = ('_id', '_biolink_class', '_identifiers', '_alternative_identifiers', '_names_synonyms', '_attributes', '_connections', '_source', '_provided_by')
+
     def __init__(self, id=None, biolink_class=None, identifiers=None, alternative_identifiers=None, names_synonyms=None, attributes=None, connections=None, source=None, provided_by=None):  # noqa: E501
         """Element - a model defined in OpenAPI
 
@@ -43,30 +69,6 @@ class Element(Model):
         :param provided_by: The provided_by of this Element.  # noqa: E501
         :type provided_by: str
         """
-        self.openapi_types = {
-            'id': str,
-            'biolink_class': str,
-            'identifiers': Dict[str, object],
-            'alternative_identifiers': List[Dict[str, object]],
-            'names_synonyms': List[Names],
-            'attributes': List[Attribute],
-            'connections': List[Connection],
-            'source': str,
-            'provided_by': str
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'biolink_class': 'biolink_class',
-            'identifiers': 'identifiers',
-            'alternative_identifiers': 'alternative_identifiers',
-            'names_synonyms': 'names_synonyms',
-            'attributes': 'attributes',
-            'connections': 'connections',
-            'source': 'source',
-            'provided_by': 'provided_by'
-        }
-
         self._id = id
         self._biolink_class = biolink_class
         self._identifiers = identifiers
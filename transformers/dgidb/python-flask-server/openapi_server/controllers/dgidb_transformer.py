@@ -1,6 +1,6 @@
-from flask import g
 from collections import defaultdict
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool
 from openapi_server.models.names import Names
 from openapi_server.models.attribute import Attribute
 from openapi_server.models.element import Element
@@ -109,18 +109,14 @@ class DGIdbInhibitorTransformer(Transformer):
 ###############################################################
 class DGIdbDataSupply(Transformer):
 
+    # SQLite database file is located in the python-flask-server/data directory
+    database = ConnectionPool("data/DGIdb.db", detect_types=sqlite3.PARSE_DECLTYPES)
+
     def get_db():
-        if 'db' not in g:
-            g.db = sqlite3.connect("data/DGIdb.db",
-                    detect_types=sqlite3.PARSE_DECLTYPES
-            ) # SQLite database file is located in the python-flask-server/data directory
-            g.db.row_factory = sqlite3.Row
-        return g.db
+        return DGIdbDataSupply.database.connection()
 
     def close_db(self, e=None):
-        db = g.pop('db', None)
-        if db is not None:
-            db.close()
+        DGIdbDataSupply.database.close()
 
 
 #   Get the compound's synonyms (aliases) and attributes data
@@ -3,6 +3,7 @@ import csv
 
 
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool
 from openapi_server.models.names import Names
 from openapi_server.models.attribute import Attribute
 from openapi_server.models.element import Element
@@ -287,8 +288,7 @@ class DrugBankProteinInteractionsTransformer(DrugBankInteractionsTransformer):
         return element
 
 
-connection = sqlite3.connect("data/DrugBank.sqlite", detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False) 
-connection.row_factory = sqlite3.Row
+connection = ConnectionPool("data/DrugBank.sqlite", detect_types=sqlite3.PARSE_DECLTYPES)
 
 
 def get_db():
@@ -820,7 +820,6 @@ def get_compound_targets(transformer, info_name, target_type, connectionsDict, d
         polypeptide_id = row['POLYPEPTIDE_ID']
 
         geneConnection = transformer.Connection(compound.id, transformer.PREDICATE, transformer.INVERSE_PREDICATE)    
-        geneConnection.type = aType
  
         geneConnection.attributes.append(
                             transformer.Attribute(
@@ -15,6 +15,32 @@ class Attribute(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'attribute_type_id': str,
+        'original_attribute_name': str,
+        'value': object,
+        'value_type_id': str,
+        'attribute_source': str,
+        'value_url': str,
+        'description': str,
+        'attributes': None,  # List[Attribute], set once the class is defined
+        'provided_by': str
+    }
+
+    attribute_map = {
+        'attribute_type_id': 'attribute_type_id',
+        'original_attribute_name': 'original_attribute_name',
+        'value': 'value',
+        'value_type_id': 'value_type_id',
+        'attribute_source': 'attribute_source',
+        'value_url': 'value_url',
+        'description': 'description',
+        'attributes': 'attributes',
+        'provided_by': 'provided_by'
+    }
+
+    __slots__ = ('_attribute_type_id', '_original_attribute_name', '_value', '_value_type_id', '_attribute_source', '_value_url', '_description', '_attributes', '_provided_by')
+
     def __init__(self, attribute_type_id=None, original_attribute_name=None, value=None, value_type_id=None, attribute_source=None, value_url=None, description=None, attributes=None, provided_by=None):  # noqa: E501
         """Attribute - a model defined in OpenAPI
 
@@ -37,30 +63,6 @@ class Attribute(Model):
         :param provided_by: The provided_by of this Attribute.  # noqa: E501
         :type provided_by: str
         """
-        self.openapi_types = {
-            'attribute_type_id': str,
-            'original_attribute_name': str,
-            'value': object,
-            'value_type_id': str,
-            'attribute_source': str,
-            'value_url': str,
-            'description': str,
-            'attributes': List[Attribute],
-            'provided_by': str
-        }
-
-        self.attribute_map = {
-            'attribute_type_id': 'attribute_type_id',
-            'original_attribute_name': 'original_attribute_name',
-            'value': 'value',
-            'value_type_id': 'value_type_id',
-            'attribute_source': 'attribute_source',
-            'value_url': 'value_url',
-            'description': 'description',
-            'attributes': 'attributes',
-            'provided_by': 'provided_by'
-        }
-
         self._attribute_type_id = attribute_type_id
         self._original_attribute_name = original_attribute_name
         self._value = value
@@ -296,3 +298,6 @@ class Attribute(Model):
         """
 
         self._provided_by = provided_by
+
+
+Attribute.openapi_types['attributes'] = List[Attribute]
@@ -15,6 +15,26 @@ class Names(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'name': str,
+        'synonyms': List[str],
+        'name_type': str,
+        'source': str,
+        'provided_by': str,
+        'language': str
+    }
+
+    attribute_map = {
+        'name': 'name',
+        'synonyms': 'synonyms',
+        'name_type': 'name_type',
+        'source': 'source',
+        'provided_by': 'provided_by',
+        'language': 'language'
+    }
+
+    __slots__ = ('_name', '_synonyms', '_name_type', '_source', '_provided_by', '_language')
+
     def __init__(self, name=None, synonyms=None, name_type=None, source=None, provided_by=None, language=None):  # noqa: E501
         """Names - a model defined in OpenAPI
 
@@ -31,24 +51,6 @@ class Names(Model):
         :param language: The language of this Names.  # noqa: E501
         :type language: str
         """
-        self.openapi_types = {
-            'name': str,
-            'synonyms': List[str],
-            'name_type': str,
-            'source': str,
-            'provided_by': str,
-            'language': str
-        }
-
-        self.attribute_map = {
-            'name': 'name',
-            'synonyms': 'synonyms',
-            'name_type': 'name_type',
-            'source': 'source',
-            'provided_by': 'provided_by',
-            'language': 'language'
-        }
-
         self._name = name
         self._synonyms = synonyms
         self._name_type = name_type
@@ -1,6 +1,6 @@
-import sqlite3
 
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool
 from openapi_server.models.compound_info import CompoundInfo
 from openapi_server.models.compound_info_identifiers import CompoundInfoIdentifiers
 from openapi_server.models.names import Names
@@ -60,7 +60,7 @@ class DrugCentralIndicationsTransformer(Transformer):
         )
 
 
-connection = sqlite3.connect("DrugCentral.sqlite", check_same_thread=False)
+connection = ConnectionPool("DrugCentral.sqlite", row_factory=None)
 
 
 def find_drugs(disease_id):
@@ -6,6 +6,7 @@ from openapi_server.models.error_msg import ErrorMsg  # noqa: E501
 from openapi_server.models.transformer_info import TransformerInfo  # noqa: E501
 from openapi_server.models.transformer_query import TransformerQuery  # noqa: E501
 from openapi_server import util
+from transformers.deserializer import deserialize
 
 from openapi_server.controllers.drugcentral_transformer import DrugCentralIndicationsTransformer
 
@@ -24,7 +25,7 @@ def service_transform_post(service, body):  # noqa: E501
     :rtype: List[CompoundInfo]
     """
     if connexion.request.is_json:
-        transformer_query = TransformerQuery.from_dict(connexion.request.get_json())  # noqa: E501
+        transformer_query = deserialize(connexion.request.get_json(), TransformerQuery)  # noqa: E501
     return transformer[service].transform(transformer_query)
 
 
@@ -15,6 +15,22 @@ class Attribute(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'name': str,
+        'value': str,
+        'source': str,
+        'url': str
+    }
+
+    attribute_map = {
+        'name': 'name',
+        'value': 'value',
+        'source': 'source',
+        'url': 'url'
+    }
+
+    __slots__ = ('_name', '_value', '_source', '_url')
+
     def __init__(self, name=None, value=None, source=None, url=None):  # noqa: E501
         """Attribute - a model defined in OpenAPI
 
@@ -27,20 +43,6 @@ class Attribute(Model):
         :param url: The url of this Attribute.  # noqa: E501
         :type url: str
         """
-        self.openapi_types = {
-            'name': str,
-            'value': str,
-            'source': str,
-            'url': str
-        }
-
-        self.attribute_map = {
-            'name': 'name',
-            'value': 'value',
-            'source': 'source',
-            'url': 'url'
-        }
-
         self._name = name
         self._value = value
         self._source = source
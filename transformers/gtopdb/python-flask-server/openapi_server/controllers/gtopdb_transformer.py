@@ -1,4 +1,5 @@
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool, select_many
 
 from openapi_server.models.names import Names
 from openapi_server.models.attribute import Attribute
@@ -6,11 +7,9 @@ from openapi_server.models.element import Element
 from openapi_server.models.connection import Connection
 
 import re
-import sqlite3
 
 SOURCE = 'GtoPdb'
-connection = sqlite3.connect("data/GtoPdb.db", check_same_thread=False)
-connection.row_factory = sqlite3.Row
+connection = ConnectionPool("data/GtoPdb.db")
 
 inchikey_regex = re.compile('[A-Z]{14}-[A-Z]{10}-[A-Z]')
 
@@ -251,42 +250,10 @@ class GtoPdbTargetsTransformer(Transformer):
         """
         gene_list = []
         genes = {}
-        for compound in compound_list:
-            if compound.identifiers.get('pubchem') is None:
-                continue
-            cid= self.get_pubchemCID(compound)
-            query = """
-            SELECT DISTINCT
-                TARGET_ID,
-                INTERACTION.INTERACTION_ID, 
-                INTERACTION.TARGET_SPECIES, 
-                INTERACTION.LIGAND_ID,
-                INTERACTION.TYPE, 
-                INTERACTION.ACTION, 
-                INTERACTION.ACTION_COMMENT, 
-                INTERACTION.SELECTIVITY, 
-                INTERACTION.ENDOGENOUS, 
-                INTERACTION.PRIMARY_TARGET,
-                INTERACTION.CONCENTRATION_RANGE, 
-                INTERACTION.AFFINITY_UNITS, 
-                INTERACTION.AFFINITY_HIGH, 
-                INTERACTION.AFFINITY_MEDIAN, 
-                INTERACTION.AFFINITY_LOW, 
-                INTERACTION.ORIGINAL_AFFINITY_UNITS,
-                INTERACTION.ORIGINAL_AFFINITY_LOW_NM,
-                INTERACTION.ORIGINAL_AFFINITY_MEDIAN_NM,
-                INTERACTION.ORIGINAL_AFFINITY_HIGH_NM,
-                INTERACTION.ORIGINAL_AFFINITY_RELATION, 
-                INTERACTION.ASSAY_DESCRIPTION,
-                INTERACTION.RECEPTOR_SITE, 
-                INTERACTION.LIGAND_CONTEXT, 
-                INTERACTION.PUBMED_ID    
-            FROM LIGAND
-            JOIN INTERACTION ON LIGAND.LIGAND_ID = INTERACTION.LIGAND_ID
-            WHERE LIGAND.PUBCHEMCID = ?;
-            """
-            cur=connection.execute(query,(cid,))
-            for row in cur.fetchall():
+        compound_cids = self.collection_ids(compound_list, 'pubchem')
+        interactions = find_interactions({cid for (compound, cids) in compound_cids for cid in cids})
+        for compound, cids in compound_cids:
+            for row in [row for cid in cids for row in interactions.get(cid, [])]:
                 target_id= row["TARGET_ID"]
                 target_list= self.get_target(target_id)
                 if target_list != None: 
@@ -298,14 +265,7 @@ class GtoPdbTargetsTransformer(Transformer):
                     # add connection element here by calling add_connection function
                     self.add_connections(row, target, compound)
         return gene_list
-    
 
-    # Takes a compound and returns a pubchemCID
-    def get_pubchemCID(self, compound):
-        cid= compound.identifiers['pubchem']
-        if cid.startswith('CID:'):
-            cid=cid[4:]
-        return cid
 
     # Gets information about target from target id and creates element and adds to gene_list
     def get_target(self,target_id): 
@@ -662,3 +622,40 @@ class GtoPdbInhibitorsTransformer(Transformer):
                 )
 
     
+
+
+# Finds interactions for all PubChem CIDs of the input collection in one query
+def find_interactions(cids):
+    query = """
+    SELECT DISTINCT
+        TARGET_ID,
+        INTERACTION.INTERACTION_ID, 
+        INTERACTION.TARGET_SPECIES, 
+        INTERACTION.LIGAND_ID,
+        INTERACTION.TYPE, 
+        INTERACTION.ACTION, 
+        INTERACTION.ACTION_COMMENT, 
+        INTERACTION.SELECTIVITY, 
+        INTERACTION.ENDOGENOUS, 
+        INTERACTION.PRIMARY_TARGET,
+        INTERACTION.CONCENTRATION_RANGE, 
+        INTERACTION.AFFINITY_UNITS, 
+        INTERACTION.AFFINITY_HIGH, 
+        INTERACTION.AFFINITY_MEDIAN, 
+        INTERACTION.AFFINITY_LOW, 
+        INTERACTION.ORIGINAL_AFFINITY_UNITS,
+        INTERACTION.ORIGINAL_AFFINITY_LOW_NM,
+        INTERACTION.ORIGINAL_AFFINITY_MEDIAN_NM,
+        INTERACTION.ORIGINAL_AFFINITY_HIGH_NM,
+        INTERACTION.ORIGINAL_AFFINITY_RELATION, 
+        INTERACTION.ASSAY_DESCRIPTION,
+        INTERACTION.RECEPTOR_SITE, 
+        INTERACTION.LIGAND_CONTEXT, 
+        INTERACTION.PUBMED_ID,
+        LIGAND.PUBCHEMCID,
+        CAST(LIGAND.PUBCHEMCID AS TEXT) AS QUERY_CID
+    FROM LIGAND
+    JOIN INTERACTION ON LIGAND.LIGAND_ID = INTERACTION.LIGAND_ID
+    WHERE LIGAND.PUBCHEMCID IN (SELECT value FROM json_each(?));
+    """
+    return select_many(connection, query, cids, 'QUERY_CID')
@@ -21,6 +21,30 @@ class Element(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'id': str,
+        'biolink_class': str,
+        'identifiers': Dict[str, object],
+        'alternative_identifiers': List[Dict[str, object]],
+        'names_synonyms': List[Names],
+        'attributes': List[Attribute],
+        'connections': List[Connection],
+        'source': str
+    }
+
+    attribute_map = {
+        'id': 'id',
+        'biolink_class': 'biolink_class',
+        'identifiers': 'identifiers',
+        'alternative_identifiers': 'alternative_identifiers',
+        'names_synonyms': 'names_synonyms',
+        'attributes': 'attributes',
+        'connections': 'connections',
+        'source': 'source'
+    }
+
+    __slots__ = ('_id', '_biolink_class', '_identifiers', '_alternative_identifiers', '_names_synonyms', '_attributes', '_connections', '_source')
+
     def __init__(self, id=None, biolink_class=None, identifiers=None, alternative_identifiers=None, names_synonyms=None, attributes=None, connections=None, source=None):  # noqa: E501
         """Element - a model defined in OpenAPI
 
@@ -41,28 +65,6 @@ class Element(Model):
         :param source: The source of this Element.  # noqa: E501
         :type source: str
         """
-        self.openapi_types = {
-            'id': str,
-            'biolink_class': str,
-            'identifiers': Dict[str, object],
-            'alternative_identifiers': List[Dict[str, object]],
-            'names_synonyms': List[Names],
-            'attributes': List[Attribute],
-            'connections': List[Connection],
-            'source': str
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'biolink_class': 'biolink_class',
-            'identifiers': 'identifiers',
-            'alternative_identifiers': 'alternative_identifiers',
-            'names_synonyms': 'names_synonyms',
-            'attributes': 'attributes',
-            'connections': 'connections',
-            'source': 'source'
-        }
-
         self._id = id
         self._biolink_class = biolink_class
         self._identifiers = identifiers
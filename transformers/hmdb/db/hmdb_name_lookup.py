@@ -0,0 +1,71 @@
+import sqlite3
+
+# Builds the HMDB_NAME_LOOKUP table of HMDB-KS.db: every key the metabolites producer looks up,
+# with its type, and the concept it belongs to:
+#   hmdb      HMDB id of a concept (exact)
+#   inchikey  InChIKey of a concept (exact)
+#   name      name of a concept (lower case)
+#   synonym   synonym of a concept, exact matches (cross-references) excluded (lower case)
+# The producer resolves all names of a request with one query on this table instead of
+# querying the concept, detail and synonym tables for each name.
+# Run after HMDB-KS.db is saved to the data folder:  python hmdb_name_lookup.py
+
+connection = sqlite3.connect("data/HMDB-KS.db")
+
+
+def create_lookup_table():
+    connection.execute("DROP TABLE IF EXISTS HMDB_NAME_LOOKUP")
+    sql = """
+        CREATE TABLE HMDB_NAME_LOOKUP (
+            KEY                TEXT  NOT NULL,
+            KEY_TYPE           TEXT  NOT NULL,
+            BEACON_CONCEPT_ID  INT   NOT NULL,
+            PRIMARY KEY (KEY, KEY_TYPE, BEACON_CONCEPT_ID)
+        ) WITHOUT ROWID
+    """
+    connection.execute(sql)
+    connection.commit()
+
+
+def load_keys():
+    statements = [
+        """
+            INSERT OR IGNORE INTO HMDB_NAME_LOOKUP (KEY, KEY_TYPE, BEACON_CONCEPT_ID)
+            SELECT ID, 'hmdb', BEACON_CONCEPT_ID
+            FROM BEACON_CONCEPT
+            WHERE ID IS NOT NULL
+        """,
+        """
+            INSERT OR IGNORE INTO HMDB_NAME_LOOKUP (KEY, KEY_TYPE, BEACON_CONCEPT_ID)
+            SELECT VALUE, 'inchikey', BEACON_CONCEPT_ID
+            FROM BEACON_CONCEPT_DETAIL
+            WHERE TAG = 'inchikey' AND VALUE IS NOT NULL
+        """,
+        """
+            INSERT OR IGNORE INTO HMDB_NAME_LOOKUP (KEY, KEY_TYPE, BEACON_CONCEPT_ID)
+            SELECT lower(NAME), 'name', BEACON_CONCEPT_ID
+            FROM BEACON_CONCEPT
+            WHERE NAME IS NOT NULL
+        """,
+        """
+            INSERT OR IGNORE INTO HMDB_NAME_LOOKUP (KEY, KEY_TYPE, BEACON_CONCEPT_ID)
+            SELECT lower(SYNONYM), 'synonym', BEACON_CONCEPT_ID
+            FROM BEACON_CONCEPT_SYNONYM
+            WHERE EXACT_MATCH = 0 AND SYNONYM IS NOT NULL
+        """
+    ]
+    for statement in statements:
+        connection.execute(statement)
+    connection.commit()
+
+
+def main():
+    create_lookup_table()
+    load_keys()
+    for (key_type, count) in connection.execute("SELECT KEY_TYPE, COUNT(*) FROM HMDB_NAME_LOOKUP GROUP BY KEY_TYPE"):
+        print(count, key_type, "keys loaded")
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import sqlite3
+
+# Builds the tables of HMDB-KS.db that the HMDB transformers read at startup:
+#   CONCEPT_STATISTICS  number of distinct concepts of each category (the node counts of the knowledge maps)
+#   UNIPROT_ENTREZ      UniProt -> Entrez gene id map, loaded from data/UniProt2Entrez.txt
+# With these tables the service neither counts the concepts nor loads the UniProt map into memory
+# (in every worker) when it starts.
+# Run after HMDB-KS.db and UniProt2Entrez.txt are saved to the data folder:  python hmdb_service_tables.py
+
+connection = sqlite3.connect("data/HMDB-KS.db")
+
+
+def create_statistics_table():
+    connection.execute("DROP TABLE IF EXISTS CONCEPT_STATISTICS")
+    sql = """
+        CREATE TABLE CONCEPT_STATISTICS (
+            CATEGORY  TEXT  PRIMARY KEY NOT NULL,
+            COUNT     INT   NOT NULL
+        )
+    """
+    connection.execute(sql)
+    connection.commit()
+
+
+def load_statistics():
+    statement = """
+        INSERT INTO CONCEPT_STATISTICS (CATEGORY, COUNT)
+        SELECT BEACON_CONCEPT_CATEGORY.CATEGORY, COUNT(DISTINCT BEACON_CONCEPT.ID)
+        FROM BEACON_CONCEPT_CATEGORY
+        LEFT JOIN BEACON_CONCEPT ON (BEACON_CONCEPT.BEACON_CONCEPT_CATEGORY_ID = BEACON_CONCEPT_CATEGORY.BEACON_CONCEPT_CATEGORY_ID)
+        GROUP BY BEACON_CONCEPT_CATEGORY.CATEGORY
+    """
+    connection.execute(statement)
+    connection.commit()
+
+
+def create_uniprot_table():
+    connection.execute("DROP TABLE IF EXISTS UNIPROT_ENTREZ")
+    sql = """
+        CREATE TABLE UNIPROT_ENTREZ (
+            UNIPROT  TEXT  PRIMARY KEY NOT NULL,
+            ENTREZ   TEXT  NOT NULL
+        ) WITHOUT ROWID
+    """
+    connection.execute(sql)
+    connection.commit()
+
+
+def uniprot_entrez_rows(filename):
+    with open(filename,'r') as f:
+        next(f)
+        for line in f:
+            row = line.strip().split('\t')
+            yield (row[0], row[1])
+
+
+def load_uniprot_map():
+    # INSERT OR REPLACE: the last line of a UniProt id wins, as in the map loaded by the service
+    connection.executemany("INSERT OR REPLACE INTO UNIPROT_ENTREZ (UNIPROT, ENTREZ) VALUES (?,?)",
+        uniprot_entrez_rows("data/UniProt2Entrez.txt"))
+    connection.commit()
+
+
+def main():
+    create_statistics_table()
+    load_statistics()
+    create_uniprot_table()
+    load_uniprot_map()
+    for (table, count) in connection.execute("""
+            SELECT 'CONCEPT_STATISTICS', COUNT(*) FROM CONCEPT_STATISTICS
+            UNION ALL
+            SELECT 'UNIPROT_ENTREZ', COUNT(*) FROM UNIPROT_ENTREZ"""):
+        print(count, "rows loaded into", table)
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
-import sqlite3
 import re
+import json
+from collections import defaultdict
 
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool, select_many
 from openapi_server.models.element import Element
 from openapi_server.models.names import Names
 from openapi_server.models.connection import Connection
@@ -30,10 +32,14 @@ class HmdbTargets(Transformer):
     def map(self, compound_list, controls):
         gene_list = []
         genes = {}
-        for compound in compound_list:
-            metabolite = find_metabolite(compound)
+        # metabolites, statements and references of the whole collection
+        metabolites = find_metabolites(compound_list)
+        statements = find_statements_many(concept_ids(metabolites), 'protein')
+        references = get_references_many(statement_ids(statements))
+        entrez_ids = self.entrez_ids(statements)
+        for (compound, metabolite) in zip(compound_list, metabolites):
             if metabolite is not None:
-                targets = self.find_targets(metabolite, compound.id)
+                targets = self.find_targets(statements[metabolite['BEACON_CONCEPT_ID']], references, entrez_ids, compound.id)
                 for target in targets:
                     gene_id = target['entrez']
                     gene = genes.get(gene_id)
@@ -58,15 +64,14 @@ class HmdbTargets(Transformer):
         return gene_list
 
 
-    def find_targets(self, metabolite, source_element_id):
-        bcid = metabolite['BEACON_CONCEPT_ID']
+    def find_targets(self, statements, references, entrez_ids, source_element_id):
         target_list = []
-        for target in find_statements(bcid,'protein'):
+        for target in statements:
             if target['ID'].startswith('UniProtKB:'):
                 uniprot = target['ID'][10:]
-                entrez = self.id_map.get(uniprot)
+                entrez = entrez_ids.get(uniprot)
                 if entrez is not None:
-                    connection = self.create_connection(source_element_id, target)
+                    connection = self.create_connection(source_element_id, target, references)
                     target_list.append({
                         'uniprot':uniprot, 
                         'entrez': 'NCBIGene:'+entrez, 
@@ -76,7 +81,7 @@ class HmdbTargets(Transformer):
         return target_list
 
 
-    def create_connection(self, source_element_id, target):
+    def create_connection(self, source_element_id, target, references):
         connection = Connection(
             source_element_id=source_element_id,
             type = self.info.knowledge_map.predicates[0].predicate,
@@ -87,7 +92,7 @@ class HmdbTargets(Transformer):
         )
 
         beacon_statement_id = target['BEACON_STATEMENT_ID']
-        for reference in get_references(beacon_statement_id):
+        for reference in references[beacon_statement_id]:
             connection.attributes.append(Attribute(
                 name = 'reference',
                 value = reference['PMID'],
@@ -98,7 +103,25 @@ class HmdbTargets(Transformer):
         return connection
 
 
+    def entrez_ids(self, statements):
+        """
+            Entrez gene ids of the UniProt targets of the statements
+        """
+        if self.id_map is not None:
+            return self.id_map
+        uniprot_ids = set()
+        for rows in statements.values():
+            for target in rows:
+                if target['ID'].startswith('UniProtKB:'):
+                    uniprot_ids.add(target['ID'][10:])
+        return get_entrez_ids_many(uniprot_ids)
+
+
     def load_ids(self):
+        self.id_map = None
+        if has_uniprot_table():
+            # UniProt ids are mapped by the UNIPROT_ENTREZ table (see db/hmdb_service_tables.py)
+            return
         self.id_map = {}
         with open("data/UniProt2Entrez.txt",'r') as f:
             first_line = True
@@ -123,26 +146,29 @@ class HmdbDisorders(Transformer):
     def map(self, compound_list, controls):
         disorder_list = []
         disorders = {}
-        for compound in compound_list:
-            metabolite = find_metabolite(compound)
+        # metabolites, statements, references and disorder synonyms of the whole collection
+        metabolites = find_metabolites(compound_list)
+        statements = find_statements_many(concept_ids(metabolites), 'disease')
+        references = get_references_many(statement_ids(statements))
+        synonyms = get_synonyms_many(set(statement['BEACON_CONCEPT_ID'] for rows in statements.values() for statement in rows))
+        for (compound, metabolite) in zip(compound_list, metabolites):
             if metabolite is not None:
-                for disorder in self.find_disorders(metabolite, compound.id):
+                for disorder in self.find_disorders(statements[metabolite['BEACON_CONCEPT_ID']], references, compound.id):
                     disorder_id = disorder['name']
                     element = disorders.get(disorder_id)
                     if element is None:
-                        element = self.create_element(disorder)
+                        element = self.create_element(disorder, synonyms[disorder['beacon_concept_id']])
                         disorder_list.append(element)
                         disorders[disorder_id] = element
                     element.connections.append(disorder['connection'])
         return disorder_list
 
     
-    def find_disorders(self, metabolite, source_element_id):
-        bcid = metabolite['BEACON_CONCEPT_ID']
+    def find_disorders(self, statements, references, source_element_id):
         disorders = []
-        for statement in find_statements(bcid,'disease'):
+        for statement in statements:
             beacon_statement_id = statement['BEACON_STATEMENT_ID']
-            connection = self.create_connection(source_element_id, beacon_statement_id)
+            connection = self.create_connection(source_element_id, references[beacon_statement_id])
             disorders.append({
                 'beacon_statement_id':beacon_statement_id, 
                 'beacon_concept_id': statement['BEACON_CONCEPT_ID'], 
@@ -166,11 +192,10 @@ class HmdbDisorders(Transformer):
     }
 
 
-    def create_element(self, disorder):
-        beacon_concept_id = disorder['beacon_concept_id']
+    def create_element(self, disorder, concept_synonyms):
         identifiers = {}
         synonyms = []
-        for synonym in get_synonyms(beacon_concept_id):
+        for synonym in concept_synonyms:
             if synonym['EXACT_MATCH'] == 0:
                 synonyms.append(synonym['SYNONYM'])
             if synonym['EXACT_MATCH'] == 1:
@@ -206,7 +231,7 @@ class HmdbDisorders(Transformer):
         return disorder['name']
 
 
-    def create_connection(self, source_element_id, beacon_statement_id):
+    def create_connection(self, source_element_id, references):
         connection = Connection(
             source_element_id=source_element_id,
             type = self.info.knowledge_map.predicates[0].predicate,
@@ -215,7 +240,7 @@ class HmdbDisorders(Transformer):
             provided_by= self.info.name,
             attributes=[]
         )
-        for reference in get_references(beacon_statement_id):
+        for reference in references:
             connection.attributes.append(Attribute(
                 name = 'reference',
                 value = reference['PMID'] if reference['PMID'] != 'PMID:' else reference['NAME'],
@@ -241,10 +266,19 @@ class HmdbMetabolites(Transformer):
 
     def produce(self, controls):
         metabolite_list = []
-        names = controls['metabolites'].split(';')
-        for name in names:
-            name = name.strip()
-            for metabolite in self.find_metabolite(name):
+        names = [name.strip() for name in controls['metabolites'].split(';')]
+        if has_name_lookup():
+            matches = self.lookup_metabolites(names)
+        else:
+            matches = [self.find_metabolite(name) for name in names]
+        # synonyms and details of all metabolites found
+        beacon_concept_ids = set(row['BEACON_CONCEPT_ID'] for rows in matches for row in rows)
+        synonyms = get_synonyms_many(beacon_concept_ids)
+        details = get_details_many(beacon_concept_ids)
+        for (name, rows) in zip(names, matches):
+            for row in rows:
+                beacon_concept_id = row['BEACON_CONCEPT_ID']
+                metabolite = self.row_to_element(row, synonyms[beacon_concept_id], details[beacon_concept_id])
                 metabolite.attributes.append(Attribute(
                     name='query name', value=name, source=self.info.label, provided_by=self.info.name
                 ))
@@ -252,25 +286,50 @@ class HmdbMetabolites(Transformer):
         return metabolite_list
 
 
+    def lookup_key(self, name):
+        """
+            Type of key and key the name is looked up by (name keys are also looked up as synonyms)
+        """
+        if name.upper().startswith('HMDB:'):
+            return ('hmdb', name)
+        elif name.upper().startswith('HMDB'):
+            return ('hmdb', HMDB+name)
+        elif inchikey_regex.match(name) is not None:
+            return ('inchikey', name)
+        else:
+            return ('name', name)
+
+
+    def lookup_metabolites(self, names):
+        """
+            Find metabolites of all names with one query on the HMDB_NAME_LOOKUP table,
+            returns the list of metabolites of each name
+        """
+        keys = [self.lookup_key(name) for name in names]
+        query_keys = set(keys)
+        query_keys.update(('synonym', key) for (key_type, key) in keys if key_type == 'name')
+        metabolites = lookup_metabolites(query_keys)
+        matches = []
+        for (key_type, key) in keys:
+            rows = metabolites[(key_type, key)]
+            if key_type == 'name' and len(rows) == 0:
+                rows = metabolites[('synonym', key)]
+            matches.append(rows)
+        return matches
+
+
     def find_metabolite(self, name):
         if name.upper().startswith('HMDB:'):
-            return self.metabolites(find_metabolite_by_hmdb_id(name))
+            return find_metabolite_by_hmdb_id(name)
         elif name.upper().startswith('HMDB'):
-            return self.metabolites(find_metabolite_by_hmdb_id(HMDB+name))
+            return find_metabolite_by_hmdb_id(HMDB+name)
         elif inchikey_regex.match(name) is not None:
-            return self.metabolites(find_metabolite_by_inchikey(name))
+            return find_metabolite_by_inchikey(name)
         else:
-            metabolites = self.metabolites(find_metabolite_by_name(name))
+            metabolites = find_metabolite_by_name(name)
             if len(metabolites) != 0:
                 return metabolites
-            return self.metabolites(find_metabolite_by_synonym(name))
-
-
-    def metabolites(self, results):
-        compounds = []
-        for row in results:
-            compounds.append(self.row_to_element(row))
-        return compounds
+            return find_metabolite_by_synonym(name)
 
 
     id_map = {
@@ -291,14 +350,13 @@ class HmdbMetabolites(Transformer):
     }
     
 
-    def row_to_element(self, row):
+    def row_to_element(self, row, concept_synonyms, concept_details):
         id = row['ID']
-        beacon_concept_id = row['BEACON_CONCEPT_ID']
         identifiers = {
             'hmdb': id,
         }
         synonyms = []
-        for synonym in get_synonyms(beacon_concept_id):
+        for synonym in concept_synonyms:
             if synonym['EXACT_MATCH'] == 0:
                 synonyms.append(synonym['SYNONYM'])
             if synonym['EXACT_MATCH'] == 1:
@@ -312,7 +370,7 @@ class HmdbMetabolites(Transformer):
                     add_identifier(identifiers, key, curie)
 
         attributes = []
-        for detail in get_details(beacon_concept_id):
+        for detail in concept_details:
             if detail['TAG'] in self.id_map:
                 add_identifier(identifiers, self.id_map[detail['TAG']], detail['VALUE'])
                 if detail['TAG'] == 'inchi':
@@ -350,37 +408,47 @@ def add_identifier(identifiers, key, value):
         identifiers[key] = value
 
 
-def find_metabolite(compound):
-    if compound.identifiers is not None:
-        if 'hmdb' in compound.identifiers and compound.identifiers['hmdb'] is not None:
-            for metabolite in find_metabolite_by_hmdb_id(compound.identifiers['hmdb']):
-                return metabolite
-        if 'chebi' in compound.identifiers and compound.identifiers['chebi'] is not None:
-            for metabolite in find_metabolite_by_id(compound.identifiers['chebi']):
-                return metabolite
-        if 'drugbank' in compound.identifiers and compound.identifiers['drugbank'] is not None:
-            for metabolite in find_metabolite_by_id(compound.identifiers['drugbank']):
-                return metabolite
-        if 'cas' in compound.identifiers and compound.identifiers['cas'] is not None:
-            for metabolite in find_metabolite_by_id(compound.identifiers['cas']):
-                return metabolite
-    return None
+def find_metabolites(compound_list):
+    """
+        Find the metabolites of the compounds by HMDB, ChEBI, DrugBank or CAS id (in this order),
+        returns the list of metabolites (None if not found) in the order of the compounds
+    """
+    metabolites = [None] * len(compound_list)
+    for (key, find_metabolites_by_ids) in (
+            ('hmdb', find_metabolites_by_hmdb_id_many),
+            ('chebi', find_metabolites_by_id_many),
+            ('drugbank', find_metabolites_by_id_many),
+            ('cas', find_metabolites_by_id_many)):
+        ids = {}
+        for (i, compound) in enumerate(compound_list):
+            if metabolites[i] is None and compound.identifiers is not None and compound.identifiers.get(key) is not None:
+                ids[i] = compound.identifiers[key]
+        if len(ids) > 0:
+            found = find_metabolites_by_ids(set(ids.values()))
+            for (i, id) in ids.items():
+                metabolites[i] = found.get(id)
+    return metabolites
+
+
+def concept_ids(metabolites):
+    return set(metabolite['BEACON_CONCEPT_ID'] for metabolite in metabolites if metabolite is not None)
+
+
+def statement_ids(statements):
+    return set(statement['BEACON_STATEMENT_ID'] for rows in statements.values() for statement in rows)
 
 
-connection = sqlite3.connect("data/HMDB-KS.db", check_same_thread=False)
-connection.row_factory = sqlite3.Row
+connection = ConnectionPool("data/HMDB-KS.db")
 
 
-def find_statements(bcid, category):
+def find_statements_many(bcids, category):
     query = """
-        SELECT BEACON_CONCEPT.BEACON_CONCEPT_ID, BEACON_CONCEPT.ID, BEACON_CONCEPT.NAME, BEACON_STATEMENT.BEACON_STATEMENT_ID
+        SELECT BEACON_STATEMENT.SUBJECT_CONCEPT_ID, BEACON_CONCEPT.BEACON_CONCEPT_ID, BEACON_CONCEPT.ID, BEACON_CONCEPT.NAME, BEACON_STATEMENT.BEACON_STATEMENT_ID
         FROM BEACON_STATEMENT
         INNER JOIN BEACON_CONCEPT ON BEACON_CONCEPT.BEACON_CONCEPT_ID = BEACON_STATEMENT.OBJECT_CONCEPT_ID
-        WHERE BEACON_CONCEPT.BEACON_CONCEPT_CATEGORY_ID = {} AND SUBJECT_CONCEPT_ID = ?
+        WHERE BEACON_CONCEPT.BEACON_CONCEPT_CATEGORY_ID = {} AND SUBJECT_CONCEPT_ID IN (SELECT value FROM json_each(?))
     """
-    cur = connection.cursor()
-    cur.execute(query.format(category_id[category]),(bcid,))
-    return cur.fetchall()
+    return select_many(connection, query.format(category_id[category]), bcids, 'SUBJECT_CONCEPT_ID')
 
 
 def find_metabolite_by_hmdb_id(id):
@@ -394,6 +462,15 @@ def find_metabolite_by_hmdb_id(id):
     return cur.fetchall()
 
 
+def find_metabolites_by_hmdb_id_many(ids):
+    query = """
+        SELECT BEACON_CONCEPT_ID, ID, NAME, DESCRIPTION
+        FROM BEACON_CONCEPT
+        WHERE ID IN (SELECT value FROM json_each(?))
+    """
+    return {id: rows[0] for (id, rows) in select_many(connection, query, ids, 'ID').items()}
+
+
 def find_metabolite_by_id(id):
     query = """
         SELECT BEACON_CONCEPT.BEACON_CONCEPT_ID, BEACON_CONCEPT.ID, BEACON_CONCEPT.NAME, BEACON_CONCEPT.DESCRIPTION
@@ -406,16 +483,24 @@ def find_metabolite_by_id(id):
     return cur.fetchall()
 
 
-def get_references(beacon_statement_id):
+def find_metabolites_by_id_many(ids):
     query = """
-        SELECT BEACON_REFERENCE.ID AS PMID, BEACON_REFERENCE.NAME AS NAME
+        SELECT BEACON_CONCEPT_SYNONYM.SYNONYM AS QUERY_ID, BEACON_CONCEPT.BEACON_CONCEPT_ID, BEACON_CONCEPT.ID, BEACON_CONCEPT.NAME, BEACON_CONCEPT.DESCRIPTION
+        FROM BEACON_CONCEPT_SYNONYM
+        INNER JOIN BEACON_CONCEPT ON BEACON_CONCEPT.BEACON_CONCEPT_ID = BEACON_CONCEPT_SYNONYM.BEACON_CONCEPT_ID
+        WHERE SYNONYM IN (SELECT value FROM json_each(?)) AND EXACT_MATCH = 1
+    """
+    return {id: rows[0] for (id, rows) in select_many(connection, query, ids, 'QUERY_ID').items()}
+
+
+def get_references_many(beacon_statement_ids):
+    query = """
+        SELECT BEACON_STATEMENT_CITATION.BEACON_STATEMENT_ID, BEACON_REFERENCE.ID AS PMID, BEACON_REFERENCE.NAME AS NAME
         FROM BEACON_STATEMENT_CITATION
         JOIN BEACON_REFERENCE ON (BEACON_REFERENCE.BEACON_REFERENCE_ID = BEACON_STATEMENT_CITATION.BEACON_REFERENCE_ID)
-        WHERE BEACON_STATEMENT_CITATION.BEACON_STATEMENT_ID = ?
+        WHERE BEACON_STATEMENT_CITATION.BEACON_STATEMENT_ID IN (SELECT value FROM json_each(?))
     """
-    cur = connection.cursor()
-    cur.execute(query,(beacon_statement_id,))
-    return cur.fetchall()
+    return select_many(connection, query, beacon_statement_ids, 'BEACON_STATEMENT_ID')
 
 
 def find_metabolite_by_inchikey(inchikey):
@@ -453,35 +538,110 @@ def find_metabolite_by_synonym(synonym):
     return cur.fetchall()
 
 
-def get_synonyms(beacon_concept_id):
+def get_synonyms_many(beacon_concept_ids):
     query = """
-        SELECT SYNONYM, EXACT_MATCH
+        SELECT BEACON_CONCEPT_ID, SYNONYM, EXACT_MATCH
         FROM BEACON_CONCEPT_SYNONYM
-        WHERE BEACON_CONCEPT_ID = ?
+        WHERE BEACON_CONCEPT_ID IN (SELECT value FROM json_each(?))
     """
-    cur = connection.cursor()
-    cur.execute(query,(beacon_concept_id,))
-    return cur.fetchall()    
+    return select_many(connection, query, beacon_concept_ids, 'BEACON_CONCEPT_ID')
 
 
-def get_details(beacon_concept_id):
+def get_details_many(beacon_concept_ids):
     query = """
-        SELECT TAG, VALUE
+        SELECT BEACON_CONCEPT_ID, TAG, VALUE
         FROM BEACON_CONCEPT_DETAIL
-        WHERE BEACON_CONCEPT_ID = ?
+        WHERE BEACON_CONCEPT_ID IN (SELECT value FROM json_each(?))
     """
-    cur = connection.cursor()
-    cur.execute(query,(beacon_concept_id,))
-    return cur.fetchall()    
+    return select_many(connection, query, beacon_concept_ids, 'BEACON_CONCEPT_ID')
 
 
-def concept_count(concept):
+name_lookup = None
+
+
+def has_name_lookup():
+    """
+        Check whether the HMDB_NAME_LOOKUP table (see db/hmdb_name_lookup.py) is in the database
+    """
+    global name_lookup
+    if name_lookup is None:
+        cur = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'HMDB_NAME_LOOKUP'")
+        name_lookup = len(cur.fetchall()) > 0
+    return name_lookup
+
+
+def lookup_metabolites(keys):
+    """
+        Find metabolites by (key type, key) in the HMDB_NAME_LOOKUP table (names and synonyms
+        ignoring case), returns a dictionary of (key type, key) -> list of metabolites
+    """
     query = """
-        SELECT COUNT(DISTINCT BEACON_CONCEPT.ID) AS COUNT
-        FROM BEACON_CONCEPT
-        JOIN BEACON_CONCEPT_CATEGORY ON (BEACON_CONCEPT_CATEGORY.BEACON_CONCEPT_CATEGORY_ID = BEACON_CONCEPT.BEACON_CONCEPT_CATEGORY_ID)
-        WHERE BEACON_CONCEPT_CATEGORY.CATEGORY = ?
+        WITH query AS (
+            SELECT json_extract(value, '$[0]') AS KEY_TYPE, json_extract(value, '$[1]') AS QUERY_KEY
+            FROM json_each(?)
+        )
+        SELECT query.KEY_TYPE, query.QUERY_KEY, BEACON_CONCEPT.BEACON_CONCEPT_ID, BEACON_CONCEPT.ID, BEACON_CONCEPT.NAME, BEACON_CONCEPT.DESCRIPTION
+        FROM query
+        JOIN HMDB_NAME_LOOKUP ON HMDB_NAME_LOOKUP.KEY = (CASE WHEN query.KEY_TYPE IN ('name', 'synonym') THEN lower(query.QUERY_KEY) ELSE query.QUERY_KEY END)
+            AND HMDB_NAME_LOOKUP.KEY_TYPE = query.KEY_TYPE
+        JOIN BEACON_CONCEPT ON BEACON_CONCEPT.BEACON_CONCEPT_ID = HMDB_NAME_LOOKUP.BEACON_CONCEPT_ID
     """
+    metabolites = defaultdict(list)
+    if len(keys) == 0:
+        return metabolites
+    cur = connection.cursor()
+    cur.execute(query,(json.dumps(list(keys)),))
+    for row in cur.fetchall():
+        metabolites[(row['KEY_TYPE'], row['QUERY_KEY'])].append(row)
+    return metabolites
+
+
+statistics_table = None
+uniprot_table = None
+
+
+def has_statistics_table():
+    """
+        Check whether the CONCEPT_STATISTICS table (see db/hmdb_service_tables.py) is in the database
+    """
+    global statistics_table
+    if statistics_table is None:
+        cur = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'CONCEPT_STATISTICS'")
+        statistics_table = len(cur.fetchall()) > 0
+    return statistics_table
+
+
+def has_uniprot_table():
+    """
+        Check whether the UNIPROT_ENTREZ table (see db/hmdb_service_tables.py) is in the database
+    """
+    global uniprot_table
+    if uniprot_table is None:
+        cur = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'UNIPROT_ENTREZ'")
+        uniprot_table = len(cur.fetchall()) > 0
+    return uniprot_table
+
+
+concept_counts = {}
+
+
+def concept_count(concept):
+    # counted once per process, the transformers share the counts
+    if concept not in concept_counts:
+        concept_counts[concept] = count_concepts(concept)
+    return concept_counts[concept]
+
+
+def count_concepts(concept):
+    if has_statistics_table():
+        query = "SELECT COUNT FROM CONCEPT_STATISTICS WHERE CATEGORY = ?"
+    else:
+        query = """
+            SELECT COUNT(DISTINCT BEACON_CONCEPT.ID) AS COUNT
+            FROM BEACON_CONCEPT
+            JOIN BEACON_CONCEPT_CATEGORY ON (BEACON_CONCEPT_CATEGORY.BEACON_CONCEPT_CATEGORY_ID = BEACON_CONCEPT.BEACON_CONCEPT_CATEGORY_ID)
+            WHERE BEACON_CONCEPT_CATEGORY.CATEGORY = ?
+        """
     cur = connection.cursor()
     cur.execute(query, (concept,))
     count = -1
@@ -490,6 +650,15 @@ def concept_count(concept):
     return count
 
 
+def get_entrez_ids_many(uniprot_ids):
+    query = """
+        SELECT UNIPROT, ENTREZ
+        FROM UNIPROT_ENTREZ
+        WHERE UNIPROT IN (SELECT value FROM json_each(?))
+    """
+    return {uniprot_id: rows[0]['ENTREZ'] for (uniprot_id, rows) in select_many(connection, query, uniprot_ids, 'UNIPROT').items()}
+
+
 def beacon_categories():
     query = """ 
         SELECT BEACON_CONCEPT_CATEGORY_ID, CATEGORY
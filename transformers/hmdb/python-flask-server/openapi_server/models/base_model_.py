@@ -9,6 +9,10 @@ T = typing.TypeVar('T')
 
 
 class Model(object):
+    # no instance __dict__ is required by the base class, so that
+    # models can declare __slots__
+    __slots__ = ()
+
     # openapiTypes: The key is attribute name and the
     # value is attribute type.
     openapi_types = {}
@@ -62,7 +66,9 @@ class Model(object):
 
     def __eq__(self, other):
         """Returns true if both objects are equal"""
-        return self.__dict__ == other.__dict__
+        if type(self) is not type(other):
+            return False
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.openapi_types)
 
     def __ne__(self, other):
         """Returns true if both objects are not equal"""
@@ -1,6 +1,6 @@
-from flask import g
 from collections import defaultdict
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool
 from openapi_server.models.names import Names
 from openapi_server.models.attribute import Attribute
 from openapi_server.models.element import Element
@@ -184,19 +184,15 @@ class Inxight_DrugsActiveIngredientsTransformer(Transformer):
 ###############################################################
 class Inxight_Drugs_DataSupply():
 
+    # SQLite database file is located in the python-flask-server/data directory
+    database = ConnectionPool("data/Inxightdb.db", detect_types=sqlite3.PARSE_DECLTYPES)
+
     def get_db():
-        if 'db' not in g:
-            g.db = sqlite3.connect("data/Inxightdb.db",
-                    detect_types=sqlite3.PARSE_DECLTYPES
-            ) # SQLite database file is located in the python-flask-server/data directory
-            g.db.row_factory = sqlite3.Row
-        return g.db
+        return Inxight_Drugs_DataSupply.database.connection()
 
 
     def close_db(self, e=None):
-        db = g.pop('db', None)
-        if db is not None:
-            db.close()
+        Inxight_Drugs_DataSupply.database.close()
 
 
 #   Get the substance's synonyms and attributes data
@@ -976,10 +972,7 @@ class Inxight_Drugs_DataSupply():
             WHERE {search}
             GROUP BY relationships.type;
             """.format(search=search)
-        connection = sqlite3.connect("data/Inxightdb.db",
-                    detect_types=sqlite3.PARSE_DECLTYPES
-        ) # SQLite database file is located in the python-flask-server/data directory
-        connection.row_factory = sqlite3.Row
+        connection = Inxight_Drugs_DataSupply.get_db()
         cur10 = connection.execute(query10)
         json_obj["knowledge_map"]["predicates"][0]["relations"].clear()  # step 1, clear the list of old relations
         for row in cur10.fetchall():
@@ -995,10 +988,7 @@ class Inxight_Drugs_DataSupply():
             SELECT COUNT ( DISTINCT uuid ) AS "Number of substances" 
             FROM substances;
             """
-        connection = sqlite3.connect("data/Inxightdb.db",
-                    detect_types=sqlite3.PARSE_DECLTYPES
-        ) # SQLite database file is located in the python-flask-server/data directory
-        connection.row_factory = sqlite3.Row
+        connection = Inxight_Drugs_DataSupply.get_db()
         cur11 = connection.execute(query11)
         json_obj["knowledge_map"]["nodes"]["ChemicalSubstance"]["count"] = -1  # step 1, clear the old count
         for row in cur11.fetchall():
@@ -1016,10 +1006,7 @@ class Inxight_Drugs_DataSupply():
             JOIN unii_lookup ON substances.UNII = unii_lookup.UNII
             WHERE NOT RXCUI ISNULL AND LENGTH(RXCUI) > 0;
             """
-        connection = sqlite3.connect("data/Inxightdb.db",
-                    detect_types=sqlite3.PARSE_DECLTYPES
-        ) # SQLite database file is located in the python-flask-server/data directory
-        connection.row_factory = sqlite3.Row
+        connection = Inxight_Drugs_DataSupply.get_db()
         cur12 = connection.execute(query12)
         json_obj["knowledge_map"]["nodes"]["Drug"]["count"] = -1  # step 1, clear the old count
         for row in cur12.fetchall():
@@ -3,6 +3,7 @@
 import connexion
 
 from openapi_server import encoder
+from transformers.server import serve
 
 app = connexion.App(__name__, specification_dir='./openapi/')
 app.app.json_encoder = encoder.JSONEncoder
@@ -10,7 +11,7 @@ app.add_api('openapi.yaml',arguments={'title': 'Transformer API for Pharos expan
 
 
 def main():
-    app.run(port=8220)
+    serve(app, port=8220)
 
 
 if __name__ == '__main__':
@@ -19,6 +19,26 @@ class Element(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'id': str,
+        'biolink_class': str,
+        'identifiers': Dict[str, object],
+        'names_synonyms': List[Names],
+        'attributes': List[Attribute],
+        'source': str
+    }
+
+    attribute_map = {
+        'id': 'id',
+        'biolink_class': 'biolink_class',
+        'identifiers': 'identifiers',
+        'names_synonyms': 'names_synonyms',
+        'attributes': 'attributes',
+        'source': 'source'
+    }
+
+    __slots__ = ('_id', '_biolink_class', '_identifiers', '_names_synonyms', '_attributes', '_source')
+
     def __init__(self, id=None, biolink_class=None, identifiers=None, names_synonyms=None, attributes=None, source=None):  # noqa: E501
         """Element - a model defined in OpenAPI
 
@@ -35,24 +55,6 @@ class Element(Model):
         :param source: The source of this Element.  # noqa: E501
         :type source: str
         """
-        self.openapi_types = {
-            'id': str,
-            'biolink_class': str,
-            'identifiers': Dict[str, object],
-            'names_synonyms': List[Names],
-            'attributes': List[Attribute],
-            'source': str
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'biolink_class': 'biolink_class',
-            'identifiers': 'identifiers',
-            'names_synonyms': 'names_synonyms',
-            'attributes': 'attributes',
-            'source': 'source'
-        }
-
         self._id = id
         self._biolink_class = biolink_class
         self._identifiers = identifiers
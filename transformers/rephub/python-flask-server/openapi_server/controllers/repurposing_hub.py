@@ -1,7 +1,7 @@
-import sqlite3
 import re
 
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool
 from transformers.transformer import Transformer
 from openapi_server.models.compound_info import CompoundInfo
 from openapi_server.models.compound_info_identifiers import CompoundInfoIdentifiers
@@ -121,7 +121,7 @@ class RepurposingHubTargets(Transformer):
 
 
 
-connection = sqlite3.connect("RepurposingHub.sqlite", check_same_thread=False)
+connection = ConnectionPool("RepurposingHub.sqlite", row_factory=None)
 
 
 def find_compound_by_name(name):
@@ -100,6 +100,17 @@ UNII_TABLE = """
 # );
 
 
+# names (RXNCONSO.STR, UNII.PT) and InChIKeys of the substances with an InChIKey in RxNorm,
+# case-folded, with their UNII codes: the compound producer resolves names with this table
+NAME_LOOKUP_TABLE = """
+    CREATE TABLE NAME_LOOKUP (
+    KEY  TEXT NOT NULL,
+    UNII TEXT NOT NULL,
+    PRIMARY KEY (KEY, UNII)
+    ) WITHOUT ROWID;
+"""
+
+
 def create_tables():
     cur = connection.cursor()
     cur.execute(RXNCONSO_TABLE)
@@ -170,6 +181,32 @@ def create_indexes():
     connection.commit()
 
 
+def create_name_lookup():
+    statement = """
+        INSERT OR IGNORE INTO NAME_LOOKUP (KEY, UNII)
+        SELECT lower(RXNCONSO.STR), UNII.UNII
+        FROM RXNCONSO
+        JOIN UNII ON RXNCONSO.CODE = UNII.UNII
+        WHERE UNII.INCHIKEY IS NOT NULL AND UNII.INCHIKEY != ''
+        UNION
+        SELECT lower(UNII.PT), UNII.UNII
+        FROM UNII
+        WHERE UNII.PT IS NOT NULL AND UNII.INCHIKEY IS NOT NULL AND UNII.INCHIKEY != ''
+        AND EXISTS (SELECT 1 FROM RXNCONSO WHERE RXNCONSO.CODE = UNII.UNII)
+        UNION
+        SELECT lower(UNII.INCHIKEY), UNII.UNII
+        FROM UNII
+        WHERE UNII.INCHIKEY IS NOT NULL AND UNII.INCHIKEY != ''
+        AND EXISTS (SELECT 1 FROM RXNCONSO WHERE RXNCONSO.CODE = UNII.UNII)
+    """
+    cur = connection.cursor()
+    cur.execute("DROP TABLE IF EXISTS NAME_LOOKUP")
+    cur.execute(NAME_LOOKUP_TABLE)
+    cur.execute(statement)
+    cur.close()
+    connection.commit()
+
+
 def parse_rxnconso(filename):
     cur = connection.cursor()
     with open(filename, 'r') as f:
@@ -304,8 +341,14 @@ def main():
     unii = parse_unii(
         r'C:\Users\kang\Documents\GitHub\scb-kp-dev\transformers\rxnorm\generate_database\UNII_Records_18Aug2020.txt')
     create_indexes()
+    create_name_lookup()
     connection.close()
 
 
 if __name__ == '__main__':
-    main()
+    # python build_RxNorm_sqlite_db.py name_lookup: (re)build only the NAME_LOOKUP table of an existing database
+    if len(sys.argv) > 1 and sys.argv[1] == 'name_lookup':
+        create_name_lookup()
+        connection.close()
+    else:
+        main()
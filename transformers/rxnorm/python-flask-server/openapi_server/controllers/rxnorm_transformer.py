@@ -1,6 +1,7 @@
-import sqlite3
+from collections import defaultdict
 
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool, select_many
 from openapi_server.models.element import Element
 from openapi_server.models.names import Names
 from openapi_server.models.connection import Connection
@@ -11,11 +12,8 @@ SOURCE = 'RxNorm'
 RXNORM = 'RxNorm'
 UNIISOURCE = 'UNII'
 
-# because the connection is outside of the function, check_same_thread=False is needed.
-connection = sqlite3.connect(
-    "data/RXNORM+UNII.sqlite", check_same_thread=False)
-# use actual column name instead of the numbers
-connection.row_factory = sqlite3.Row
+# each thread gets its own read-only connection (rows use actual column names instead of the numbers)
+connection = ConnectionPool("data/RXNORM+UNII.sqlite")
 
 
 # RxNorm
@@ -49,29 +47,38 @@ class RxNormCompoundProducer(Transformer):
         super().__init__(self.variables, definition_file='info/molecules_transformer_info.json')
 
     def produce(self, controls):
-        print(controls)
         compound_list = []
-        names = controls['compounds'].split(';')
-    #   find drug data for each compound name that were submitted
+        names = [name.strip() for name in controls['compounds'].split(';')]
+    #   find UNII codes of all compound names that were submitted
+        query_names = set(name for name in names if not name.startswith('UNII:'))
+        if has_name_lookup():
+            name_uniis = lookup_names(query_names)
+        else:
+            name_uniis = {name: self.find_unii_by_name(name) for name in query_names}
+        hits = []
         for name in names:
-            name = name.strip()
-
             if name.startswith('UNII:'):
-                for compound in self.find_compound_by_unii(name[5:]):
-                    compound_list.append(compound)
+                hits.append((name[5:], None))
             else:
-                for compound in self.find_compound_by_name(name):
-                    compound_list.append(compound)
+                hits.extend((unii, name) for unii in name_uniis.get(name, []))
+    #   UNII records of all compounds found
+        unii_records = get_unii_records(set(unii for (unii, name) in hits))
+        for (unii, name) in hits:
+            compound = self.create_compound(unii, unii_records[unii])
+            if name is not None:
+                compound.attributes.append(Attribute(
+                    name='query name',
+                    value=name,
+                    provided_by=self.info.name,
+                ))
+            compound_list.append(compound)
 
         return compound_list
 
-    def find_compound_by_name(self, name):
+    def find_unii_by_name(self, name):
         """
-            Find compound by a name
+            Find UNII codes of a name (without the NAME_LOOKUP table)
         """
-        compounds = []
-        # slect * is not a good practice rather than * distinct listing is better.
-
         query = """
         select
             distinct RXNCONSO.CODE
@@ -86,59 +93,26 @@ class RxNormCompoundProducer(Transformer):
         """
         cur = connection.execute(
             query, (name, name, name))  # in order to make the varible as a tuple of one explicitely.
+        return [row['CODE'] for row in cur.fetchall()]
 
-        # TODO issue SQL query and collect results
-        # for each hit (i.e., of the same drug name, an unlikely but possible occurrence)
-        for row in cur.fetchall():
-            id = "UNII:" + row['CODE']
-            for compound in self.find_compound_by_unii(row['CODE']):
-                compound.attributes.append(Attribute(
-                    name='query name',
-                    value=name,
-                    provided_by=self.info.name,
-                ))
-
-            compounds.append(compound)
-
-        return compounds
-
-    def find_compound_by_unii(self, unii):
+    def create_compound(self, unii, records):
         """
-            Find compound by a unii
+            Create compound element from the UNII records of a unii
         """
-        # slect * is not a good practice rather than * distinct listing is better.
         id = "UNII:" + unii
 
-        query = """
-        select
-            UNII.UNII,
-            UNII.PT,
-            UNII.RN,
-            UNII.NCIT,
-            UNII.PUBCHEM,
-            UNII.INCHIKEY,
-            UNII.SMILES,
-            RXNCONSO.CODE
-        from RXNCONSO
-        join UNII on RXNCONSO.CODE = UNII.UNII
-        where (UNII.UNII = ?)
-        """
-        cur = connection.execute(
-            query, (unii,))  # in order to make the varible as a tuple of one explicitely.
-
         compound = Element(
             id=id,
             biolink_class='ChemicalSubstance',
             identifiers={'unii': unii},
-            attributes=self.find_compound_attributes(unii),
+            attributes=self.compound_attributes(records),
             connections=[],
             source=self.info.name
         )
 
-        # TODO issue SQL query and collect results
-        # for each hit (i.e., of the same drug name, an unlikely but possible occurrence)
-        for row in cur.fetchall():
-            if (row['UNII'] == unii):
+        # names and identifiers of the record in RxNorm
+        for row in records:
+            if row['IN_RXNORM']:
                 compound.names_synonyms = [Names(name=row['PT'],
                                                  synonyms=[],
                                                  source=UNIISOURCE)]  # add names & synonyms from the database
@@ -151,27 +125,14 @@ class RxNormCompoundProducer(Transformer):
                     'smiles': row['SMILES'],
                     'pubchem': 'CID:' + str(row['pubchem'])}
 
-        return [compound]
+        return compound
 
-    def find_compound_attributes(self, unii):
+    def compound_attributes(self, records):
         """
-            Find compound attribute
+            Compound attributes
         """
         attributes = []
-        # slect * is not a good practice rather than * distinct listing is better.
-
-        query = """
-        select
-            UNII.UNII,
-            UNII.MF,
-            UNII.INGREDIENT_TYPE
-        from UNII
-        where (UNII.UNII = ?)
-        """
-        cur = connection.execute(
-            query, (unii,))  # in order to make the varible as a tuple of one explicitely.
-
-        for row in cur.fetchall():
+        for row in records:
 
             attribute = Attribute(
                 name='molecular formula',
@@ -193,6 +154,58 @@ class RxNormCompoundProducer(Transformer):
         return attributes
 
 
+name_lookup = None
+
+
+def has_name_lookup():
+    """
+        Check whether the NAME_LOOKUP table (see generate_database/build_RxNorm_sqlite_db.py) is in the database
+    """
+    global name_lookup
+    if name_lookup is None:
+        cur = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'NAME_LOOKUP'")
+        name_lookup = len(cur.fetchall()) > 0
+    return name_lookup
+
+
+def lookup_names(names):
+    """
+        Find UNII codes of names, preferred terms and InChIKeys (ignoring case) in the
+        NAME_LOOKUP table, returns a dictionary of name -> list of UNII codes
+    """
+    query = """
+        SELECT query.value AS QUERY_NAME, NAME_LOOKUP.UNII
+        FROM (SELECT DISTINCT value FROM json_each(?)) AS query
+        JOIN NAME_LOOKUP ON NAME_LOOKUP.KEY = lower(query.value)
+    """
+    matches = select_many(connection, query, names, 'QUERY_NAME')
+    return {name: [row['UNII'] for row in rows] for (name, rows) in matches.items()}
+
+
+def get_unii_records(uniis):
+    """
+        UNII records of unii codes (IN_RXNORM: the unii is a code in RXNCONSO),
+        returns a dictionary of unii -> list of records
+    """
+    query = """
+        SELECT
+            UNII.UNII,
+            UNII.PT,
+            UNII.RN,
+            UNII.NCIT,
+            UNII.PUBCHEM,
+            UNII.INCHIKEY,
+            UNII.SMILES,
+            UNII.MF,
+            UNII.INGREDIENT_TYPE,
+            EXISTS (SELECT 1 FROM RXNCONSO WHERE RXNCONSO.CODE = UNII.UNII) AS IN_RXNORM
+        FROM UNII
+        WHERE UNII.UNII IN (SELECT value FROM json_each(?))
+        ORDER BY UNII.rowid
+    """
+    return select_many(connection, query, uniis, 'UNII')
+
+
 # RxNorm
 
 
@@ -221,7 +234,6 @@ class RxNormDrugProducer(Transformer):
         super().__init__(self.variables, definition_file='info/drugs_transformer_info.json')
 
     def produce(self, controls):
-        print(controls)
         drug_list = []
         names = controls['drugs'].split(';')
         # unii = con
@@ -402,16 +414,18 @@ class RxNormRelationTransformer(Transformer):
         """
             Find drug rxcui relations
         """
-        print(collection)
-        
+        rxcuis = []
         for element in collection:
             rxcui = element.identifiers['rxnorm']
-            print(rxcui)
             if rxcui.startswith('RXCUI:'):
                 rxcui = rxcui[6:]
+            rxcuis.append(rxcui)
 
+        # relations of all drugs of the collection
+        relations = find_relations(set(rxcuis))
 
-            for substance in self.find_drug(rxcui, element.id):
+        for (element, rxcui) in zip(collection, rxcuis):
+            for substance in self.find_drug(relations[rxcui], element.id):
                 if substance.id not in substances:
                     substances[substance.id] = substance
                     substance_list.append(substance)
@@ -421,22 +435,16 @@ class RxNormRelationTransformer(Transformer):
         return substance_list
 
 
-    def find_drug(self, rxcui, source_element_id):
+    def find_drug(self, relations, source_element_id):
 
         substance_list = []
 
-        query = """
-        SELECT
-            RXNREL.RXCUI1,
-            RXNREL.RXCUI2
-        from RXNREL
+        # relations of the drug grouped by related substance
+        substance_relations = defaultdict(list)
+        for row in relations:
+            substance_relations[row['RXCUI2']].append(row)
 
-        where RXNREL.RXCUI1 = ?
-        """
-        cur = connection.execute(
-            query, (rxcui, ))
-
-        for row in cur.fetchall():
+        for row in relations:
             substance_rxcui2 = row['RXCUI2']
 
             if substance_rxcui2 is not None:
@@ -453,7 +461,7 @@ class RxNormRelationTransformer(Transformer):
                 connect = Connection(
                     source_element_id=source_element_id,
                     type=self.info.knowledge_map.predicates[0].predicate,
-                    attributes=self.connection_attributes(rxcui, substance_rxcui2)
+                    attributes=self.connection_attributes(substance_relations[substance_rxcui2])
                 )
                 substance.connections.append(connect)
 
@@ -461,27 +469,13 @@ class RxNormRelationTransformer(Transformer):
 
 
 
-    def connection_attributes(self, rxcui, substance_rxcui2):
+    def connection_attributes(self, relations):
         """
             connection attributes
         """
         attributes = []
 
-        query = """
-        SELECT
-            RXNREL.RXCUI1,
-            RXNREL.REL,
-            RXNREL.RXCUI2,
-            RXNREL.RELA
-        from RXNREL
-
-        where RXNREL.RXCUI1 = ? and RXNREL.RXCUI2 =?
-
-        """
-        cur = connection.execute(
-            query, (rxcui, substance_rxcui2)) 
-
-        for row in cur.fetchall():
+        for row in relations:
        
 
             attribute = Attribute(
@@ -503,3 +497,21 @@ class RxNormRelationTransformer(Transformer):
             attributes.append(attribute)
 
         return attributes
+
+
+def find_relations(rxcuis):
+    """
+        Relations of drugs (by rxcui), returns a dictionary of rxcui -> list of relations
+    """
+    query = """
+        SELECT
+            query.value AS QUERY_RXCUI,
+            RXNREL.RXCUI1,
+            RXNREL.REL,
+            RXNREL.RXCUI2,
+            RXNREL.RELA
+        FROM (SELECT DISTINCT value FROM json_each(?)) AS query
+        JOIN RXNREL ON RXNREL.RXCUI1 = query.value
+        ORDER BY RXNREL.rowid
+    """
+    return select_many(connection, query, rxcuis, 'QUERY_RXCUI')
@@ -17,6 +17,22 @@ class Connection(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'source_element_id': str,
+        'type': str,
+        'evidence_type': str,
+        'attributes': List[Attribute]
+    }
+
+    attribute_map = {
+        'source_element_id': 'source_element_id',
+        'type': 'type',
+        'evidence_type': 'evidence_type',
+        'attributes': 'attributes'
+    }
+
+    __slots__ = ('_source_element_id', '_type', '_evidence_type', '_attributes')
+
     def __init__(self, source_element_id=None, type=None, evidence_type=None, attributes=None):  # noqa: E501
         """Connection - a model defined in OpenAPI
 
@@ -29,20 +45,6 @@ class Connection(Model):
         :param attributes: The attributes of this Connection.  # noqa: E501
         :type attributes: List[Attribute]
         """
-        self.openapi_types = {
-            'source_element_id': str,
-            'type': str,
-            'evidence_type': str,
-            'attributes': List[Attribute]
-        }
-
-        self.attribute_map = {
-            'source_element_id': 'source_element_id',
-            'type': 'type',
-            'evidence_type': 'evidence_type',
-            'attributes': 'attributes'
-        }
-
         self._source_element_id = source_element_id
         self._type = type
         self._evidence_type = evidence_type
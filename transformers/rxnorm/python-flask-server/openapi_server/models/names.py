@@ -15,6 +15,22 @@ class Names(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'name': str,
+        'synonyms': List[str],
+        'source': str,
+        'url': str
+    }
+
+    attribute_map = {
+        'name': 'name',
+        'synonyms': 'synonyms',
+        'source': 'source',
+        'url': 'url'
+    }
+
+    __slots__ = ('_name', '_synonyms', '_source', '_url')
+
     def __init__(self, name=None, synonyms=None, source=None, url=None):  # noqa: E501
         """Names - a model defined in OpenAPI
 
@@ -27,20 +43,6 @@ class Names(Model):
         :param url: The url of this Names.  # noqa: E501
         :type url: str
         """
-        self.openapi_types = {
-            'name': str,
-            'synonyms': List[str],
-            'source': str,
-            'url': str
-        }
-
-        self.attribute_map = {
-            'name': 'name',
-            'synonyms': 'synonyms',
-            'source': 'source',
-            'url': 'url'
-        }
-
         self._name = name
         self._synonyms = synonyms
         self._source = source
@@ -1,23 +1,55 @@
+import os
 import sys
+import gzip
 import sqlite3
-import requests
-import pandas as pd
-import numpy as np
-from memory_profiler import profile
+from itertools import islice
+
+# Builds the STITCH database from the STITCH (v5.0) files:
+#   python STITCH_db_generation.py [directory of the STITCH files]
+#
+# The files (plain or gzipped) are read line by line and loaded in chunks, so the memory used does not
+# depend on their size. Links and actions are restricted to human (9606) proteins, which allows the
+# all-species files to be used as well. In links and actions, chemicals and proteins are stored as
+# integer keys (see chemical_key and protein_key); the STITCH ids are in the chemical_ids and
+# protein_ids lookup tables. Tables are loaded and indexed in a single transaction.
 
 #Make sure no database already exists with this name
-connection = sqlite3.connect("data/STITCH_db_final.sqlite", check_same_thread=False)
-cur = connection.cursor()
+DATABASE = "data/STITCH_db_final.sqlite"
 CHUNK_SIZE = 25000
-DO_IF_EXISTS='append'
+SPECIES = '9606.'
+
+CHEMICALS_FILE = 'chemicals.v5.0.tsv'
+CHEMICALS_INCHIKEYS_FILE = 'chemicals.inchikeys.v5.0.tsv'
+LINKS_FILE = '9606.protein_chemical.links.transfer.v5.0.tsv'
+ACTIONS_FILE = '9606.actions.v5.0.tsv'
+
+pragmas = """
+PRAGMA page_size = 8192;
+PRAGMA journal_mode = OFF;
+PRAGMA synchronous = OFF;
+PRAGMA locking_mode = EXCLUSIVE;
+PRAGMA temp_store = MEMORY;
+PRAGMA cache_size = -1048576;
+"""
+
 create_tables = """
+CREATE TABLE chemical_ids (
+    chemical  INTEGER PRIMARY KEY,
+    stitch_id TEXT
+);
+
+CREATE TABLE protein_ids (
+    protein    INTEGER PRIMARY KEY,
+    ensembl_id TEXT
+);
+
 CREATE TABLE actions (
-    item_id_a   TEXT,
-    item_id_b   TEXT,
-    mode        TEXT,
-    [action]    TEXT,
-    a_is_acting TEXT,
-    score       INTEGER
+    chemical          INTEGER,
+    protein           INTEGER,
+    mode              TEXT,
+    [action]          TEXT,
+    protein_is_acting INTEGER,
+    score             INTEGER
 );
 
 CREATE TABLE chemical_chemical_links_detailed (
@@ -45,8 +77,8 @@ CREATE TABLE chemicals_inchikeys (
 );
 
 CREATE TABLE protein_chemical_links_transfer (
-    chemical                 TEXT,
-    protein                  TEXT,
+    chemical                 INTEGER,
+    protein                  INTEGER,
     experimental_direct      INTEGER,
     experimental_transferred INTEGER,
     prediction_direct        INTEGER,
@@ -81,42 +113,131 @@ CREATE INDEX chemicals_inchikeys_inchikey_idx ON chemicals_inchikeys (
 );
 
 CREATE INDEX protein_chemical_links_transfer_chemical_idx ON protein_chemical_links_transfer (
-    chemical
+    chemical,
+    combined_score
 );
-"""
-
-
-def parse_chemicals(filename, connection):
-    chemical_df = pd.read_csv(filename, sep="\t", header=0)
-    chemical_df.to_sql("chemical_data", connection, if_exists=DO_IF_EXISTS, index = False, chunksize=CHUNK_SIZE)
-
-@profile
-def build_database():
-    cur.executescript(create_tables)
 
-    parse_chemicals('chemicals.v5.0.tsv', connection)
-
-    protein_chemical_links_transfer_df = pd.read_csv('9606.protein_chemical.links.transfer.v5.0.tsv', sep="\t", header=0)
-    protein_chemical_links_transfer_df.to_sql("protein_chemical_links_transfer", connection, if_exists=DO_IF_EXISTS, index = False, chunksize=CHUNK_SIZE)
-
-    chemicals_inchikeys_df = pd.read_csv('chemicals.inchikeys.v5.0.tsv', sep="\t", header=0)
-    chemicals_inchikeys_df.to_sql("chemicals_inchikeys", connection, if_exists=DO_IF_EXISTS, index = False, chunksize=CHUNK_SIZE)
+CREATE INDEX actions_chemical_protein_idx ON actions (
+    chemical,
+    protein
+);
+"""
 
-    actions_df = pd.read_csv('9606.actions.v5.0.tsv', sep="\t", header=0)
-    actions_df.to_sql("actions", connection, if_exists=DO_IF_EXISTS, index = False, chunksize=CHUNK_SIZE)
 
-    cur.executescript(create_indexes)
-    connection.commit()
-    cur.close()
+def execute_script(connection, script):
+    # statements are executed one by one (executescript would commit the open transaction)
+    for statement in script.split(';'):
+        if statement.strip() != '':
+            connection.execute(statement)
+
+
+def chemical_key(stitch_id):
+    # CIDs00002244 (stereo) -> 2244, CIDm00002244 (flat) -> -2244
+    key = int(stitch_id[4:])
+    return key if stitch_id[3] == 's' else -key
+
+
+def protein_key(ensembl_id):
+    # 9606.ENSP00000000233 -> 233
+    if not ensembl_id.startswith(SPECIES + 'ENSP'):
+        raise ValueError("unexpected protein id '{}'".format(ensembl_id))
+    return int(ensembl_id[len(SPECIES + 'ENSP'):])
+
+
+def find_file(directory, filename):
+    for name in (filename, filename + '.gz'):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(os.path.join(directory, filename))
+
+
+def read_rows(path):
+    # rows of a tab-separated file with a header line, empty values as NULL
+    with (gzip.open(path, 'rt') if path.endswith('.gz') else open(path)) as f:
+        next(f)
+        for line in f:
+            yield [value if value != '' else None for value in line.rstrip('\n').split('\t')]
+
+
+def chunks(rows):
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def insert_ids(connection, chemicals, proteins):
+    connection.executemany("INSERT OR IGNORE INTO chemical_ids (chemical, stitch_id) VALUES (?,?)", chemicals)
+    connection.executemany("INSERT OR IGNORE INTO protein_ids (protein, ensembl_id) VALUES (?,?)", proteins)
+
+
+def load_table(connection, path, table, columns):
+    statement = "INSERT INTO {} ({}) VALUES ({})".format(table, ', '.join(columns), ', '.join('?' * len(columns)))
+    count = 0
+    for chunk in chunks(read_rows(path)):
+        connection.executemany(statement, chunk)
+        count += len(chunk)
+    print(count, "rows loaded into", table)
+
+
+def load_links(connection, path):
+    statement = "INSERT INTO protein_chemical_links_transfer VALUES (?,?,?,?,?,?,?,?,?,?,?)"
+    human_links = (row for row in read_rows(path) if row[1].startswith(SPECIES))
+    count = 0
+    for chunk in chunks(human_links):
+        connection.executemany(statement, [[chemical_key(row[0]), protein_key(row[1])] + row[2:] for row in chunk])
+        insert_ids(connection,
+            set((chemical_key(row[0]), row[0]) for row in chunk),
+            set((protein_key(row[1]), row[1]) for row in chunk))
+        count += len(chunk)
+    print(count, "rows loaded into protein_chemical_links_transfer")
+
+
+def chemical_protein_actions(path):
+    # (chemical, protein, mode, action, protein_is_acting, score) of actions between a chemical and a human protein
+    for (item_id_a, item_id_b, mode, action, a_is_acting, score) in read_rows(path):
+        a_is_acting = a_is_acting is not None and a_is_acting.startswith('t')
+        if item_id_a.startswith('CID') and item_id_b.startswith(SPECIES):
+            yield (item_id_a, item_id_b, mode, action, not a_is_acting, score)
+        elif item_id_b.startswith('CID') and item_id_a.startswith(SPECIES):
+            yield (item_id_b, item_id_a, mode, action, a_is_acting, score)
+
+
+def load_actions(connection, path):
+    statement = "INSERT INTO actions (chemical, protein, mode, [action], protein_is_acting, score) VALUES (?,?,?,?,?,?)"
+    count = 0
+    for chunk in chunks(chemical_protein_actions(path)):
+        connection.executemany(statement,
+            [(chemical_key(chemical), protein_key(protein), mode, action, protein_is_acting, score)
+                for (chemical, protein, mode, action, protein_is_acting, score) in chunk])
+        insert_ids(connection,
+            set((chemical_key(row[0]), row[0]) for row in chunk),
+            set((protein_key(row[1]), row[1]) for row in chunk))
+        count += len(chunk)
+    print(count, "rows loaded into actions")
+
+
+def build_database(directory):
+    connection = sqlite3.connect(DATABASE, isolation_level=None)
+    execute_script(connection, pragmas)
+    connection.execute("BEGIN")
+    execute_script(connection, create_tables)
+
+    load_table(connection, find_file(directory, CHEMICALS_FILE), 'chemical_data',
+        ['chemical', 'name', 'molecular_weight', 'SMILES_string'])
+    load_links(connection, find_file(directory, LINKS_FILE))
+    load_table(connection, find_file(directory, CHEMICALS_INCHIKEYS_FILE), 'chemicals_inchikeys',
+        ['flat_chemical_id', 'stereo_chemical_id', 'source_cid', 'inchikey'])
+    load_actions(connection, find_file(directory, ACTIONS_FILE))
+
+    # indexes are built once, after the bulk load
+    execute_script(connection, create_indexes)
+    connection.execute("ANALYZE")
+    connection.execute("COMMIT")
     connection.close()
 
-build_database()
-
-
-
-
-
-
-
-
 
+if __name__ == '__main__':
+    build_database(sys.argv[1] if len(sys.argv) > 1 else '.')
@@ -1,15 +1,17 @@
 from transformers.transformer import Transformer
+from transformers.database import ConnectionPool
 
 from openapi_server.models.names import Names
 from openapi_server.models.attribute import Attribute
 from openapi_server.models.element import Element
 from openapi_server.models.connection import Connection
 
-import sqlite3
 import re
+import json
+import math
+from collections import defaultdict
 
-connection = sqlite3.connect("data/STITCH.sqlite", check_same_thread=False)
-connection.row_factory = sqlite3.Row
+connection = ConnectionPool("data/STITCH.sqlite")
 inchikey_regex = re.compile('[A-Z]{14}-[A-Z]{10}-[A-Z]')
 SOURCE = "STITCH"
 
@@ -173,43 +175,37 @@ class StitchLinksTransformer(Transformer):
         #Find targets by compound names
         protein_list = []
         proteins = {}
+        # with a single compound, a protein is complete once its links are added and can be streamed
+        stream = len(compound_list) == 1
         for compound in compound_list:
             if compound.identifiers.get('pubchem') == None:
                 continue
             cid_without_leading_zeros = self.get_pubchemCID(compound)
             cid = "CIDs" + "0" * (8 - len(cid_without_leading_zeros)) + cid_without_leading_zeros
-            query = """
-            SELECT DISTINCT
-                chemical,
-                protein,
-                experimental_direct,
-                experimental_transferred,
-                prediction_direct,
-                prediction_transferred,
-                database_direct,
-                database_transferred,
-                textmining_direct,
-                textmining_transferred,
-                combined_score
-            FROM protein_chemical_links_transfer 
-            WHERE chemical = ? AND combined_score >= ?
-            ORDER BY combined_score DESC;
-            """
-            proteins_added = 0
-            cur = connection.execute(query, (cid,min_score))
-            for row in cur.fetchall():
-                if limit <= 0 or proteins_added < limit:
-                    protein_id = "ENSEMBL:" + row["protein"][5:]
-                    if protein_id not in proteins:
-                        protein = self.get_protein(protein_id)[0]
-                        protein_list.append(protein)
-                        proteins[protein_id] = protein
-                    #else: protein = proteins[protein_id]
-                    protein = proteins[protein_id]
-                    # add connection element here by calling add_connection function
-                    self.add_connections(row, protein, compound)
-                    proteins_added += 1
-        return protein_list
+            # not a PubChem CID (e.g. CID:abc), no links
+            if chemical_key(cid) is None:
+                continue
+            # the limit is applied by the database
+            rows = get_links(cid, min_score, math.ceil(limit) if limit > 0 else -1)
+            # actions of all links of the compound with one query
+            actions = get_actions(chemical_key(cid), [row['protein_key'] for row in rows])
+            # links grouped by protein (in the order of their best link)
+            protein_links = defaultdict(list)
+            for row in rows:
+                protein_links["ENSEMBL:" + row["protein"][5:]].append(row)
+            for protein_id, links in protein_links.items():
+                if protein_id not in proteins:
+                    protein = self.get_protein(protein_id)[0]
+                    protein_list.append(protein)
+                    proteins[protein_id] = protein
+                protein = proteins[protein_id]
+                # add connection element here by calling add_connection function
+                for row in links:
+                    self.add_connections(row, protein, compound, actions.get(row['protein_key'], []))
+                if stream:
+                    yield protein
+        if not stream:
+            yield from protein_list
 
     # Gets information about target from target id and creates element and adds to gene_list
     def get_protein(self,protein_id):
@@ -247,19 +243,19 @@ class StitchLinksTransformer(Transformer):
         pass
 
     # Function to get connections
-    def add_connections(self, row, protein, compound):
+    def add_connections(self, row, protein, compound, actions):
         connection1 = Connection(
             source_element_id=compound.id,
             type=self.info.knowledge_map.predicates[0].predicate,
             attributes=[]
         )
 
-        self.get_connections_attributes(row, connection1)
+        self.get_connections_attributes(row, connection1, actions)
         protein.connections.append(connection1)
 
     # Function to get attributes from remaining characteristics in Interactions table (currently appending attributes to
-    # element object). Also queries the Action table.
-    def get_connections_attributes (self,row,connection1):
+    # element object) and from the actions of the link (see get_actions).
+    def get_connections_attributes (self,row,connection1,actions):
         attributes_list= ['experimental_direct', 'experimental_transferred', 'prediction_direct',
             'prediction_transferred', 'database_direct', 'database_transferred', 'textmining_direct',
             'textmining_transferred', 'combined_score']
@@ -273,24 +269,8 @@ class StitchLinksTransformer(Transformer):
                     source=SOURCE
                 )
                 )
-        query = """
-        SELECT DISTINCT
-            item_id_a,
-            item_id_b,
-            a_is_acting,
-            mode,
-            action,
-            score
-        FROM actions
-        WHERE (item_id_a = ? AND item_id_b = ?) OR (item_id_a = ? AND item_id_b = ?);
-        """
-        chem_name = row['chemical']
-        prot_name = row['protein']
-        cur = connection.execute(query, (chem_name, prot_name, prot_name, chem_name))
-        for actions_row in cur.fetchall():
-            prot_is_item_a = actions_row['item_id_a'].startswith('9606')
-            item_a_is_acting = actions_row['a_is_acting'].startswith('t')
-            prot_is_acting = (prot_is_item_a == item_a_is_acting)
+        for actions_row in actions:
+            prot_is_acting = bool(actions_row['protein_is_acting'])
             connection1.attributes.append(Attribute(
                 name='protein_is_acting',
                 value=str(prot_is_acting),
@@ -310,3 +290,116 @@ class StitchLinksTransformer(Transformer):
                         source=SOURCE
                     )
                     )
+
+
+integer_ids = None
+
+
+def has_integer_ids():
+    """
+        Check whether links and actions store chemicals and proteins as integer keys
+        (database built by db/STITCH_db_generation.py, with the protein_ids lookup table)
+    """
+    global integer_ids
+    if integer_ids is None:
+        cur = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'protein_ids'")
+        integer_ids = len(cur.fetchall()) > 0
+    return integer_ids
+
+
+# Key of a chemical (e.g. CIDs00002244) in links and actions, None if the chemical cannot have a key
+def chemical_key(cid):
+    if has_integer_ids():
+        if not cid[4:].isdigit():
+            return None
+        key = int(cid[4:])
+        return key if cid[3] == 's' else -key
+    return cid
+
+
+# Links of the chemical with a combined_score of at least min_score, best first (limit -1: all links).
+# The protein_key column is the key of the protein in actions. The rows are returned as a list,
+# the actions of all links are then read with one query (see get_actions).
+def get_links(cid, min_score, limit):
+    if has_integer_ids():
+        query = """
+            SELECT DISTINCT
+                protein_ids.ensembl_id AS protein,
+                protein_chemical_links_transfer.protein AS protein_key,
+                experimental_direct,
+                experimental_transferred,
+                prediction_direct,
+                prediction_transferred,
+                database_direct,
+                database_transferred,
+                textmining_direct,
+                textmining_transferred,
+                combined_score
+            FROM protein_chemical_links_transfer
+            JOIN protein_ids ON protein_ids.protein = protein_chemical_links_transfer.protein
+            WHERE protein_chemical_links_transfer.chemical = ? AND combined_score >= ?
+            ORDER BY combined_score DESC
+            LIMIT ?;
+        """
+    else:
+        query = """
+            SELECT DISTINCT
+                chemical,
+                protein,
+                protein AS protein_key,
+                experimental_direct,
+                experimental_transferred,
+                prediction_direct,
+                prediction_transferred,
+                database_direct,
+                database_transferred,
+                textmining_direct,
+                textmining_transferred,
+                combined_score
+            FROM protein_chemical_links_transfer 
+            WHERE chemical = ? AND combined_score >= ?
+            ORDER BY combined_score DESC
+            LIMIT ?;
+        """
+    cur = connection.execute(query, (chemical_key(cid), min_score, limit))
+    return cur.fetchall()
+
+
+# Actions between the chemical and each of the proteins (in either direction),
+# returns a dictionary of protein key -> list of actions
+def get_actions(chemical, proteins):
+    actions = defaultdict(list)
+    if len(proteins) == 0:
+        return actions
+    protein_keys = json.dumps(list(set(proteins)))
+    if has_integer_ids():
+        query = """
+            SELECT DISTINCT
+                protein AS protein_key,
+                protein_is_acting,
+                mode,
+                action,
+                score
+            FROM actions
+            WHERE chemical = ? AND protein IN (SELECT value FROM json_each(?));
+        """
+        cur = connection.execute(query, (chemical, protein_keys))
+    else:
+        query = """
+            SELECT DISTINCT
+                item_id_a,
+                item_id_b,
+                a_is_acting,
+                CASE WHEN item_id_a = ? THEN item_id_b ELSE item_id_a END AS protein_key,
+                (substr(item_id_a, 1, 4) = '9606') = (substr(a_is_acting, 1, 1) = 't') AS protein_is_acting,
+                mode,
+                action,
+                score
+            FROM actions
+            WHERE (item_id_a = ? AND item_id_b IN (SELECT value FROM json_each(?)))
+            OR (item_id_b = ? AND item_id_a IN (SELECT value FROM json_each(?)));
+        """
+        cur = connection.execute(query, (chemical, chemical, protein_keys, chemical, protein_keys))
+    for row in cur.fetchall():
+        actions[row['protein_key']].append(row)
+    return actions
@@ -17,6 +17,28 @@ class Connection(Model):
     Do not edit the class manually.
     """
 
+    openapi_types = {
+        'source_element_id': str,
+        'type': str,
+        'relation': str,
+        'evidence_type': str,
+        'source': str,
+        'provided_by': str,
+        'attributes': List[Attribute]
+    }
+
+    attribute_map = {
+        'source_element_id': 'source_element_id',
+        'type': 'type',
+        'relation': 'relation',
+        'evidence_type': 'evidence_type',
+        'source': 'source',
+        'provided_by': 'provided_by',
+        'attributes': 'attributes'
+    }
+
+    __slots__ = ('_source_element_id', '_type', '_relation', '_evidence_type', '_source', '_provided_by', '_attributes')
+
     def __init__(self, source_element_id=None, type=None, relation=None, evidence_type=None, source=None, provided_by=None, attributes=None):  # noqa: E501
         """Connection - a model defined in OpenAPI
 
@@ -35,26 +57,6 @@ class Connection(Model):
         :param attributes: The attributes of this Connection.  # noqa: E501
         :type attributes: List[Attribute]
         """
-        self.openapi_types = {
-            'source_element_id': str,
-            'type': str,
-            'relation': str,
-            'evidence_type': str,
-            'source': str,
-            'provided_by': str,
-            'attributes': List[Attribute]
-        }
-
-        self.attribute_map = {
-            'source_element_id': 'source_element_id',
-            'type': 'type',
-            'relation': 'relation',
-            'evidence_type': 'evidence_type',
-            'source': 'source',
-            'provided_by': 'provided_by',
-            'attributes': 'attributes'
-        }
-
         self._source_element_id = source_element_id
         self._type = type
         self._relation = relation
@@ -0,0 +1,83 @@
+"""
+    Benchmark of the ChEMBL targets and mechanisms transformers with and without the
+    denormalized compound_mechanism table (transformers/chembl/db/chembl_mechanism_table.py).
+
+    Sends compounds with mechanisms one at a time (a request per compound) to
+    ChemblTargetTransformer and ChemblMechanismExporter, first reading the joined ChEMBL
+    tables and then the compound_mechanism table, reports the latency per compound and
+    checks that both produce the same elements and connections.
+
+    Run from transformers/chembl/python-flask-server, with the ChEMBL database in data/:
+
+        python ../../../util/python/benchmarks/chembl_mechanism_benchmark.py --compounds 1000
+"""
+import sys
+import json
+import time
+import random
+import argparse
+
+from openapi_server.models.element import Element
+from openapi_server.controllers import chembl_db_transformer
+from openapi_server.controllers.chembl_db_transformer import ChemblTargetTransformer, ChemblMechanismExporter
+
+
+def compounds(count):
+    cur = chembl_db_transformer.connection.execute("""
+        SELECT DISTINCT molecule_dictionary.chembl_id
+        FROM drug_mechanism
+        JOIN molecule_dictionary ON molecule_dictionary.molregno = drug_mechanism.molregno
+    """)
+    ids = sorted(row['chembl_id'] for row in cur.fetchall())
+    random.seed(0)
+    ids = random.sample(ids, min(count, len(ids)))
+    return [Element(id='ChEMBL:'+id, biolink_class='ChemicalSubstance', identifiers={'chembl': 'ChEMBL:'+id}) for id in ids]
+
+
+def canonical(elements):
+    # elements and connections in a fixed order (the two implementations may order mechanisms differently)
+    result = []
+    for element in elements:
+        element = element.to_dict()
+        element['connections'] = sorted(json.dumps(connection, sort_keys=True) for connection in element['connections'])
+        result.append(json.dumps(element, sort_keys=True))
+    return sorted(result)
+
+
+def measure(name, run, collection, table):
+    chembl_db_transformer.mechanism_table = table
+    output = []
+    start = time.perf_counter()
+    for compound in collection:
+        output.extend(run([compound]))
+    elapsed = time.perf_counter() - start
+    print('{:12s} {:32s} {:8.3f} ms/compound'.format(name, 'compound_mechanism table:' if table else 'joined tables:', 1000 * elapsed / len(collection)))
+    return canonical(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the denormalized ChEMBL mechanism table')
+    parser.add_argument('--compounds', type=int, default=1000, help='number of compounds with mechanisms')
+    args = parser.parse_args()
+
+    chembl_db_transformer.mechanism_table = None
+    if not chembl_db_transformer.has_mechanism_table():
+        print('compound_mechanism table not found, run transformers/chembl/db/chembl_mechanism_table.py')
+        sys.exit(1)
+    collection = compounds(args.compounds)
+    print('{} compounds'.format(len(collection)))
+    targets = ChemblTargetTransformer()
+    mechanisms = ChemblMechanismExporter()
+    identical = True
+    for (name, run) in (('targets', lambda compounds: targets.map(compounds, {})),
+                        ('mechanisms', lambda compounds: mechanisms.export(compounds, {}))):
+        joined = measure(name, run, collection, False)
+        denormalized = measure(name, run, collection, True)
+        identical = identical and joined == denormalized
+    print('identical output: {}'.format(identical))
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+    Benchmark of interned provenance attributes on a high fan-out CTRP response.
+
+    Builds a response of compounds with many connections each, every connection carrying
+    four score attributes and the three constant reference attributes of CTRPTransformer,
+    once with the references interned (Transformer.constant) and once with a new Attribute
+    for every connection. Reports the memory held by the response and the JSON encoding
+    time (as serialized by Connexion), and checks that both encodings are identical.
+
+    Run from transformers/ctrp/python-flask-server:
+
+        python ../../../util/python/benchmarks/constant_attribute_benchmark.py --connections 200000
+"""
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+from openapi_server.models.transformer_info import TransformerInfo
+from openapi_server.models.element import Element
+from openapi_server.encoder import JSONEncoder
+from openapi_server.controllers.ctrp_transformer import CTRPTransformer
+from transformers.constants import ConstantPool
+
+
+def transformer(interned):
+    ctrp = CTRPTransformer.__new__(CTRPTransformer)
+    with open('ctrp_transformer_info.json') as f:
+        ctrp.info = TransformerInfo.from_dict(json.load(f))
+    ctrp.constants = ConstantPool()
+    if not interned:
+        ctrp.constant = lambda model, **fields: model(**fields)
+    return ctrp
+
+
+def build_response(ctrp, connections, compounds):
+    random.seed(0)
+    response = []
+    for i in range(compounds):
+        response.append(Element(id='CID:{}'.format(i), biolink_class='ChemicalSubstance',
+            identifiers={'pubchem': 'CID:{}'.format(i)}, attributes=[], connections=[], source='CTRP'))
+    for i in range(connections):
+        hit = {
+            'CORRELATION_VALUE': round(random.uniform(-1, 1), 4),
+            'FISHER_Z': round(random.uniform(-10, 10), 4),
+            'FDR': round(random.uniform(0, 0.1), 4),
+            'N_SAMPLES': random.randint(10, 800)
+        }
+        response[i % compounds].connections.append(ctrp.create_connection('CID:{}'.format(i % 97), hit))
+    return response
+
+
+def measure(connections, compounds, interned, repeat):
+    gc.collect()
+    tracemalloc.start()
+    response = build_response(transformer(interned), connections, compounds)
+    (memory, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        text = json.dumps(response, cls=JSONEncoder, indent=2, sort_keys=True, ensure_ascii=True) + '\n'
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return memory, best, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of interned provenance attributes')
+    parser.add_argument('--connections', type=int, default=200000, help='number of connections in the response')
+    parser.add_argument('--compounds', type=int, default=100, help='number of compounds in the response')
+    parser.add_argument('--repeat', type=int, default=3, help='number of encoding runs (the best run is reported)')
+    args = parser.parse_args()
+
+    print('response: {} compounds, {} connections'.format(args.compounds, args.connections))
+    (plain_memory, plain_time, plain_text) = measure(args.connections, args.compounds, False, args.repeat)
+    (memory, elapsed, text) = measure(args.connections, args.compounds, True, args.repeat)
+    print('new attributes:      {:8.1f} MiB  encoded in {:6.2f}s'.format(plain_memory / 2**20, plain_time))
+    print('interned attributes: {:8.1f} MiB  encoded in {:6.2f}s'.format(memory / 2**20, elapsed))
+    print('output: {} bytes, identical: {}'.format(len(text), text == plain_text))
+    if text != plain_text:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
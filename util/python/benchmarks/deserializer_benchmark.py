@@ -0,0 +1,79 @@
+"""
+    Benchmark of transformer query deserialization on a 10k-element input collection.
+
+    Builds the JSON body of a transformer query whose collection holds elements with
+    identifiers, names, attributes and a connection, and deserializes it with the generated
+    TransformerQuery.from_dict (openapi_server.util.deserialize_model) and with the compiled
+    transformers.deserializer. Both results are checked to be equal.
+
+    Run from the python-flask-server directory of a service with the newer models, e.g.:
+
+        cd transformers/depmap/python-flask-server
+        python ../../../util/python/benchmarks/deserializer_benchmark.py --elements 10000
+"""
+import time
+import argparse
+
+from openapi_server.models.transformer_query import TransformerQuery
+
+from transformers.deserializer import deserialize
+
+
+def build_query(elements):
+    collection = []
+    for i in range(elements):
+        gene_id = 'NCBIGene:{}'.format(i)
+        collection.append({
+            'id': gene_id,
+            'biolink_class': 'biolink:Gene',
+            'identifiers': {'entrez': gene_id, 'ensembl': ['ENSEMBL:ENSG{:011d}'.format(i)]},
+            'names_synonyms': [
+                {'name': 'gene {}'.format(i), 'synonyms': ['G{}'.format(i)], 'source': 'DepMap', 'provided_by': 'DepMap'}
+            ],
+            'attributes': [
+                {'attribute_type_id': 'biolink:' + name, 'original_attribute_name': name, 'value': str(i),
+                    'attribute_source': 'DepMap', 'provided_by': 'DepMap co-fitness correlation'}
+                for name in ('gene_symbol', 'gene_type', 'chromosome')
+            ],
+            'connections': [{
+                'source_element_id': 'NCBIGene:1', 'biolink_predicate': 'biolink:correlated_with',
+                'inverse_predicate': 'biolink:correlated_with', 'source': 'DepMap',
+                'provided_by': 'DepMap co-fitness correlation',
+                'attributes': [{'attribute_type_id': 'correlation', 'original_attribute_name': 'correlation',
+                    'value': i / elements, 'attribute_source': 'DepMap', 'provided_by': 'DepMap'}]
+            }],
+            'source': 'DepMap',
+            'provided_by': 'DepMap co-fitness correlation'
+        })
+    return {'collection': collection, 'controls': [{'name': 'limit', 'value': '10'}]}
+
+
+def measure(function, body, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(body)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of transformer query deserialization')
+    parser.add_argument('--elements', type=int, default=10000, help='number of elements in the input collection')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs, the best run is reported')
+    args = parser.parse_args()
+
+    body = build_query(args.elements)
+    (expected, generated_time) = measure(TransformerQuery.from_dict, body, args.repeat)
+    (query, compiled_time) = measure(lambda body: deserialize(body, TransformerQuery), body, args.repeat)
+    assert query.collection == expected.collection
+    assert query.controls == expected.controls
+
+    print('collection: {} elements'.format(args.elements))
+    print('TransformerQuery.from_dict: {:6.3f}s'.format(generated_time))
+    print('compiled deserializer:      {:6.3f}s  ({:.1f}x faster)'.format(compiled_time, generated_time / compiled_time))
+
+
+if __name__ == '__main__':
+    main()
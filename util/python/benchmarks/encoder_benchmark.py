@@ -0,0 +1,151 @@
+"""
+    Benchmark of the transformer JSON encoder on a large ChEMBL assay export.
+
+    Compares transformers.encoder.ModelJSONEncoder with the reflective encoder generated by
+    openapi-generator (which the services used before), serializing the response the same way
+    Connexion does (indent=2, sort_keys, ensure_ascii), and checks that the outputs are identical.
+
+    Run from transformers/chembl/python-flask-server:
+
+        python ../../../util/python/benchmarks/encoder_benchmark.py --assays 20000
+
+    By default the export is built from synthetic activity rows by ChemblAssayExporter. With
+    --compound and a ChEMBL database in data/, the assays of the given compound are exported instead.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+
+from connexion.apps.flask_app import FlaskJSONEncoder
+
+from openapi_server.models.base_model_ import Model
+from openapi_server.models.transformer_info import TransformerInfo
+from openapi_server.models.element import Element
+from openapi_server.controllers.chembl_db_transformer import ChemblAssayExporter
+from transformers.encoder import ModelJSONEncoder
+
+
+class ReflectiveJSONEncoder(FlaskJSONEncoder):
+    include_nulls = False
+
+    def default(self, o):
+        if isinstance(o, Model):
+            dikt = {}
+            for attr, _ in o.openapi_types.items():
+                value = getattr(o, attr)
+                if value is None and not self.include_nulls:
+                    continue
+                attr = o.attribute_map[attr]
+                dikt[attr] = value
+            return dikt
+        return FlaskJSONEncoder.default(self, o)
+
+
+class FastJSONEncoder(ModelJSONEncoder):
+    include_nulls = False
+
+
+def activity_row(compound, assay):
+    return {
+        'standard_type': random.choice(['IC50', 'Ki', 'EC50', 'Potency', 'Inhibition']),
+        'standard_relation': '=',
+        'standard_value': round(random.uniform(0.1, 10000), 2),
+        'standard_units': 'nM',
+        'pchembl_value': round(random.uniform(4, 10), 2),
+        'activity_comment': random.choice([None, 'Active', 'Not Active']),
+        'assay_chembl_id': 'CHEMBL{}'.format(assay),
+        'assay_description': 'Inhibition of human target {} measured by assay {}'.format(assay % 977, assay),
+        'BAO_label': 'single protein format',
+        'assay_organism': 'Homo sapiens',
+        'target_chembl_id': 'CHEMBL{}'.format(200 + assay % 977),
+        'target_name': 'Target protein {}'.format(assay % 977),
+        'target_organism': 'Homo sapiens',
+        'target_type': 'SINGLE PROTEIN',
+        'document_chembl_id': 'CHEMBL{}'.format(1100000 + assay % 5000),
+        'source_description': 'Scientific Literature',
+        'cell_chembl_id': None,
+        'data_validity_comment': None,
+        'uo_units': 'UO_0000065',
+        'ligand_efficiency_BEI': round(random.uniform(5, 30), 2),
+        'ligand_efficiency_LE': round(random.uniform(0.1, 0.6), 2),
+        'ligand_efficiency_LLE': round(random.uniform(0, 8), 2),
+        'ligand_efficiency_SEI': round(random.uniform(2, 20), 2),
+        'assay_type': 'Binding',
+        'bao_format': 'BAO_0000357',
+        'assay_tissue_chembl_id': None,
+        'assay_tissue_name': None,
+        'assay_cell_type': None,
+        'assay_subcellular_fraction': None,
+        'journal': 'J. Med. Chem.',
+        'year': 2000 + assay % 20
+    }
+
+
+def synthetic_export(assays, activities):
+    """
+        Build an assay export with ChemblAssayExporter from synthetic activity rows.
+    """
+    exporter = ChemblAssayExporter.__new__(ChemblAssayExporter)
+    with open('info/assays_transformer_info.json') as f:
+        exporter.info = TransformerInfo.from_dict(json.load(f))
+    assay_map = {}
+    random.seed(0)
+    for i in range(activities):
+        compound = 'CHEMBL{}'.format(i % 10)
+        row = activity_row(compound, i % assays)
+        if row['assay_chembl_id'] not in assay_map:
+            assay_map[row['assay_chembl_id']] = exporter.create_assay(row)
+        exporter.add_connection(compound, assay_map[row['assay_chembl_id']], row)
+    return list(assay_map.values())
+
+
+def database_export(compound):
+    exporter = ChemblAssayExporter()
+    element = Element(id='ChEMBL:' + compound, identifiers={'chembl': 'ChEMBL:' + compound})
+    return list(exporter.export([element], {variable: None for variable in exporter.variables}))
+
+
+def serialize(data, encoder):
+    return json.dumps(data, cls=encoder, indent=2, sort_keys=True, ensure_ascii=True) + '\n'
+
+
+def measure(data, encoder, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        text = serialize(data, encoder)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the transformer JSON encoder')
+    parser.add_argument('--assays', type=int, default=20000, help='number of synthetic assays')
+    parser.add_argument('--activities', type=int, default=40000, help='number of synthetic activities')
+    parser.add_argument('--compound', help='ChEMBL id of a compound to export from data/ChEMBL.sqlite')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs (the best run is reported)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.compound is not None:
+        data = database_export(args.compound)
+    else:
+        data = synthetic_export(args.assays, args.activities)
+    elements = len(data)
+    attributes = sum(len(e.attributes) + sum(len(c.attributes) for c in e.connections) for e in data)
+    print('export: {} assays, {} attributes, built in {:.2f}s'.format(elements, attributes, time.perf_counter() - start))
+
+    reflective_time, reflective_text = measure(data, ReflectiveJSONEncoder, args.repeat)
+    fast_time, fast_text = measure(data, FastJSONEncoder, args.repeat)
+    print('reflective encoder: {:8.3f}s'.format(reflective_time))
+    print('fast encoder:       {:8.3f}s  ({:.1f}x)'.format(fast_time, reflective_time / fast_time))
+    print('output: {} bytes, identical: {}'.format(len(fast_text), fast_text == reflective_text))
+    if fast_text != reflective_text:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
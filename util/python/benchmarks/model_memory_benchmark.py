@@ -0,0 +1,94 @@
+"""
+    Memory benchmark of the model classes on a 100k-element response.
+
+    Builds a response of elements, each with names, attributes and a connection, and reports
+    the memory held by the response and the construction time. The slotted models with
+    class-level type maps are compared with the previous representation, where every object
+    carried an instance __dict__ and its own copies of openapi_types and attribute_map.
+
+    Run from the python-flask-server directory of a service with the newer models, e.g.:
+
+        cd transformers/depmap/python-flask-server
+        python ../../../util/python/benchmarks/model_memory_benchmark.py --elements 100000
+"""
+import gc
+import time
+import argparse
+import tracemalloc
+
+from openapi_server.models.element import Element
+from openapi_server.models.names import Names
+from openapi_server.models.attribute import Attribute
+from openapi_server.models.connection import Connection
+
+
+def legacy(model):
+    """
+        Subclass of the model with the previous representation: an instance __dict__
+        and per-instance openapi_types and attribute_map.
+    """
+    def __init__(self, *args, **kwargs):
+        model.__init__(self, *args, **kwargs)
+        self.openapi_types = dict(model.openapi_types)
+        self.attribute_map = dict(model.attribute_map)
+    return type('Legacy' + model.__name__, (model,), {'__init__': __init__})
+
+
+def build_response(elements, models):
+    (Element, Names, Attribute, Connection) = models
+    response = []
+    for i in range(elements):
+        gene_id = 'NCBIGene:{}'.format(i)
+        attributes = [
+            Attribute(attribute_type_id='correlation', original_attribute_name='correlation', value=i / elements,
+                attribute_source='DepMap', provided_by='DepMap co-fitness correlation')
+        ]
+        connection = Connection(source_element_id='NCBIGene:1', biolink_predicate='biolink:correlated_with',
+            inverse_predicate='biolink:correlated_with', source='DepMap', provided_by='DepMap co-fitness correlation',
+            attributes=attributes)
+        response.append(Element(
+            id=gene_id,
+            biolink_class='biolink:Gene',
+            identifiers={'entrez': gene_id},
+            names_synonyms=[Names(name='gene {}'.format(i), synonyms=[], source='DepMap', provided_by='DepMap')],
+            attributes=[
+                Attribute(attribute_type_id='biolink:' + name, original_attribute_name=name, value=str(i),
+                    attribute_source='DepMap', provided_by='DepMap co-fitness correlation')
+                for name in ('gene_symbol', 'gene_type', 'chromosome')
+            ],
+            connections=[connection],
+            source='DepMap',
+            provided_by='DepMap co-fitness correlation'
+        ))
+    return response
+
+
+def measure(elements, models):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = build_response(elements, models)
+    elapsed = time.perf_counter() - start
+    (current, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del response
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory benchmark of the model classes')
+    parser.add_argument('--elements', type=int, default=100000, help='number of elements in the response')
+    args = parser.parse_args()
+
+    models = (Element, Names, Attribute, Connection)
+    legacy_models = tuple(legacy(model) for model in models)
+    print('response: {} elements, {} model objects'.format(args.elements, 7 * args.elements))
+    (legacy_memory, legacy_time) = measure(args.elements, legacy_models)
+    (memory, elapsed) = measure(args.elements, models)
+    print('instance dict models: {:8.1f} MiB  {:6.2f}s'.format(legacy_memory / 2**20, legacy_time))
+    print('slotted models:       {:8.1f} MiB  {:6.2f}s  ({:.1f}x less memory)'.format(
+        memory / 2**20, elapsed, legacy_memory / memory))
+
+
+if __name__ == '__main__':
+    main()
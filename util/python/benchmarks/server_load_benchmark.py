@@ -0,0 +1,106 @@
+"""
+    Load benchmark of a transformer service run by the development server and by the
+    production server (transformers.server, TRANSFORMER_SERVER=production).
+
+    Starts the service (python -m openapi_server) in each mode, sends the same request from
+    a number of concurrent clients and reports the throughput and latency of each mode.
+
+    Run from the python-flask-server directory of a service, e.g.:
+
+        cd transformers/depmap/python-flask-server
+        python ../../../util/python/benchmarks/server_load_benchmark.py --port 8010 \\
+            --path /depmap/correlation/transform --body query.json --clients 16 --requests 2000
+
+    Without --body, the path is requested with GET (e.g. /depmap/correlation/transformer_info).
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+import statistics
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def start_service(mode, port, workers, threads):
+    env = dict(os.environ, TRANSFORMER_SERVER=mode)
+    if workers is not None:
+        env['TRANSFORMER_WORKERS'] = str(workers)
+    if threads is not None:
+        env['TRANSFORMER_THREADS'] = str(threads)
+    return subprocess.Popen([sys.executable, '-m', 'openapi_server'], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def stop_service(process):
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait()
+
+
+def request(url, body):
+    start = time.perf_counter()
+    data = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(data) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def wait_until_ready(url, body, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            request(url, body)
+            return
+        except urllib.error.HTTPError:
+            raise
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError('service did not start at ' + url)
+
+
+def run_load(url, body, clients, requests):
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        start = time.perf_counter()
+        latencies = list(executor.map(lambda i: request(url, body), range(requests)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies), latencies[int(0.95 * (len(latencies) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load benchmark of the transformer service entry points')
+    parser.add_argument('--port', type=int, required=True, help='port of the service (see openapi_server/__main__.py)')
+    parser.add_argument('--path', required=True, help='path of the requested endpoint')
+    parser.add_argument('--body', help='JSON file with the request body (POST), default: GET request')
+    parser.add_argument('--clients', type=int, default=16, help='number of concurrent clients')
+    parser.add_argument('--requests', type=int, default=2000, help='number of requests per mode')
+    parser.add_argument('--workers', type=int, help='TRANSFORMER_WORKERS of the production server')
+    parser.add_argument('--threads', type=int, help='TRANSFORMER_THREADS of the production server')
+    args = parser.parse_args()
+
+    url = 'http://127.0.0.1:{}{}'.format(args.port, args.path)
+    body = None
+    if args.body is not None:
+        with open(args.body, 'rb') as f:
+            body = f.read()
+
+    results = {}
+    for mode in ('development', 'production'):
+        process = start_service(mode, args.port, args.workers, args.threads)
+        try:
+            wait_until_ready(url, body)
+            run_load(url, body, args.clients, min(args.requests, 100))  # warm-up
+            results[mode] = run_load(url, body, args.clients, args.requests)
+        finally:
+            stop_service(process)
+        (throughput, median, p95) = results[mode]
+        print('{:12s} {:8.1f} requests/s   median {:7.1f} ms   p95 {:7.1f} ms'.format(
+            mode + ':', throughput, 1000 * median, 1000 * p95))
+    print('throughput gain: {:.1f}x'.format(results['production'][0] / results['development'][0]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_MAX_SIZE = 1024     # number of cached responses
+DEFAULT_TTL = 24 * 60 * 60  # seconds a cached response stays valid
+
+
+class ResponseCache:
+    """
+        Size-bounded LRU cache of transformer responses with a time-to-live.
+
+        Responses are stored pickled, so a cached response is never shared (and
+        possibly modified) by two requests. Entries are kept in memory or, if a
+        database path is given, in a local SQLite file that is shared by all worker
+        processes of a service and survives restarts.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL, database=None):
+        """
+            :param max_size: maximum number of cached responses
+            :param ttl: time-to-live of a cached response, in seconds (None: no expiry)
+            :param database: path of the SQLite cache file (None: in-memory cache)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.database = database
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.connection = None
+        self.pid = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    #######################################################################################################
+    #
+    #  Create the response cache configured by the environment, or None if caching is not enabled.
+    #  * TRANSFORMER_CACHE: 'memory' or path of an SQLite cache file
+    #  * TRANSFORMER_CACHE_SIZE: maximum number of cached responses
+    #  * TRANSFORMER_CACHE_TTL: time-to-live of a cached response, in seconds
+    #
+    @staticmethod
+    def from_environment():
+        store = os.environ.get('TRANSFORMER_CACHE', '').strip()
+        if store == '' or store.lower() in ('no', 'none', 'off', 'false', '0'):
+            return None
+        max_size = int(os.environ.get('TRANSFORMER_CACHE_SIZE', DEFAULT_MAX_SIZE))
+        ttl = float(os.environ.get('TRANSFORMER_CACHE_TTL', DEFAULT_TTL))
+        database = None if store.lower() == 'memory' else store
+        return ResponseCache(max_size=max_size, ttl=ttl if ttl > 0 else None, database=database)
+
+
+    @staticmethod
+    def key(*parts):
+        """
+            Build a cache key from the given (string) parts.
+        """
+        return hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+    def get(self, key):
+        """
+            Return the cached response for the key, or None.
+        """
+        with self.lock:
+            if self.database is None:
+                value = self.memory_get(key)
+            else:
+                value = self.sqlite_get(key)
+            if value is None:
+                self.misses = self.misses + 1
+                return None
+            self.hits = self.hits + 1
+        return pickle.loads(value)
+
+
+    def put(self, key, response):
+        value = pickle.dumps(response, pickle.HIGHEST_PROTOCOL)
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            if self.database is None:
+                self.memory_put(key, value, expires)
+            else:
+                self.sqlite_put(key, value, expires)
+
+
+    def remove(self, key):
+        with self.lock:
+            if self.database is None:
+                self.entries.pop(key, None)
+            else:
+                self.sqlite().execute('DELETE FROM response_cache WHERE key = ?', (key,))
+
+
+    def clear(self):
+        with self.lock:
+            if self.database is None:
+                self.entries.clear()
+            else:
+                self.sqlite().execute('DELETE FROM response_cache')
+
+
+    def stats(self):
+        """
+            Return the hit/miss counters of this process and the number of cached responses.
+        """
+        with self.lock:
+            if self.database is None:
+                size = len(self.entries)
+            else:
+                size = self.sqlite().execute('SELECT COUNT(*) FROM response_cache').fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': size,
+            'max_size': self.max_size
+        }
+
+
+    def memory_get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        (expires, value) = entry
+        if expires is not None and expires < time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+
+    def memory_put(self, key, value, expires):
+        self.entries[key] = (expires, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions = self.evictions + 1
+
+
+    def sqlite(self):
+        """
+            Return the connection to the cache file of this process, creating the file if needed.
+        """
+        if self.connection is None or self.pid != os.getpid():
+            connection = sqlite3.connect(self.database, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    expires REAL,
+                    accessed REAL NOT NULL,
+                    value BLOB NOT NULL
+                )
+            """)
+            connection.execute('CREATE INDEX IF NOT EXISTS response_cache_accessed ON response_cache (accessed)')
+            self.connection = connection
+            self.pid = os.getpid()
+        return self.connection
+
+
+    def sqlite_get(self, key):
+        connection = self.sqlite()
+        now = time.time()
+        row = connection.execute('SELECT expires, value FROM response_cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[0] is not None and row[0] < now:
+            connection.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+            return None
+        connection.execute('UPDATE response_cache SET accessed = ? WHERE key = ?', (now, key))
+        return row[1]
+
+
+    def sqlite_put(self, key, value, expires):
+        connection = self.sqlite()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'INSERT OR REPLACE INTO response_cache (key, expires, accessed, value) VALUES (?, ?, ?, ?)',
+                (key, expires, time.time(), value)
+            )
+            excess = connection.execute('SELECT COUNT(*) FROM response_cache').fetchone()[0] - self.max_size
+            if excess > 0:
+                connection.execute("""
+                    DELETE FROM response_cache WHERE key IN (
+                        SELECT key FROM response_cache ORDER BY accessed LIMIT ?
+                    )
+                """, (excess,))
+                self.evictions = self.evictions + excess
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
@@ -0,0 +1,58 @@
+import weakref
+
+
+class ConstantPool:
+    """
+        Interned model objects, e.g. provenance attributes that are attached unchanged to every
+        connection of a response (references, data versions, about links).
+
+        Each distinct object is created once and shared by all elements and connections that use it.
+        Every transformer has its own pool, which holds at most `size` objects; further objects are
+        created as usual and are not interned. Interned objects are registered so that the JSON
+        encoder converts each of them only once and reuses the converted fragment; they must
+        therefore not be modified after creation.
+    """
+
+    size = 1024
+
+
+    def __init__(self, size=None):
+        if size is not None:
+            self.size = size
+        self.objects = {}   # (model class, field values) -> interned object
+        self.fragments = {} # id of interned object -> converted fragments of the object (see ModelJSONEncoder)
+
+
+    def get(self, model, **fields):
+        """
+            Return the interned model object with the given field values, creating it on first use.
+            Objects with unhashable field values (lists, dicts) are not interned.
+        """
+        key = (model, tuple(sorted(fields.items())))
+        try:
+            constant = self.objects.get(key)
+        except TypeError:
+            return model(**fields)
+        if constant is None:
+            if len(self.objects) >= self.size:
+                return model(**fields)
+            constant = self.objects.setdefault(key, model(**fields))
+            self.fragments[id(constant)] = {}
+            registry[id(constant)] = self
+        return constant
+
+
+# id of interned object -> pool of the object; the pool holds its objects, so their ids are not
+# reused while it is alive, and the entries are removed when the pool is freed
+registry = weakref.WeakValueDictionary()
+
+
+def constant_fragments(o):
+    """
+        Return the dictionary of converted fragments of an interned object (include_nulls -> converted
+        object, see ModelJSONEncoder), None if the object is not interned
+    """
+    pool = registry.get(id(o))
+    if pool is None:
+        return None
+    return pool.fragments.get(id(o))
@@ -0,0 +1,112 @@
+import os
+import json
+import sqlite3
+import threading
+from collections import defaultdict
+from urllib.parse import quote
+
+
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024   # bytes of the database file memory-mapped by each connection
+DEFAULT_CACHE_SIZE = 16 * 1024          # KiB of page cache per connection
+
+
+class ConnectionPool:
+    """
+        Pool of read-only SQLite connections shared by all transformers of a service.
+
+        Each thread gets its own connection, opened lazily on first use, so concurrent
+        requests no longer serialize on one module-level connection. Connections are
+        re-opened after a fork, so every worker process uses its own handles.
+
+        The pool can be used in place of a sqlite3 connection for cursor() and execute().
+    """
+
+    def __init__(self, database, row_factory=sqlite3.Row, immutable=False,
+            mmap_size=DEFAULT_MMAP_SIZE, cache_size=DEFAULT_CACHE_SIZE, detect_types=0):
+        """
+            :param database: path of the SQLite database file
+            :param row_factory: row factory of the connections (sqlite3.Row by default)
+            :param immutable: open the file with immutable=1 (file must not change while in use)
+            :param mmap_size: PRAGMA mmap_size of the connections, in bytes
+            :param cache_size: PRAGMA cache_size of the connections, in KiB
+            :param detect_types: detect_types of the connections
+        """
+        self.database = os.path.abspath(database)
+        self.row_factory = row_factory
+        self.immutable = immutable
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.detect_types = detect_types
+        self.local = threading.local()
+
+
+    def uri(self):
+        uri = 'file:' + quote(self.database) + '?mode=ro'
+        if self.immutable:
+            uri = uri + '&immutable=1'
+        return uri
+
+
+    def connect(self):
+        connection = sqlite3.connect(self.uri(), uri=True, detect_types=self.detect_types, check_same_thread=False)
+        connection.row_factory = self.row_factory
+        connection.execute('PRAGMA query_only = 1')
+        connection.execute('PRAGMA mmap_size = {}'.format(int(self.mmap_size)))
+        connection.execute('PRAGMA cache_size = {}'.format(-int(self.cache_size)))
+        return connection
+
+
+    def connection(self):
+        """
+            Return the connection of the current thread, opening it if needed.
+        """
+        pid = os.getpid()
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or self.local.pid != pid:
+            # a connection inherited from the parent process must not be used (nor closed)
+            connection = self.connect()
+            self.local.connection = connection
+            self.local.pid = pid
+        return connection
+
+
+    def cursor(self):
+        return self.connection().cursor()
+
+
+    def execute(self, sql, parameters=()):
+        return self.connection().execute(sql, parameters)
+
+
+    def close(self):
+        """
+            Close the connection of the current thread.
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None and self.local.pid == os.getpid():
+            connection.close()
+        self.local.connection = None
+
+
+def select_many(connection, query, ids, key, parameters=()):
+    """
+        Run a query for a set of ids with one statement: the first parameter of the query is
+        the JSON array of the ids, read with json_each, e.g.
+
+            WHERE chembl_id IN (SELECT value FROM json_each(?))
+
+        :param connection: ConnectionPool or sqlite3 connection (rows must be sqlite3.Row)
+        :param query: SQL query
+        :param ids: ids to look up (no query is run if empty)
+        :param key: column the rows are grouped by
+        :param parameters: further parameters of the query, after the ids
+        :return: dictionary (defaultdict) of key -> list of rows, in the order of the query
+    """
+    rows = defaultdict(list)
+    ids = list(ids)
+    if len(ids) == 0:
+        return rows
+    cur = connection.execute(query, (json.dumps(ids),) + tuple(parameters))
+    for row in cur.fetchall():
+        rows[row[key]].append(row)
+    return rows
@@ -0,0 +1,163 @@
+import datetime
+
+from openapi_server import util
+from openapi_server import typing_utils
+
+
+PRIMITIVES = (int, float, str, bool, bytearray)
+
+
+class ModelDeserializer:
+    """
+        Deserializer of request bodies into models.
+
+        Produces the same models as openapi_server.util.deserialize_model, but the openapi_types
+        of each model class are examined only once: every class is compiled into a list of
+        (JSON key, attribute name, value converter) and a request is converted in a single
+        pass over its data, without dispatching on the declared type of every value. Models are
+        created by their constructors with all fields at once; null values are still passed
+        to the property setters, so that required fields reject them as before.
+    """
+
+    plans = {}  # model class -> (blank instance, list of (JSON key, attribute, converter, primitive type, setter) or None for models without fields)
+
+
+    def deserialize(self, data, klass):
+        return self.converter(klass)(data)
+
+
+    def converter(self, klass):
+        """
+            Return a function that converts JSON data to the given type (class literal or typing generic).
+        """
+        if klass in PRIMITIVES:
+            return self.primitive_converter(klass)
+        if klass == object:
+            return identity
+        if klass == datetime.date:
+            return nullable(util.deserialize_date)
+        if klass == datetime.datetime:
+            return nullable(util.deserialize_datetime)
+        if typing_utils.is_generic(klass):
+            if typing_utils.is_list(klass):
+                return self.list_converter(self.converter(klass.__args__[0]))
+            if typing_utils.is_dict(klass):
+                return self.dict_converter(self.converter(klass.__args__[1]))
+            return nothing
+        return self.model_converter(klass)
+
+
+    @staticmethod
+    def primitive_converter(klass):
+        def convert(data):
+            if data is None or type(data) is klass:
+                return data
+            return util._deserialize_primitive(data, klass)
+        return convert
+
+
+    @staticmethod
+    def list_converter(convert):
+        if convert is identity:
+            return lambda data: None if data is None else [value for value in data]
+        return lambda data: None if data is None else [convert(value) for value in data]
+
+
+    @staticmethod
+    def dict_converter(convert):
+        if convert is identity:
+            return lambda data: None if data is None else {key: value for key, value in data.items()}
+        return lambda data: None if data is None else {key: convert(value) for key, value in data.items()}
+
+
+    def model_converter(self, klass):
+        if klass not in self.plans:
+            self.compile(klass)
+        (blank, plan) = self.plans[klass]
+        if plan is None:
+            return identity
+
+        def convert(data):
+            if data is None:
+                return None
+            if type(data) is not dict:
+                return util.deserialize_model(data, klass)
+            fields = {}
+            for key, attr, convert_value, primitive, setter in plan:
+                if key in data:
+                    value = data[key]
+                    # values that already have the declared primitive type are taken as they are
+                    if type(value) is primitive:
+                        fields[attr] = value
+                    elif value is None:
+                        setter(blank, None)
+                    else:
+                        fields[attr] = convert_value(value)
+            return klass(**fields)
+        return convert
+
+
+    def compile(self, klass):
+        """
+            Compile the plan of a model class. The plan is registered before the converters
+            of its fields are created, so that recursive models refer to their own plan.
+            Nulls, and values of fields whose setters check allowed values, are passed to
+            the setters of a blank instance of the class, so that they are rejected as before.
+        """
+        blank = klass()
+        if not blank.openapi_types:
+            ModelDeserializer.plans[klass] = (blank, None)
+            return
+        plan = []
+        ModelDeserializer.plans[klass] = (blank, plan)
+        for attr, attr_type in blank.openapi_types.items():
+            set_value = setter(klass, attr)
+            convert_value = self.converter(attr_type)
+            primitive = attr_type if attr_type in PRIMITIVES else None
+            if checks_values(set_value):
+                convert_value = checked(convert_value, set_value, blank)
+                primitive = None
+            plan.append((blank.attribute_map[attr], attr, convert_value, primitive, set_value))
+
+
+def setter(klass, attr):
+    prop = getattr(klass, attr, None)
+    if isinstance(prop, property) and prop.fset is not None:
+        return prop.fset
+    return lambda instance, value: setattr(instance, attr, value)
+
+
+def checks_values(set_value):
+    code = getattr(set_value, '__code__', None)
+    return code is not None and 'allowed_values' in code.co_varnames
+
+
+def checked(convert, set_value, blank):
+    def convert_checked(data):
+        value = convert(data)
+        set_value(blank, value)
+        return value
+    return convert_checked
+
+
+def identity(data):
+    return data
+
+
+def nothing(data):
+    return None
+
+
+def nullable(convert):
+    return lambda data: None if data is None else convert(data)
+
+
+deserializer = ModelDeserializer()
+
+
+#######################################################################################################
+#
+#  Deserialize a request body (e.g. a transformer query) into a model of the given class.
+#
+def deserialize(data, klass):
+    return deserializer.deserialize(data, klass)
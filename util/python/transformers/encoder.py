@@ -0,0 +1,232 @@
+import re
+import math
+
+from connexion.apps.flask_app import FlaskJSONEncoder
+
+from openapi_server.models.base_model_ import Model
+
+from transformers.constants import constant_fragments
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+FLOAT_PLACEHOLDER = re.compile(rb'"\\u0000(\d+)\\u0000"')
+NON_ASCII = re.compile('[\x7f-\U0010ffff]')
+SCALARS = frozenset([str, int, bool, type(None)])  # types that orjson and the json module serialize alike
+
+
+class Fallback(Exception):
+    """
+        Raised when a value cannot be serialized by the fast path with the same output as the json module.
+    """
+    pass
+
+
+def ascii_escape(match):
+    code = ord(match.group(0))
+    if code < 0x10000:
+        return '\\u{0:04x}'.format(code)
+    code = code - 0x10000
+    return '\\u{0:04x}\\u{1:04x}'.format(0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+
+
+class ModelJSONEncoder(FlaskJSONEncoder):
+    """
+        JSON encoder of the transformer services.
+
+        Models are converted with a field plan compiled once per model class instead of walking
+        openapi_types and attribute_map for every object. When orjson is available, the converted
+        response is serialized by orjson; the output is byte-for-byte the same as that of the json
+        module with the options Flask and Connexion use (indent=2, sort_keys, ensure_ascii).
+        Anything the fast path cannot reproduce exactly is serialized by the json module.
+        Interned model objects (see transformers.constants) are converted once and the converted
+        fragment is reused wherever they occur.
+    """
+
+    include_nulls = False
+
+    plans = {}  # model class -> tuple of (attribute name, JSON key)
+
+
+    def __init__(self, *args, default=None, **kwargs):
+        # Flask passes its own default function to encoders of subclasses that do not define default();
+        # models must still be converted by this encoder's default()
+        super().__init__(*args, **kwargs)
+
+
+    def default(self, o):
+        if isinstance(o, Model):
+            dikt = {}
+            for attr, key in self.plan(o):
+                value = getattr(o, attr)
+                if value is None and not self.include_nulls:
+                    continue
+                dikt[key] = value
+            return dikt
+        return FlaskJSONEncoder.default(self, o)
+
+
+    def encode(self, o):
+        option = self.orjson_option()
+        if option is None:
+            return super().encode(o)
+        floats = []
+        try:
+            data = orjson.dumps(self.primitive(o, floats), option=option)
+        except (Fallback, TypeError, orjson.JSONEncodeError):
+            return super().encode(o)
+        if len(floats) > 0:
+            data = self.replace_floats(data, floats)
+            if data is None:
+                return super().encode(o)
+        text = data.decode('utf-8')
+        # str.isascii() accepts DEL (U+007F), which the json module escapes
+        if self.ensure_ascii and NON_ASCII.search(text) is not None:
+            text = NON_ASCII.sub(ascii_escape, text)
+        return text
+
+
+    def orjson_option(self):
+        """
+            orjson option that reproduces the json module formatting with the encoder's settings,
+            or None if there is no such option.
+        """
+        if orjson is None or not self.check_circular or self.skipkeys:
+            return None
+        if self.indent == 2 and self.item_separator == ',' and self.key_separator == ': ':
+            option = orjson.OPT_INDENT_2
+        elif self.indent is None and self.item_separator == ',' and self.key_separator == ':':
+            option = 0
+        else:
+            return None
+        if self.sort_keys:
+            option = option | orjson.OPT_SORT_KEYS
+        return option
+
+
+    def plan(self, o):
+        """
+            Return the field plan of the model's class: (attribute name, JSON key) of each field.
+            The attribute name refers to the private attribute behind the model's property, if any.
+        """
+        cls = type(o)
+        plan = self.plans.get(cls)
+        if plan is None:
+            plan = []
+            for attr in o.openapi_types:
+                private = '_' + attr
+                plan.append((private if hasattr(o, private) else attr, o.attribute_map[attr]))
+            plan = tuple(plan)
+            ModelJSONEncoder.plans[cls] = plan
+        return plan
+
+
+    def primitive(self, o, floats):
+        """
+            Convert models to dictionaries of JSON types, skipping null fields of models. Floats
+            that orjson formats differently from repr() are replaced by placeholders.
+        """
+        t = type(o)
+        if t in SCALARS:
+            return o
+        if t is float:
+            return self.float_value(o, floats)
+        if t is list or t is tuple:
+            return [value if type(value) in SCALARS else self.primitive(value, floats) for value in o]
+        if t is dict:
+            dikt = {}
+            for key, value in o.items():
+                if type(key) is not str:
+                    raise Fallback()
+                dikt[key] = value if type(value) in SCALARS else self.primitive(value, floats)
+            return dikt
+        if isinstance(o, Model):
+            fragments = constant_fragments(o)
+            if fragments is not None:
+                return self.fragment(o, fragments, floats)
+            return self.model_primitive(o, floats)
+        if isinstance(o, str):
+            return str(o)
+        if isinstance(o, float):
+            return self.float_value(float(o), floats)
+        if isinstance(o, int):
+            return int(o)
+        if isinstance(o, (list, tuple, dict)):
+            return self.primitive(dict(o) if isinstance(o, dict) else list(o), floats)
+        raise Fallback()
+
+
+    def model_primitive(self, o, floats):
+        dikt = {}
+        include_nulls = self.include_nulls
+        plan = self.plans.get(type(o))
+        if plan is None:
+            plan = self.plan(o)
+        for attr, key in plan:
+            value = getattr(o, attr)
+            if value is None:
+                if include_nulls:
+                    dikt[key] = None
+            elif type(value) in SCALARS:
+                dikt[key] = value
+            else:
+                dikt[key] = self.primitive(value, floats)
+        return dikt
+
+
+    def fragment(self, o, fragments, floats):
+        """
+            Return the converted interned object, converting it on first use. The fragments are
+            kept with the interned object (include_nulls -> converted object); fragments with
+            float placeholders are specific to one response and are not kept.
+        """
+        fragment = fragments.get(self.include_nulls)
+        if fragment is None:
+            count = len(floats)
+            fragment = self.model_primitive(o, floats)
+            if len(floats) == count:
+                fragments[self.include_nulls] = fragment
+        return fragment
+
+
+    @staticmethod
+    def float_value(value, floats):
+        # repr() uses the exponent notation outside of [1e-4, 1e16), orjson does not
+        if value == 0.0 or (math.isfinite(value) and 1e-4 <= abs(value) < 1e16):
+            return value
+        floats.append(value)
+        return '\x00{}\x00'.format(len(floats) - 1)
+
+
+    def replace_floats(self, data, floats):
+        """
+            Replace float placeholders with the json module's representation of the floats,
+            or return None if the placeholders cannot be matched unambiguously.
+        """
+        texts = [self.float_text(value) for value in floats]
+        if texts.count(None) > 0:
+            return None
+        found = []
+        def replace(match):
+            index = int(match.group(1))
+            found.append(index)
+            return texts[index].encode('ascii') if index < len(texts) else match.group(0)
+        data = FLOAT_PLACEHOLDER.sub(replace, data)
+        if sorted(found) != list(range(len(floats))):
+            return None
+        return data
+
+
+    def float_text(self, value):
+        if value != value:
+            text = 'NaN'
+        elif value == math.inf:
+            text = 'Infinity'
+        elif value == -math.inf:
+            text = '-Infinity'
+        else:
+            return float.__repr__(value)
+        return text if self.allow_nan else None
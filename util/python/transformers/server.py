@@ -0,0 +1,83 @@
+import gc
+import os
+import multiprocessing
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # pragma: no cover
+    BaseApplication = None
+
+
+DEFAULT_THREADS = 4          # threads per worker process
+DEFAULT_MAX_REQUESTS = 1000  # requests served by a worker before it is gracefully replaced
+DEFAULT_TIMEOUT = 120        # seconds a silent worker is given before it is restarted
+
+
+class ProductionServer(BaseApplication or object):
+    """
+        Multi-process server of a transformer service (gunicorn with threaded workers).
+
+        The application is loaded once in the master process, before the workers are forked,
+        so that the state built at startup (transformer info, knowledge-map counts, id maps,
+        compiled indexes) is shared copy-on-write by all workers. Database connections are
+        opened per process by transformers.database.ConnectionPool.
+    """
+
+    def __init__(self, application, options):
+        self.application = application
+        self.options = options
+        super().__init__()
+
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+
+    def load(self):
+        return self.application
+
+
+def when_ready(server):
+    # objects created while loading the application are never collected; freezing them keeps
+    # the garbage collector from writing to their pages in the workers (and copying them)
+    gc.freeze()
+
+
+#######################################################################################################
+#
+#  Server options configured by the environment:
+#  * TRANSFORMER_WORKERS: number of worker processes (default: number of CPUs)
+#  * TRANSFORMER_THREADS: number of threads per worker
+#  * TRANSFORMER_MAX_REQUESTS: requests served by a worker before it is replaced (0: never)
+#  * TRANSFORMER_TIMEOUT: seconds a silent worker is given before it is restarted
+#
+def production_options(port):
+    max_requests = int(os.environ.get('TRANSFORMER_MAX_REQUESTS', DEFAULT_MAX_REQUESTS))
+    return {
+        'bind': '0.0.0.0:{}'.format(port),
+        'workers': int(os.environ.get('TRANSFORMER_WORKERS', multiprocessing.cpu_count())),
+        'threads': int(os.environ.get('TRANSFORMER_THREADS', DEFAULT_THREADS)),
+        'worker_class': 'gthread',
+        'preload_app': True,
+        'max_requests': max_requests,
+        'max_requests_jitter': max_requests // 10,
+        'timeout': int(os.environ.get('TRANSFORMER_TIMEOUT', DEFAULT_TIMEOUT)),
+        'graceful_timeout': int(os.environ.get('TRANSFORMER_TIMEOUT', DEFAULT_TIMEOUT)),
+        'when_ready': when_ready,
+        'accesslog': '-'
+    }
+
+
+#######################################################################################################
+#
+#  Run a transformer service (connexion app). With TRANSFORMER_SERVER=production the service is run
+#  by the multi-process ProductionServer, otherwise by Flask's development server.
+#
+def serve(app, port, debug=False):
+    if os.environ.get('TRANSFORMER_SERVER', 'development').strip().lower() == 'production':
+        if BaseApplication is not None:
+            ProductionServer(app.app, production_options(port)).run()
+            return
+        print("WARNING: gunicorn is not installed, starting the development server")
+    app.run(port=port, debug=debug)
@@ -0,0 +1,42 @@
+import json
+
+from flask import Response, stream_with_context
+
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+#######################################################################################################
+#
+#  Check whether a transform request asks for a streamed (newline-delimited JSON) response,
+#  either by an Accept header that lists application/x-ndjson or by the 'stream' query flag.
+#  Parameters:
+#  * request: the flask request
+#  * stream: value of the 'stream' query parameter, if the controller declares it
+#
+def stream_requested(request, stream=None):
+    if stream is None:
+        stream = request.args.get('stream')
+    if stream is not None:
+        return str(stream).lower() in ('true', 'yes', '1')
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+#######################################################################################################
+#
+#  Write the elements of a transform response as newline-delimited JSON, one element per line,
+#  while they are being produced. Error responses (tuples of error message and status) are
+#  returned as they are.
+#  Parameters:
+#  * response: an iterable of elements, as returned by Transformer.transform(query, stream=True)
+#  * encoder: JSON encoder of the service (openapi_server.encoder.JSONEncoder)
+#
+def ndjson_response(response, encoder):
+    if isinstance(response, tuple):
+        return response
+
+    def generate():
+        for element in response:
+            yield json.dumps(element, cls=encoder, separators=(',', ':')) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
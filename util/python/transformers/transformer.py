@@ -3,9 +3,12 @@ from openapi_server.models.element import Element
 from openapi_server.models.names import Names
 from openapi_server.models.attribute import Attribute
 from openapi_server.models.connection import Connection
+from transformers.cache import ResponseCache
+from transformers.constants import ConstantPool
 
 import json
 import csv
+import inspect
 import os.path
 from os import path
 import sys, getopt
@@ -13,13 +16,26 @@ import sys, getopt
 class Transformer:
     class_dict = None   # Dictionary of MolePro class to Biolink class
     prefix_map = None   # JSON mapping of Biolink class to MolePro & Biolink prefixes
+    prefix_index = None # (MolePro class, field name) -> (MolePro prefix, upper-case MolePro prefix)
+    response_cache = None   # ResponseCache shared by all transformers of the service, None if not enabled
 
-    def __init__(self, variables, definition_file):
+    def __init__(self, variables, definition_file, response_cache=None):
         self.variables = variables
         self.definition_file = definition_file
+        self.constants = ConstantPool()
+        if response_cache is not None:
+            self.response_cache = response_cache
+        elif Transformer.response_cache is None:
+            Transformer.response_cache = ResponseCache.from_environment()
         self.transformer_info('bypass')
 
-    def transform(self, query):
+    #######################################################################################################
+    #
+    #  Apply the transformer to the query. The produce/expand/filter/export/map methods may return a
+    #  list of elements or yield them; a generator is materialized into a list unless stream=True,
+    #  in which case the elements are returned as an iterator for a streamed (NDJSON) response.
+    #
+    def transform(self, query, cache=None, stream=False):
         query_controls = {}
         for control in query.controls:
             if control.name not in query_controls:
@@ -31,7 +47,7 @@ class Transformer:
         for variable, parameter in self.parameters.items():
         #   check that the value of name parameter (e.g., 'disease') is in the query JSON
             if parameter.name in query_controls:
-                if parameter.multivalued:
+                if getattr(parameter, 'multivalued', False):
                     controls[variable] = query_controls[parameter.name]
                 else: 
                     if len(query_controls[parameter.name]) == 1:
@@ -44,12 +60,51 @@ class Transformer:
                         msg = "duplicate parameter'{}' provided".format(query_controls[parameter.name])
                         return ({ "status": 400, "title": "Bad Request", "detail": msg, "type": "about:blank" }, 400 )
             else:
-                if parameter.required:
+                if getattr(parameter, 'required', False):
                     msg = "required parameter '{}' not specified".format(parameter.name)
                     return ({ "status": 400, "title": "Bad Request", "detail": msg, "type": "about:blank" }, 400 )
                 else:
                     controls[variable] = parameter.default
-        
+
+        directive = self.cache_directive(query_controls, cache)
+        if self.response_cache is None or directive == 'no':
+            return self.respond(self.apply(query, controls), stream)
+        key = self.cache_key(query, controls)
+        if directive == 'remove':
+            self.response_cache.remove(key)
+            return self.respond(self.apply(query, controls), stream)
+        if directive != 'bypass':
+            response = self.response_cache.get(key)
+            if response is not None:
+                return response
+        response = self.apply(query, controls)
+        if not isinstance(response, list) and not inspect.isgenerator(response):
+            return response
+        if stream:
+            return self.cache_stream(key, response)
+        response = list(response)
+        self.response_cache.put(key, response)
+        return response
+
+
+#   Materialize elements yielded by a generator, unless the response is streamed
+    def respond(self, response, stream):
+        if not stream and inspect.isgenerator(response):
+            return list(response)
+        return response
+
+
+#   Pass streamed elements through and cache the response once it is complete
+    def cache_stream(self, key, response):
+        elements = []
+        for element in response:
+            elements.append(element)
+            yield element
+        self.response_cache.put(key, elements)
+
+
+#   Invoke the function of the transformer (producer, expander, filter, exporter or transformer)
+    def apply(self, query, controls):
         if self.info.function == 'producer':
             return self.produce(controls)
         if self.info.function == 'expander':
@@ -64,6 +119,67 @@ class Transformer:
             "detail": "Function '"+self.info.function+"' not implemented", "type": "about:blank" }, 500 )
 
 
+    #######################################################################################################
+    #
+    #  Caching directive of a transform request: 'yes' (default), 'no' (neither read nor store
+    #  the cached response), 'bypass' (recompute and store the response) or 'remove' (delete
+    #  the cached response and recompute without storing).
+    #  The directive is taken from the cache argument (the controller's 'cache' query parameter),
+    #  then from a 'cache' control that is not a parameter of the transformer, then from the
+    #  Cache-Control header of the request (no-store -> 'no', no-cache -> 'bypass').
+    #
+    def cache_directive(self, query_controls, cache=None):
+        if cache is not None:
+            return cache
+        if 'cache' in query_controls and 'cache' not in [parameter.name for parameter in self.parameters.values()]:
+            return query_controls['cache'][0]
+        try:
+            from flask import has_request_context, request
+        except ImportError:
+            return 'yes'
+        if has_request_context():
+            cache_control = request.headers.get('Cache-Control', '').lower()
+            if 'no-store' in cache_control:
+                return 'no'
+            if 'no-cache' in cache_control:
+                return 'bypass'
+        return 'yes'
+
+
+    #######################################################################################################
+    #
+    #  Cache key of a transform request: transformer name and version, version of the source data,
+    #  canonicalized controls and the input collection sorted by element id (so that requests
+    #  for the same set of elements share the cached response).
+    #
+    def cache_key(self, query, controls):
+        collection = []
+        if self.info.function != 'producer':
+            collection = [element.to_dict() for element in (self.getCollection(query) or [])]
+            collection.sort(key=lambda element: str(element.get('id')))
+        return ResponseCache.key(
+            self.info.name,
+            self.info.version,
+            self.data_version(),
+            json.dumps(controls, sort_keys=True, default=str),
+            json.dumps(collection, sort_keys=True, default=str)
+        )
+
+
+    #######################################################################################################
+    #
+    #  Version of the source data, part of the cache key so that cached responses are invalidated
+    #  by a new data release. Returns source_version of the transformer info properties by default;
+    #  this method may be overridden in the transformer child class.
+    #
+    def data_version(self):
+        return getattr(self.info.properties, 'source_version', None)
+
+
+    def cache_stats(self):
+        return self.response_cache.stats() if self.response_cache is not None else None
+
+
 #   Extract and return the correct type of collection from the request query's JSON 
     def getCollection(self, query):
         if hasattr(query,'collection'):
@@ -94,6 +210,39 @@ class Transformer:
         return ({ "status": 500, "title": "Internal Server Error", "detail": "Transformer not implemented", "type": "about:blank" }, 500 )
 
 
+    #######################################################################################################
+    #
+    #  Collect identifiers of the given field for each element of the collection
+    #  Parameters:
+    #  * collection: the input collection
+    #  * fieldname: a key in the identifiers of the elements, e.g., "chembl"
+    #  * molepro_class: class of the input elements, input_class by default
+    #
+    #  Returns a list of (element, identifiers) pairs; identifiers are de-duplicated and
+    #  stripped of the MolePro CURIE prefix (the case of the identifier is preserved).
+    #  The identifiers of the whole collection can then be looked up with one query
+    #  (see transformers.database.select_many).
+    #
+    def collection_ids(self, collection, fieldname, molepro_class=None):
+        if molepro_class is None:
+            molepro_class = self.INPUT_CLASS
+        (prefix, upper_prefix) = self.prefix_index.get((molepro_class, fieldname), ('', ''))
+        element_ids = []
+        for element in collection:
+            value = element.identifiers.get(fieldname) if element.identifiers is not None else None
+            identifiers = []
+            for identifier in (value if isinstance(value, list) else [value]):
+                if identifier is None or identifier == '':
+                    continue
+                identifier = str(identifier)
+                if prefix != '' and identifier.upper().startswith(upper_prefix):
+                    identifier = identifier[len(prefix):]
+                if identifier not in identifiers:
+                    identifiers.append(identifier)
+            element_ids.append((element, identifiers))
+        return element_ids
+
+
 
     #######################################################################################################
     # This function reads & converts into a dictionary, the text file fetched from 
@@ -126,6 +275,22 @@ class Transformer:
         return prefixMap
 
 
+    #######################################################################################################
+    #
+    # Compile prefix_map and class_dict into a single index, so that a CURIE prefix is found with one
+    # dictionary lookup per (MolePro class, field name) instead of going through both tables.
+    #
+    # Returns a dictionary of (MolePro class, field name) -> (MolePro prefix, upper-case MolePro prefix)
+    #
+    def get_prefix_index(self, prefix_map, class_dict):
+        prefix_index = {}
+        for molepro_class, biolink_class in class_dict.items():
+            for fieldname, prefixes in prefix_map.get(biolink_class, {}).items():
+                prefix = prefixes['molepro_prefix']
+                prefix_index[(molepro_class, fieldname)] = (prefix, prefix.upper())
+        return prefix_index
+
+
     #######################################################################################################
     #
     # If cache=='bypass' this method will reload transformer_info, BiolinkClassMap.txt and prefixMap.json; 
@@ -134,6 +299,7 @@ class Transformer:
     # LOOKUP TABLES:
     # self.prefix_map: mapping from Biolink Class & Field Name to MolePro Prefix
     # self.class_dict: dictionary of MolePro Class to Biolnk Class 
+    # self.prefix_index: mapping from MolePro Class & Field Name to MolePro Prefix (compiled from the above)
     #
     def transformer_info(self, cache):
         if cache=='bypass':
@@ -143,6 +309,7 @@ class Transformer:
                 self.update_transformer_info(self.info) 
             self.prefix_map = self.get_prefix_mapping()
             self.class_dict = self.get_class_dict()
+            self.prefix_index = self.get_prefix_index(self.prefix_map, self.class_dict)
             self.SOURCE = self.info.label
             self.PROVIDED_BY  = self.info.name
             self.OUTPUT_CLASS = self.info.knowledge_map.output_class
@@ -170,7 +337,7 @@ class Transformer:
     def get_prefix(self,fieldname,molepro_class=None):
         if molepro_class == None:
             molepro_class = self.OUTPUT_CLASS 
-        return self.prefix_map[self.class_dict[molepro_class]][fieldname]['molepro_prefix']
+        return self.prefix_index[(molepro_class, fieldname)][0]
 
 
     #######################################################################################################
@@ -188,10 +355,7 @@ class Transformer:
     def has_prefix(self, fieldname, identifier, molepro_class=None):
         if molepro_class is None:
             molepro_class = self.INPUT_CLASS     
-        if identifier.upper().find(self.prefix_map[self.biolink_class(molepro_class)][fieldname]['molepro_prefix'].upper()) == 0:
-            return True
-        else:
-            return False
+        return identifier.upper().startswith(self.prefix_index[(molepro_class, fieldname)][1])
 
 
     #######################################################################################################
@@ -208,7 +372,7 @@ class Transformer:
     def de_prefix(self, fieldname, identifier, molepro_class=None):
         if molepro_class is None:
             molepro_class = self.INPUT_CLASS 
-        return identifier.upper().split(self.prefix_map[self.biolink_class(molepro_class)][fieldname]['molepro_prefix'].upper() ,1)[1] 
+        return identifier.upper().split(self.prefix_index[(molepro_class, fieldname)][1], 1)[1]
 
 
     #######################################################################################################
@@ -222,11 +386,27 @@ class Transformer:
     def add_prefix(self, fieldname, identifier, molepro_class=None):
         if molepro_class == None:
             molepro_class = self.OUTPUT_CLASS   
-        if not self.has_prefix(fieldname, identifier, molepro_class):
-            return self.get_prefix(fieldname,molepro_class) + identifier
+        (prefix, upper_prefix) = self.prefix_index[(molepro_class, fieldname)]
+        if not identifier.upper().startswith(upper_prefix):
+            return prefix + identifier
         else:
             return identifier
 
+
+    #######################################################################################################
+    #
+    #  Add prefix to a list of identifiers (same as add_prefix for each identifier)
+    #  Parameters:
+    #  * fieldname: a key in the JSON output, e.g., "chembl"
+    #  * identifiers: list of ids, such as ["CHEMBL3727577", "CHEMBL25"]
+    #  * molepro_class: such as "compound", output_class by default
+    #
+    def add_prefixes(self, fieldname, identifiers, molepro_class=None):
+        if molepro_class == None:
+            molepro_class = self.OUTPUT_CLASS   
+        (prefix, upper_prefix) = self.prefix_index[(molepro_class, fieldname)]
+        return [identifier if identifier.upper().startswith(upper_prefix) else prefix + identifier for identifier in identifiers]
+
     
     #######################################################################################################
     #
@@ -258,6 +438,16 @@ class Transformer:
         )
 
 
+    #######################################################################################################
+    #
+    #  Return the interned model object with the given fields (e.g. an attribute that is the same
+    #  for every connection, such as a reference or a data version), created once per transformer
+    #  and shared by all responses; it must not be modified
+    #
+    def constant(self, model, **fields):
+        return self.constants.get(model, **fields)
+
+
     #######################################################################################################
     #
     #  convenience method to create element